@@ -0,0 +1,62 @@
+"""
+Media URL extraction benchmark over saved vidspeeds and uqload player pages.
+
+Compares the previous findall-based extraction (kept below as the baseline)
+with laroza_ramadan.helpers.extractor, and shows what each one finds: the
+baseline cannot see links hidden in `eval(function(p,a,c,k,e,d)` packed
+scripts, so on vidspeeds-style pages it is fast only because it finds nothing.
+
+    python -m benchmarks.bench_extractor [--number 200]
+"""
+import argparse
+import os
+import re
+import timeit
+from typing import Callable, Dict
+
+from laroza_ramadan.helpers.extractor import find_m3u8, find_mp4
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def legacy_m3u8(text: str) -> str:
+    urls = re.findall(r"https?://\S+?\.(?:mp4|m3u8)(?:\?.*)?", text)
+    clean_urls = [url for url in urls if url.endswith(".m3u8")]
+    full_urls = [url for url in urls if ".m3u8?" in url]
+    if clean_urls:
+        return clean_urls[0]
+    if full_urls:
+        return full_urls[0].replace('"}],', "") if '"}],' in full_urls[0] else full_urls[0]
+    return ""
+
+
+def legacy_mp4(text: str) -> str:
+    mp4_urls = re.findall(r"https?://.*?v.mp4", text)
+    return mp4_urls[0] if mp4_urls else ""
+
+
+CASES: Dict[str, Dict[str, Callable[[str], str]]] = {
+    "player_vidspeeds.html": {"legacy": legacy_m3u8, "extractor": find_m3u8},
+    "player_uqload.html": {"legacy": legacy_mp4, "extractor": find_mp4},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200, help="Extractions per timing run.")
+    args = parser.parse_args()
+
+    for name, funcs in CASES.items():
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            text = f.read()
+        print(f"{name} ({len(text) / 1024:.0f} KiB)")
+        timings = {}
+        for label, func in funcs.items():
+            timings[label] = min(timeit.repeat(lambda: func(text), number=args.number, repeat=3)) / args.number
+            found = func(text) or "<nothing>"
+            print(f"  {label:<10} {timings[label] * 1e6:9.1f} µs  -> {found[:90]}")
+        print(f"  speedup    {timings['legacy'] / timings['extractor']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Output format benchmark: write and read time and file size of the stage exports.
+
+Round-trips the players and embeds records of a synthetic catalog (see
+bench_schemas.build_catalog) through the previous export (indented json.dump,
+full json.load) and every format of laroza_ramadan.helpers.output_formats.
+
+    python -m benchmarks.bench_formats [--episodes 5000] [--number 5]
+"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.bench_schemas import build_catalog
+from laroza_ramadan.helpers import configure_logging
+from laroza_ramadan.helpers.output_formats import FORMATS, orjson
+
+
+def legacy_io(filename: str) -> Tuple[Callable[[List[Dict]], None], Callable[[], List[Dict]]]:
+    # save_to_json / read_data_from_json_file before the output formats
+    def write(records: List[Dict]) -> None:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=4)
+
+    def read() -> List[Dict]:
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+
+    return write, read
+
+
+def timed(func: Callable, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--episodes", type=int, default=5000, help="Episodes in the synthetic catalog.")
+    parser.add_argument("--number", type=int, default=5, help="Runs per timing.")
+    args = parser.parse_args()
+    configure_logging("WARNING")
+
+    catalog = build_catalog(args.episodes, series=40)
+    print(f"{len(catalog['players'])} episodes; JSON encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+    with tempfile.TemporaryDirectory() as root:
+        for stage in ("embeds", "players"):
+            records = catalog[stage]
+            print(f"\n{stage}_list   {'write':>9} {'read':>9} {'size':>10}")
+            legacy = os.path.join(root, f"{stage}_legacy.json")
+            cases = {"legacy json": (legacy, *legacy_io(legacy))}
+            for name, fmt in FORMATS.items():
+                filename = os.path.join(root, f"{stage}_list{fmt.extension}")
+                cases[name] = (
+                    filename,
+                    lambda records, fmt=fmt, filename=filename: fmt.write(records, filename),
+                    lambda fmt=fmt, filename=filename: list(fmt.read(filename)),
+                )
+            for name, (filename, write, read) in cases.items():
+                write_s = timed(lambda: write(records), args.number)
+                read_s = timed(read, args.number)
+                assert read() == records, name
+                size = os.path.getsize(filename)
+                print(f"  {name:<12} {write_s * 1e3:7.1f}ms {read_s * 1e3:7.1f}ms {size / 1024:8.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+HLS engine benchmark against a local HTTP server.
+
+Generates a master playlist with two variants, an AES-128 encrypted media
+playlist and random segments in a temporary directory, serves them with a
+per-request delay (to stand in for network latency) and downloads the stream
+at several concurrency levels, checking the output byte for byte.
+
+    python -m benchmarks.bench_hls [--segments 60] [--segment-kb 512] [--delay 0.05]
+"""
+import argparse
+import functools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from Cryptodome.Cipher import AES
+from Cryptodome.Util.Padding import pad
+
+from laroza_ramadan.helpers.hls import HLSDownloader
+
+KEY = bytes(range(16))
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_fixture(root: str, segments: int, segment_kb: int) -> bytes:
+    """
+    Writes the playlists, key and segments; returns the expected plaintext stream.
+    """
+    with open(os.path.join(root, "master.m3u8"), "w") as f:
+        f.write(
+            "#EXTM3U\n"
+            "#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360\nlow/index.m3u8\n"
+            "#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720,CODECS=\"avc1.64001f,mp4a.40.2\"\nhigh/index.m3u8\n"
+        )
+    high = os.path.join(root, "high")
+    os.makedirs(high)
+    with open(os.path.join(root, "key.bin"), "wb") as f:
+        f.write(KEY)
+
+    expected = []
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:6", "#EXT-X-MEDIA-SEQUENCE:100", '#EXT-X-KEY:METHOD=AES-128,URI="../key.bin"']
+    for i in range(segments):
+        plain = os.urandom(segment_kb * 1024 - 7)  # Not block aligned, so padding is exercised
+        expected.append(plain)
+        with open(os.path.join(high, f"seg{i:04d}.ts"), "wb") as f:
+            f.write(AES.new(KEY, AES.MODE_CBC, (100 + i).to_bytes(16, "big")).encrypt(pad(plain, 16)))
+        lines += ["#EXTINF:6.0,", f"seg{i:04d}.ts"]
+    lines.append("#EXT-X-ENDLIST")
+    with open(os.path.join(high, "index.m3u8"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return b"".join(expected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=60)
+    parser.add_argument("--segment-kb", type=int, default=512)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds added to every request.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        expected = write_fixture(root, args.segments, args.segment_kb)
+        SlowHandler.delay = args.delay
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(SlowHandler, directory=root))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/master.m3u8"
+
+        try:
+            for concurrency in (1, 4, 8, 16):
+                start = time.perf_counter()
+                path = HLSDownloader(concurrency=concurrency).download(url, os.path.join(root, f"out{concurrency}.%(ext)s"))
+                elapsed = time.perf_counter() - start
+                with open(path, "rb") as f:
+                    ok = f.read() == expected
+                print(
+                    f"concurrency {concurrency:>2}: {elapsed:6.2f}s  "
+                    f"{len(expected) / 1e6 / elapsed:6.1f} MB/s  output {'matches' if ok else 'DIFFERS'}"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
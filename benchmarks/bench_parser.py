@@ -0,0 +1,74 @@
+"""
+Parser micro-benchmark over saved category, series and play.php pages.
+
+Compares the old path (httpx_html HTML object serialized back to a string,
+then parsed again by selectolax) with raw bytes fed straight to selectolax.
+
+    python -m benchmarks.bench_parser [--number 200]
+"""
+import argparse
+import os
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+from laroza_ramadan.helpers.spider import BaseLarozaScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SERIES_DATA = {"series_name": "المداح", "series_url": "https://www.laroza.example/category.php?cat=series-1"}
+
+
+def page_parsers(scraper: BaseLarozaScraper) -> Dict[str, Callable]:
+    return {
+        "category.html": scraper.parse_series_list,
+        "series.html": lambda html: scraper.parse_episodes(html, SERIES_DATA),
+        "play.html": scraper.parse_embeds,
+    }
+
+
+def legacy_source() -> Optional[Callable[[bytes], str]]:
+    """
+    Returns the old httpx_html round trip, or None if httpx_html is not installed.
+    """
+    try:
+        from httpx_html import HTML
+    except ImportError:
+        return None
+    return lambda raw: HTML(html=raw).html
+
+
+def measure(func: Callable, number: int) -> Dict[str, float]:
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us": seconds * 1e6, "peak_kb": peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200, help="Parses per timing run.")
+    args = parser.parse_args()
+
+    legacy = legacy_source()
+    if legacy is None:
+        print("httpx_html is not installed, only the bytes path is measured.")
+
+    for name, parse in page_parsers(BaseLarozaScraper()).items():
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            raw = f.read()
+
+        fast = measure(lambda: parse(raw), args.number)
+        line = f"{name:<14} bytes: {fast['us']:8.1f} µs  peak {fast['peak_kb']:7.1f} KiB"
+        if legacy is not None:
+            slow = measure(lambda: parse(legacy(raw)), args.number)
+            line += (
+                f"  | httpx_html: {slow['us']:8.1f} µs  peak {slow['peak_kb']:7.1f} KiB"
+                f"  | {slow['us'] / fast['us']:.1f}x faster"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Catalog model benchmark: memory and (de)serialization time per thousand episodes.
+
+Builds a synthetic multi-season catalog (Arabic series names, several embeds
+and players per episode on a handful of hosts) and compares the plain dicts
+the pipeline used to keep, loaded with json, against the slotted records of
+laroza_ramadan.schemas, then times the JSON export against the Parquet one.
+
+    python -m benchmarks.bench_schemas [--episodes 5000] [--series 40] [--number 5]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+
+from laroza_ramadan.schemas import EpisodeEmbeds, EpisodePlayers, Series
+from laroza_ramadan.schemas.columnar import players_from_table, players_table, read_parquet, write_parquet
+
+EMBED_HOSTS = ("vidspeeds.com", "uqload.net", "okprime.site", "vidroba.com", "ok.ru")
+CDN_HOSTS = ("s12.vidspeeds.com", "m180.uqload.net", "s3.okprime.site")
+
+
+def build_catalog(episodes: int, series: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """
+    Returns series, embeds and players records shaped like the stage JSON exports.
+    """
+    rng = random.Random(seed)
+    per_season = 30
+    seasons = -(-episodes // (series * per_season))
+    catalog: Dict[str, List[Dict]] = {"series": [], "embeds": [], "players": []}
+    count = 0
+    for s in range(series):
+        name = f"مسلسل الحلقات الرمضانية رقم {s}"
+        for season in range(1, seasons + 1):
+            eps = []
+            for ep_number in range(1, per_season + 1):
+                if count == episodes:
+                    break
+                count += 1
+                ep_url = f"https://www.laroza.example/video.php?vid={rng.getrandbits(40):010x}"
+                eps.append({"ep_number": ep_number, "ep_url": ep_url})
+                catalog["embeds"].append({
+                    "id": s + 1,
+                    "ep_number": ep_number,
+                    "name": name,
+                    "season": season,
+                    "last_ep_url": ep_url,
+                    "embeds": [f"https://{host}/embed-{rng.getrandbits(48):012x}.html" for host in EMBED_HOSTS],
+                })
+                catalog["players"].append({
+                    "ep_name": name,
+                    "season": season,
+                    "ep_number": ep_number,
+                    "players": [
+                        f"https://{host}/hls2/01/{rng.getrandbits(32):08x}/{rng.getrandbits(64):016x}_,l,n,h,.urlset/"
+                        f"master.m3u8?t={rng.getrandbits(96):024x}&s=1740000000&e=129600"
+                        for host in CDN_HOSTS
+                    ],
+                })
+            if eps:
+                catalog["series"].append({"name": name, "episodes": eps, "season": season})
+    return catalog
+
+
+def retained_kb(build: Callable[[], object]) -> float:
+    """
+    Memory still allocated by the object ``build`` returns, once its temporaries are freed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current / 1024
+
+
+def timed(func: Callable, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--episodes", type=int, default=5000, help="Episodes in the synthetic catalog.")
+    parser.add_argument("--series", type=int, default=40)
+    parser.add_argument("--number", type=int, default=5, help="Runs per timing.")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.episodes, args.series)
+    episodes = len(catalog["players"])
+    per_k = 1000 / episodes
+    texts = {stage: json.dumps(records, ensure_ascii=False) for stage, records in catalog.items()}
+    print(f"{episodes} episodes, {len(catalog['series'])} series seasons; figures per 1000 episodes")
+
+    def as_records() -> Dict[str, List]:
+        return {
+            "series": [Series(**item) for item in json.loads(texts["series"])],
+            "embeds": [EpisodeEmbeds(**item) for item in json.loads(texts["embeds"])],
+            "players": [EpisodePlayers(**item) for item in json.loads(texts["players"])],
+        }
+
+    dicts_kb = retained_kb(lambda: {stage: json.loads(text) for stage, text in texts.items()})
+    records_kb = retained_kb(as_records)
+    print("\nMemory held by the loaded catalog")
+    print(f"  dicts    {dicts_kb * per_k:9.0f} KiB")
+    print(f"  records  {records_kb * per_k:9.0f} KiB  ({1 - records_kb / dicts_kb:.0%} less)")
+
+    records = as_records()
+    players = records["players"]
+    with tempfile.TemporaryDirectory() as root:
+        json_path, parquet_path = os.path.join(root, "players_list.json"), os.path.join(root, "players_list.parquet")
+
+        def write_json() -> None:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump([record.to_dict() for record in players], f, indent=4, ensure_ascii=False)
+
+        def read_json() -> List[EpisodePlayers]:
+            with open(json_path, encoding="utf-8") as f:
+                return [EpisodePlayers(**item) for item in json.load(f)]
+
+        timings = {
+            "dicts -> records": timed(as_records, args.number),
+            "json write": timed(write_json, args.number),
+            "json read": timed(read_json, args.number),
+            "parquet write": timed(lambda: write_parquet(players_table(players), parquet_path), args.number),
+            "parquet read": timed(lambda: players_from_table(read_parquet(parquet_path)), args.number),
+            "parquet scan": timed(lambda: read_parquet(parquet_path, columns=["host"]).column("host"), args.number),
+        }
+        sizes = {"json": os.path.getsize(json_path), "parquet": os.path.getsize(parquet_path)}
+        assert read_json() == players_from_table(read_parquet(parquet_path)) == players
+
+    print("\nTime (players stage only, except dicts -> records)")
+    for label, seconds in timings.items():
+        print(f"  {label:<17} {seconds * per_k * 1e3:8.2f} ms")
+    print("\nplayers_list size")
+    for label, size in sizes.items():
+        print(f"  {label:<8} {size * per_k / 1024:9.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
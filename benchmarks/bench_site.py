@@ -0,0 +1,346 @@
+"""
+End-to-end benchmark against the local stand-in site (benchmarks/fake_site.py).
+
+Drives the scraper stages the pipeline runs, fetch_series_list,
+fetch_episodes, extract_embeds, the resolvers and download_video (native HLS
+and yt-dlp MP4), with the latency, jitter and errors injected by the fake
+site, and reports per stage the throughput, p50/p99 latency per call and the
+peak Python memory it needed (traced with tracemalloc, which slows CPU-bound
+code; ``--no-memory`` measures timings alone).
+
+Results are saved as JSON under ``benchmarks/results``; pass a previous
+result to ``--compare`` to flag regressions (exit code 1)::
+
+    python -m benchmarks.bench_site --save before
+    # ... change the code ...
+    python -m benchmarks.bench_site --compare benchmarks/results/bench_site-async-before.json
+
+    python -m benchmarks.bench_site [--mode async|sync] [--series 20] [--latency 0.05]
+        [--jitter 0.02] [--error-rate 0.02] [--downloads 3] [--no-mp4] [--no-memory]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from benchmarks.fake_site import SITE_HOST, FakeSiteProcess, FaultConfig
+from laroza_ramadan.helpers.async_spider import AsyncLarozaScraper
+from laroza_ramadan.helpers.download_index import DownloadIndex
+from laroza_ramadan.helpers.download_manager import download_video
+from laroza_ramadan.helpers.logs import configure_logging
+from laroza_ramadan.helpers.metrics import Histogram
+from laroza_ramadan.helpers.rate_limit import HostRateLimiter
+from laroza_ramadan.helpers.resolvers import registry, resolve_embeds
+from laroza_ramadan.helpers.retry import RetryPolicy
+from laroza_ramadan.helpers.spider import LarozaScraper
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) laroza-bench"}
+STAGES = ("series_list", "episodes", "embeds", "resolve", "download_hls", "download_mp4")
+
+
+class Stage:
+    """
+    Latency of every call of a stage, its failures and its wall time and peak memory.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = Histogram(window=1_000_000)
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.peak_mb: Optional[float] = None
+
+    def call(self, func: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.record(result, time.perf_counter() - start)
+        return result
+
+    async def acall(self, awaitable):
+        start = time.perf_counter()
+        result = await awaitable
+        self.record(result, time.perf_counter() - start)
+        return result
+
+    def record(self, result, seconds: float) -> None:
+        self.latencies.observe(seconds)
+        if not result or (isinstance(result, dict) and not result.get("episodes")):
+            self.errors += 1
+
+    def to_dict(self) -> Dict:
+        calls = self.latencies.count
+        result = {
+            "calls": calls,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "throughput": round(calls / self.seconds, 2) if self.seconds else 0.0,
+            "p50_ms": round(self.latencies.percentile(50) * 1000, 2) if calls else None,
+            "p99_ms": round(self.latencies.percentile(99) * 1000, 2) if calls else None,
+            "peak_mb": round(self.peak_mb, 2) if self.peak_mb is not None else None,
+        }
+        if self.bytes:
+            result["mb_per_s"] = round(self.bytes / 1e6 / self.seconds, 2)
+        return result
+
+
+@contextmanager
+def measured(stages: Dict[str, Stage], name: str) -> Iterator[Stage]:
+    """
+    Times a stage and records the peak Python memory allocated on top of what was live before it.
+    """
+    stage = stages[name] = Stage(name)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        live, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        stage.seconds = time.perf_counter() - start
+        stage.peak_mb = (tracemalloc.get_traced_memory()[1] - live) / 1e6 if tracing else None
+
+
+def crawl_options(args: argparse.Namespace) -> Dict:
+    return {
+        "retry_policy": RetryPolicy(backoff_base=0.05, backoff_max=1.0, timeout=30.0),
+        "rate_limiter": HostRateLimiter(rate=args.rate, burst=max(1, int(args.rate)), max_rate=args.rate),
+    }
+
+
+def pick_targets(series_data: List[Dict], episodes: int) -> List[Dict]:
+    return [
+        {"name": series["name"], **episode}
+        for series in series_data
+        for episode in series["episodes"][-episodes:]
+    ]
+
+
+def run_sync(stages: Dict[str, Stage], category_url: str, args: argparse.Namespace) -> List[Dict]:
+    """
+    The sync pipeline path: LarozaScraper page by page, resolve_embeds per episode.
+    """
+    options = crawl_options(args)
+    scraper = LarozaScraper(**options)
+    try:
+        with measured(stages, "series_list") as stage:
+            series_list = stage.call(scraper.fetch_series_list, category_url, HEADERS)[: args.series]
+        with measured(stages, "episodes") as stage:
+            series_data = [stage.call(scraper.fetch_episodes, series, HEADERS) for series in series_list]
+        targets = pick_targets(series_data, args.episodes)
+        with measured(stages, "embeds") as stage:
+            for target in targets:
+                target["embeds"] = stage.call(scraper.extract_embeds, target["ep_url"], HEADERS)
+    finally:
+        scraper.close_session()
+
+    with measured(stages, "resolve") as stage:
+        for target in targets:
+            target["players"] = stage.call(resolve_embeds, target["embeds"], HEADERS, **options)
+    return targets
+
+
+async def run_async(stages: Dict[str, Stage], category_url: str, args: argparse.Namespace) -> List[Dict]:
+    """
+    The async pipeline path: every call of a stage gathered at once.
+    """
+    scraper = AsyncLarozaScraper(max_concurrency=args.concurrency, max_per_host=args.per_host, **crawl_options(args))
+    try:
+        with measured(stages, "series_list") as stage:
+            series_list = (await stage.acall(scraper.fetch_series_list(category_url, HEADERS)))[: args.series]
+        with measured(stages, "episodes") as stage:
+            series_data = await asyncio.gather(
+                *(stage.acall(scraper.fetch_episodes(series, HEADERS)) for series in series_list)
+            )
+        targets = pick_targets(series_data, args.episodes)
+        with measured(stages, "embeds") as stage:
+            embeds = await asyncio.gather(
+                *(stage.acall(scraper.extract_embeds(target["ep_url"], HEADERS)) for target in targets)
+            )
+        with measured(stages, "resolve") as stage:
+            players = await asyncio.gather(
+                *(stage.acall(registry.resolve(scraper, target_embeds, HEADERS)) for target_embeds in embeds)
+            )
+    finally:
+        await scraper.close_session()
+
+    for target, target_embeds, target_players in zip(targets, embeds, players):
+        target.update(embeds=target_embeds, players=target_players)
+    return targets
+
+
+def run_downloads(stages: Dict[str, Stage], targets: List[Dict], args: argparse.Namespace, root: str) -> None:
+    """
+    Downloads the HLS (native engine) and MP4 (yt-dlp) players of the first
+    ``args.downloads`` episodes, ``args.slots`` at a time.
+    """
+    index = DownloadIndex(os.path.join(root, "downloads.sqlite3"))
+    kinds = {"download_hls": ".m3u8", "download_mp4": "v.mp4"}
+    if args.no_mp4:
+        del kinds["download_mp4"]
+
+    for name, marker in kinds.items():
+        # One player per episode: okprime and vidroba serve the same stream as vidspeeds.
+        jobs = [
+            (players[0], f"{target['name']}-{name}", target["ep_number"])
+            for target in targets
+            for players in [[player for player in target["players"] if marker in player.split("?", 1)[0]]]
+            if players
+        ][: args.downloads]
+        output_folder = os.path.join(root, name)
+
+        with measured(stages, name) as stage:
+            with ThreadPoolExecutor(max_workers=args.slots) as pool:
+                list(pool.map(
+                    lambda job: stage.call(
+                        download_video, job[0], job[1], output_folder=output_folder, episode=job[2], index=index
+                    ),
+                    jobs,
+                ))
+        for _, series_name, episode in jobs:
+            done = index.completed(series_name, 1, episode)
+            if done:
+                stage.bytes += os.path.getsize(done["filepath"])
+
+
+def default_label() -> str:
+    """
+    The short commit hash of the checkout (with "-dirty" for local changes), else "local".
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Lists the stages that got slower, less efficient or hungrier than the
+    baseline by more than ``threshold`` (0.2 = 20%).
+    """
+    regressions = []
+    for name, stats in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if not before:
+            continue
+        for key, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("peak_mb", True), ("throughput", False)):
+            old, new = before.get(key), stats.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(f"{name} {key}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_report(result: Dict) -> None:
+    print(f"{'stage':<14}{'calls':>6}{'errors':>7}{'seconds':>9}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'peak MB':>9}")
+    for name, stats in result["stages"].items():
+        print(
+            f"{name:<14}{stats['calls']:>6}{stats['errors']:>7}{stats['seconds']:>9.2f}{stats['throughput']:>9.1f}"
+            f"{stats['p50_ms'] or 0:>9.1f}{stats['p99_ms'] or 0:>9.1f}"
+            + (f"{stats['peak_mb']:>9.2f}" if stats["peak_mb"] is not None else f"{'-':>9}")
+            + (f"  {stats['mb_per_s']:.1f} MB/s" if "mb_per_s" in stats else "")
+        )
+    print(f"Max RSS: {result['max_rss_mb']:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("async", "sync"), default="async")
+    parser.add_argument("--series", type=int, default=20, help="Series crawled out of the category's 180.")
+    parser.add_argument("--episodes", type=int, default=1, help="Latest episodes per series to extract and resolve.")
+    parser.add_argument("--downloads", type=int, default=3, help="Episodes downloaded per player kind.")
+    parser.add_argument("--no-mp4", action="store_true", help="Skip the yt-dlp MP4 downloads.")
+    parser.add_argument("--slots", type=int, default=3, help="Downloads running at once.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Async in-flight requests overall.")
+    parser.add_argument("--per-host", type=int, default=4, help="Async in-flight requests per host.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Requests per second per host (Settings default: 2).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request.")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Up to this many extra seconds per request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--no-memory", action="store_true",
+        help="Skip tracemalloc, which slows CPU-bound stages (e.g. yt-dlp start-up) several times.",
+    )
+    parser.add_argument("--hls-segments", type=int, default=20)
+    parser.add_argument("--segment-kb", type=int, default=256)
+    parser.add_argument("--mp4-kb", type=int, default=4096)
+    parser.add_argument("--save", metavar="LABEL", default=None, help="Result label (default: git describe).")
+    parser.add_argument("--compare", metavar="FILE", help="Previous result to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a regression (0.2 = 20%%).")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    configure_logging(args.log_level)
+    faults = FaultConfig(args.latency, args.jitter, args.error_rate, args.seed)
+    stages: Dict[str, Stage] = {}
+
+    with FakeSiteProcess(
+        faults, hls_segments=args.hls_segments, segment_kb=args.segment_kb, mp4_kb=args.mp4_kb
+    ) as base_urls, tempfile.TemporaryDirectory() as root:
+        category_url = f"{base_urls[SITE_HOST]}/category.php?cat=ramadan-2025"
+        # resolve_embeds persists the resolver and host stats; keep the local hosts out of the real ones.
+        registry.stats_path = os.path.join(root, "resolver_stats.json")
+        registry.health.path = os.path.join(root, "host_health.json")
+        if not args.no_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        if args.mode == "async":
+            targets = asyncio.run(run_async(stages, category_url, args))
+        else:
+            targets = run_sync(stages, category_url, args)
+        run_downloads(stages, targets, args, root)
+        total = time.perf_counter() - start
+        if not args.no_memory:
+            tracemalloc.stop()
+
+    label = args.save or default_label()
+    result = {
+        "label": label,
+        "mode": args.mode,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "options": {key: value for key, value in vars(args).items() if key not in ("save", "compare", "log_level")},
+        "seconds": round(total, 3),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": {name: stages[name].to_dict() for name in STAGES if name in stages},
+    }
+    print_report(result)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"bench_site-{args.mode}-{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline["mode"], baseline["options"]) != (result["mode"], result["options"]):
+            print(f"Note: {baseline['label']} was run with other options, the comparison is only indicative.")
+        regressions = compare(result, baseline, args.threshold)
+        print(f"Compared with {baseline['label']}: " + ("no regressions" if not regressions else ""))
+        for line in regressions:
+            print(f"  ⚠️ {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
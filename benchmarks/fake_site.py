@@ -0,0 +1,243 @@
+"""
+Local stand-in for the laroza site, its embed hosts and their media CDNs.
+
+Every virtual host listens on its own loopback address (127.0.0.1, .2, ...),
+so per-host rate limits, host health and metrics behave as against the live
+hosts. The recorded pages in ``fixtures/`` are served with their links
+rewritten to the local hosts:
+
+- www.laroza.example: ``category.php`` (the category, or a series page when
+  ``cat=series-N``) and ``play.php``, at the root like the real site;
+- vidspeeds / okprime / vidroba: the packed vidspeeds player page;
+- uqload: the uqload player page;
+- s12.vidspeeds.example: an AES-128 HLS stream (see bench_hls.write_fixture);
+- m180.uqload.example: a ``v.mp4`` file.
+
+Embed and CDN URLs keep their host name as the first path segment
+(``http://127.0.0.3:PORT/uqload.example/embed-9001.html``), so the resolvers,
+which match embed URLs on the host name, pick the same resolver as live.
+
+Every request waits ``latency`` seconds plus up to ``jitter``; a share
+``error_rate`` of the requests gets a 503 instead. The site runs in its own
+process so it does not skew the CPU and memory measured by the benchmark.
+
+    python -m benchmarks.fake_site [--latency 0.05] [--jitter 0.02] [--error-rate 0.02]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from benchmarks.bench_hls import write_fixture
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SITE_HOST = "www.laroza.example"
+HOSTS = (
+    SITE_HOST,
+    "vidspeeds.example",
+    "uqload.example",
+    "okprime.example",
+    "vidroba.example",
+    "s12.vidspeeds.example",
+    "m180.uqload.example",
+)
+VIDSPEEDS_HOSTS = ("vidspeeds.example", "okprime.example", "vidroba.example")
+
+URL_RE = re.compile(r"https://(" + "|".join(re.escape(host) for host in HOSTS) + r")\b")
+# The vidspeeds player hides its m3u8 URL in a packed script, split into the
+# words of the packer's dictionary; its host is repointed there instead.
+PACKED_HOST_WORDS = "|https|s12|vidspeeds|example|"
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hang up mid-body on purpose (yt-dlp probing the MP4 first); anything else is a bug.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+@dataclass
+class FaultConfig:
+    latency: float = 0.05  # Seconds added to every request
+    jitter: float = 0.02  # Up to this many extra seconds, uniformly drawn
+    error_rate: float = 0.0  # Share of requests answered with a 503
+    seed: Optional[int] = None
+
+
+class FakeSite:
+    """
+    Serves the fixtures for every virtual host; ``base_urls`` maps each host
+    name to the local URL standing in for ``https://<host>``.
+    """
+
+    def __init__(self, faults: FaultConfig, hls_segments: int = 20, segment_kb: int = 256, mp4_kb: int = 4096):
+        self.faults = faults
+        self.random = random.Random(faults.seed)
+        self._random_lock = threading.Lock()
+        self.root = tempfile.mkdtemp(prefix="laroza_fake_site_")
+        write_fixture(self.root, hls_segments, segment_kb)
+        self.mp4 = os.urandom(mp4_kb * 1024)
+        self.servers: Dict[str, QuietServer] = {}
+        self.base_urls: Dict[str, str] = {}
+        self.pages: Dict[str, bytes] = {}
+
+    def start(self) -> Dict[str, str]:
+        for i, host in enumerate(HOSTS, start=1):
+            server = QuietServer((f"127.0.0.{i}", 0), self._handler(host))
+            self.servers[host] = server
+            address = f"http://127.0.0.{i}:{server.server_port}"
+            self.base_urls[host] = address if host == SITE_HOST else f"{address}/{host}"
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        for name in os.listdir(FIXTURES_DIR):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                text = URL_RE.sub(lambda match: self.base_urls[match.group(1)], f.read())
+            cdn = self.base_urls["s12.vidspeeds.example"].split("://", 1)[1].split("/", 1)[0]
+            text = text.replace(PACKED_HOST_WORDS, f"|http|{cdn}/s12|vidspeeds|example|")
+            self.pages[name] = text.encode("utf-8")
+        return self.base_urls
+
+    def stop(self) -> None:
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _delay_and_fail(self) -> bool:
+        """
+        Sleeps for the injected latency; returns True when the request should fail.
+        """
+        with self._random_lock:
+            delay = self.faults.latency + self.random.uniform(0, self.faults.jitter)
+            fail = self.random.random() < self.faults.error_rate
+        time.sleep(delay)
+        return fail
+
+    def route(self, host: str, path: str) -> Tuple[int, str, bytes]:
+        """
+        Returns the status, content type and body of a request to ``host``.
+        """
+        path, _, query = path.partition("?")
+        if host != SITE_HOST and path.startswith(f"/{host}/"):
+            path = path[len(host) + 1:]
+
+        if host == SITE_HOST:
+            if path == "/category.php":
+                # Series pages are category pages too (cat=series-N).
+                page = "series.html" if "cat=series-" in query else "category.html"
+                return 200, "text/html; charset=utf-8", self.pages[page]
+            if path == "/play.php":
+                return 200, "text/html; charset=utf-8", self.pages["play.html"]
+        elif host in VIDSPEEDS_HOSTS and path.startswith("/embed-"):
+            return 200, "text/html; charset=utf-8", self.pages["player_vidspeeds.html"]
+        elif host == "uqload.example" and path.startswith("/embed-"):
+            return 200, "text/html; charset=utf-8", self.pages["player_uqload.html"]
+        elif host == "s12.vidspeeds.example" and ".urlset/" in path:
+            filepath = os.path.join(self.root, path.split(".urlset/", 1)[1])
+            if os.path.isfile(filepath):
+                content_type = "application/vnd.apple.mpegurl" if filepath.endswith(".m3u8") else "video/mp2t"
+                with open(filepath, "rb") as f:
+                    return 200, content_type, f.read()
+        elif host == "m180.uqload.example" and path.endswith("/v.mp4"):
+            return 200, "video/mp4", self.mp4
+        return 404, "text/plain", b"not found"
+
+    def _handler(self, host: str):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real hosts
+
+            def do_GET(self):
+                if site._delay_and_fail():
+                    status, content_type, body = 503, "text/plain", b"injected error"
+                else:
+                    status, content_type, body = site.route(host, self.path)
+                headers = {"Content-Type": content_type}
+                # Ranges of the media files are served as 206, like the video CDNs do.
+                match = RANGE_RE.fullmatch(self.headers.get("Range", ""))
+                if status == 200 and match:
+                    first = int(match.group(1))
+                    last = min(int(match.group(2) or len(body) - 1), len(body) - 1)
+                    status, headers["Content-Range"] = 206, f"bytes {first}-{last}/{len(body)}"
+                    body = body[first:last + 1]
+                headers["Content-Length"] = str(len(body))
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _serve(faults: FaultConfig, options: Dict, ready, stop) -> None:
+    site = FakeSite(faults, **options)
+    ready.put(site.start())
+    stop.wait()
+    site.stop()
+
+
+class FakeSiteProcess:
+    """
+    Runs a FakeSite in a child process::
+
+        with FakeSiteProcess(FaultConfig(latency=0.05)) as base_urls:
+            category_url = f"{base_urls[SITE_HOST]}/category.php?cat=ramadan-2025"
+    """
+
+    def __init__(self, faults: FaultConfig, **options):
+        self.faults = faults
+        self.options = options
+        self._stop = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> Dict[str, str]:
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self.faults, self.options, ready, self._stop), daemon=True
+        )
+        self._process.start()
+        return ready.get(timeout=30)
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._process.join(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    site = FakeSite(FaultConfig(args.latency, args.jitter, args.error_rate))
+    for host, url in site.start().items():
+        print(f"{host:<24} {url}")
+    print(f"Category page: {site.base_urls[SITE_HOST]}/category.php?cat=ramadan-2025 (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
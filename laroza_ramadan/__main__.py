@@ -0,0 +1,3 @@
+from laroza_ramadan.cli import main
+
+main()
@@ -0,0 +1,199 @@
+"""
+Command line entry point: ``laroza crawl | embeds | resolve | download | status | run``.
+
+Each subcommand imports only the modules it needs, so ``laroza status`` never
+loads httpx_html, yt-dlp or fake_useragent. ``--timings`` prints how long
+those imports took against ``STARTUP_BUDGET_MS``.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from importlib import import_module
+from typing import Dict, List, Optional
+
+_CLI_STARTED_AT = time.perf_counter()
+_IMPORT_TIMES: Dict[str, float] = {}
+_STAGE_COMMANDS = {"crawl", "embeds", "resolve", "download"}
+
+
+def lazy_import(name: str):
+    """
+    Imports a module on demand and records how long it took, in milliseconds.
+    """
+    already_loaded = name in sys.modules
+    start = time.perf_counter()
+    module = import_module(name)
+    if not already_loaded:
+        _IMPORT_TIMES[name] = (time.perf_counter() - start) * 1000
+    return module
+
+
+def report_timings(startup_ms: float) -> None:
+    """
+    Prints per-module import times and the cold start against the budget.
+    """
+    budget_ms = lazy_import("laroza_ramadan.settings").get_settings().STARTUP_BUDGET_MS
+    for name, elapsed in sorted(_IMPORT_TIMES.items(), key=lambda item: -item[1]):
+        print(f"  import {name}: {elapsed:.1f} ms")
+    status = "✅ within" if startup_ms <= budget_ms else "⚠️ over"
+    print(f"Cold start: {startup_ms:.1f} ms ({status} budget of {budget_ms:.0f} ms)")
+
+
+def cmd_crawl(args: argparse.Namespace) -> None:
+    pipeline = lazy_import("laroza_ramadan.pipeline")
+    if args.jobs or args.workers or pipeline.get_settings().CRAWL_JOBS_FILE:
+        crawl_jobs = lazy_import("laroza_ramadan.crawl_jobs")
+        jobs = crawl_jobs.load_crawl_jobs(args.jobs) if args.jobs else None
+        data_eps = crawl_jobs.run_sharded_crawl(jobs, args.workers)
+        if data_eps:
+            pipeline.get_store().upsert_series_data(data_eps)
+            pipeline.save_stage_output(
+                data_eps, f"{pipeline.LAROZA_OUTPUT_DIR}series_list.json", pipeline.SERIES_KEY, False
+            )
+    elif args.use_async:
+        async def crawl() -> List[Dict]:
+            async_scraper = pipeline.new_async_scraper()
+            try:
+                return await pipeline.fetch_series_data_async(async_scraper)
+            finally:
+                await async_scraper.close_session()
+                await lazy_import("laroza_ramadan.helpers.transport").shared_transport.aclose()
+
+        data_eps = asyncio.run(crawl())
+        if data_eps:
+            pipeline.get_store().upsert_series_data(data_eps)
+            pipeline.save_stage_output(
+                data_eps, f"{pipeline.LAROZA_OUTPUT_DIR}series_list.json", pipeline.SERIES_KEY, False
+            )
+    else:
+        data_eps = pipeline.crawl_series()
+    print(f"Crawled {len(data_eps)} series.")
+
+
+def cmd_embeds(args: argparse.Namespace) -> None:
+    pipeline = lazy_import("laroza_ramadan.pipeline")
+    watermarks = pipeline.load_watermarks() if args.incremental else None
+    eps_embeds = pipeline.extract_embeds_stage(pipeline.stored_series(), watermarks)
+    if args.incremental:
+        pipeline.save_watermarks(
+            pipeline.advance_watermarks(watermarks, eps_embeds, pipeline.get_settings().EMPTY_EPISODE_MAX_RUNS)
+        )
+    print(f"Extracted embeds for {len(eps_embeds)} episodes.")
+
+
+def cmd_resolve(args: argparse.Namespace) -> None:
+    pipeline = lazy_import("laroza_ramadan.pipeline")
+    pending = [pipeline.EpisodeEmbeds(**item) for item in pipeline.get_store().episodes_without_players()]
+    data_players = pipeline.resolve_stage(pending, incremental=True)
+    print(f"Resolved players for {len(data_players)} episodes.")
+
+
+def cmd_download(args: argparse.Namespace) -> None:
+    pipeline = lazy_import("laroza_ramadan.pipeline")
+    records = pipeline.get_store().players(series_name=args.series, season=args.season)
+    pipeline.download_episodes([pipeline.EpisodePlayers(**item) for item in records])
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    catalog_store = lazy_import("laroza_ramadan.helpers.catalog_store")
+    store = catalog_store.CatalogStore()
+    try:
+        for table, count in store.counts().items():
+            print(f"{table}: {count}")
+        print(f"episodes waiting for players: {len(store.episodes_without_players())}")
+        print(f"download jobs: {store.download_job_states() or 'none'}")
+    finally:
+        store.close()
+
+    if args.hosts:
+        host_health = lazy_import("laroza_ramadan.helpers.host_health").host_health
+        for host, stats in host_health.summary().items():
+            print(f"{host}: {stats}")
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    pipeline = lazy_import("laroza_ramadan.pipeline")
+    pipeline.run_pipeline(incremental=args.incremental, use_async=args.use_async, stream=args.stream)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="laroza", description="Laroza series crawler and downloader.")
+    parser.add_argument("--timings", action="store_true", help="Report import times against the startup budget.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("crawl", help="Fetch the series list and every episode list.")
+    crawl.add_argument("--async", dest="use_async", action="store_true", help="Fetch series pages concurrently.")
+    crawl.add_argument("--jobs", help="Crawl job file of category URLs and seasons (default: CRAWL_JOBS_FILE).")
+    crawl.add_argument("--workers", type=int, help="Crawl on this many worker processes.")
+    crawl.set_defaults(func=cmd_crawl)
+
+    embeds = subparsers.add_parser("embeds", help="Extract embeds for the stored episodes.")
+    embeds.add_argument("--incremental", action="store_true", help="Only episodes added since the last run.")
+    embeds.set_defaults(func=cmd_embeds)
+
+    resolve = subparsers.add_parser("resolve", help="Resolve players for episodes that have none yet.")
+    resolve.set_defaults(func=cmd_resolve)
+
+    download = subparsers.add_parser("download", help="Download the stored players.")
+    download.add_argument("--series", help="Only this series.")
+    download.add_argument("--season", type=int, help="Only this season.")
+    download.set_defaults(func=cmd_download)
+
+    status = subparsers.add_parser("status", help="Show catalog and download state.")
+    status.add_argument("--hosts", action="store_true", help="Also show per-host health.")
+    status.set_defaults(func=cmd_status)
+
+    run = subparsers.add_parser("run", help="Run every stage end to end, like series.py.")
+    run.add_argument("--async", dest="use_async", action="store_true")
+    run.add_argument("--incremental", action="store_true")
+    run.add_argument("--stream", action="store_true", help="Start downloads while the crawl is still running.")
+    run.set_defaults(func=cmd_run)
+
+    return parser
+
+
+def run_command(args: argparse.Namespace) -> None:
+    """
+    Runs a subcommand; stage commands log through the LOG_* settings and
+    export their run metrics (``laroza run`` does both itself).
+    """
+    try:
+        if args.command not in _STAGE_COMMANDS:
+            args.func(args)
+            return
+        pipeline = lazy_import("laroza_ramadan.pipeline")
+        pipeline.setup_logging()
+        try:
+            args.func(args)
+        finally:
+            pipeline.export_metrics()
+    finally:
+        close_transport()
+
+
+def close_transport() -> None:
+    """
+    Closes the shared connection pools, if the command loaded them at all.
+    """
+    transport = sys.modules.get("laroza_ramadan.helpers.transport")
+    if transport is not None:
+        transport.shared_transport.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if not args.timings:
+        run_command(args)
+        return
+
+    start_work = time.perf_counter()
+    run_command(args)
+    work_ms = (time.perf_counter() - start_work) * 1000
+    # Parser setup plus the lazy imports the command needed before doing work.
+    startup_ms = (start_work - _CLI_STARTED_AT) * 1000 + sum(_IMPORT_TIMES.values())
+    print(f"Command took {work_ms:.1f} ms.")
+    report_timings(startup_ms)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Crawl job definitions and the sharded multi-process crawl.
+
+A job file lists the category pages to crawl and the season their series
+belong to, e.g. every Ramadan year plus the regular series categories::
+
+    {
+        "jobs": [
+            {"url": "https://w.laroza.now/category.php?cat=ramadan-2025"},
+            {"url": "https://w.laroza.now/category.php?cat=ramadan-2024"},
+            {"url": "https://w.laroza.now/category.php?cat=series", "season": 2,
+             "seasons": {"Series name": 3}}
+        ]
+    }
+
+``run_sharded_crawl`` spreads the categories, then their series, over a
+process pool. Every worker runs its own event loop and async client, so page
+parsing uses every core; the parent merges the results into one list for the
+catalog store.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, TypeVar
+
+from laroza_ramadan.helpers.logs import get_logger
+from laroza_ramadan.helpers.transport import shared_transport
+from laroza_ramadan.pipeline import get_crawl_options
+from laroza_ramadan.settings import get_headers, get_settings
+
+T = TypeVar("T")
+
+log = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CrawlJob:
+    url: str  # Category page listing the series
+    season: int = 1  # Season of every series in the category
+    seasons: Dict[str, int] = field(default_factory=dict)  # Per-series overrides, by series name
+
+    def season_of(self, series_name: str) -> int:
+        return self.seasons.get(series_name, self.season)
+
+
+def load_crawl_jobs(filename: str) -> List[CrawlJob]:
+    """
+    Reads the crawl jobs from a JSON job file.
+
+    Raises:
+        ValueError: If the file has no jobs or a job has no URL.
+    """
+    with open(filename, encoding="utf-8") as f:
+        data = json.load(f)
+    jobs = [CrawlJob(**job) for job in data.get("jobs", [])]
+    if not jobs or not all(job.url for job in jobs):
+        raise ValueError(f"No crawl jobs with a URL in {filename}")
+    return jobs
+
+
+def get_crawl_jobs() -> List[CrawlJob]:
+    """
+    Returns the jobs of ``CRAWL_JOBS_FILE``, or the single configured
+    category (``LAROZA_SITE_SERIES_LIST_URL``, season 1) when it is unset.
+    """
+    settings = get_settings()
+    if settings.CRAWL_JOBS_FILE:
+        return load_crawl_jobs(settings.CRAWL_JOBS_FILE)
+    return [CrawlJob(settings.LAROZA_SITE_SERIES_LIST_URL)]
+
+
+def shard(items: Sequence[T], count: int) -> List[List[T]]:
+    """
+    Splits items round-robin into at most ``count`` non-empty shards.
+    """
+    return [list(items[i::count]) for i in range(min(count, len(items)))]
+
+
+def new_worker_scraper(workers: int):
+    """
+    Creates the async scraper of one crawl worker.
+
+    Every process has its own rate limiter and connection limits, so the
+    per-host budgets of Settings are divided between the workers.
+    """
+    from laroza_ramadan.helpers.async_spider import AsyncLarozaScraper
+    from laroza_ramadan.helpers.rate_limit import HostRateLimiter
+
+    settings = get_settings()
+    options = {
+        **get_crawl_options(),
+        "rate_limiter": HostRateLimiter(
+            rate=settings.RATE_LIMIT_RATE / workers,
+            burst=max(1, settings.RATE_LIMIT_BURST // workers),
+            min_rate=settings.RATE_LIMIT_MIN_RATE / workers,
+            max_rate=settings.RATE_LIMIT_MAX_RATE / workers,
+            increase=settings.RATE_LIMIT_INCREASE / workers,
+            decrease=settings.RATE_LIMIT_DECREASE,
+            success_window=settings.RATE_LIMIT_SUCCESS_WINDOW,
+        ),
+    }
+    # The on-disk response cache has a single index file, so workers crawl without it.
+    return AsyncLarozaScraper(
+        max_concurrency=settings.CRAWL_MAX_CONCURRENCY,
+        max_per_host=max(1, settings.CRAWL_MAX_PER_HOST // workers),
+        **options,
+    )
+
+
+async def _list_categories(jobs: List[CrawlJob], workers: int) -> List[Dict]:
+    async_scraper, headers = new_worker_scraper(workers), get_headers()
+    try:
+        listings = await asyncio.gather(*(async_scraper.fetch_series_list(job.url, headers) for job in jobs))
+    finally:
+        await async_scraper.close_session()
+        await shared_transport.aclose()
+    return [
+        {**series, "season": job.season_of(series["series_name"])}
+        for job, series_list in zip(jobs, listings)
+        for series in series_list
+    ]
+
+
+async def _fetch_series(series_list: List[Dict], workers: int) -> List[Dict]:
+    async_scraper, headers = new_worker_scraper(workers), get_headers()
+    try:
+        results = await asyncio.gather(*(async_scraper.fetch_episodes(series, headers) for series in series_list))
+    finally:
+        await async_scraper.close_session()
+        await shared_transport.aclose()
+    return [{**result, "season": series["season"]} for series, result in zip(series_list, results)]
+
+
+def list_categories(jobs: List[CrawlJob], workers: int) -> List[Dict]:
+    """
+    Worker entry point: fetches a shard of category pages.
+
+    Returns:
+        List[Dict]: {"series_name", "series_url", "season"} for every listed series.
+    """
+    return asyncio.run(_list_categories(jobs, workers))
+
+
+def fetch_series(series_list: List[Dict], workers: int) -> List[Dict]:
+    """
+    Worker entry point: fetches and parses a shard of series pages.
+
+    Returns:
+        List[Dict]: {"name", "episodes", "season"} records, as stored by CatalogStore.
+    """
+    return asyncio.run(_fetch_series(series_list, workers))
+
+
+def run_sharded_crawl(jobs: Optional[List[CrawlJob]] = None, workers: Optional[int] = None) -> List[Dict]:
+    """
+    Crawls every category of the jobs and all of their series on a process pool.
+
+    Args:
+        jobs (Optional[List[CrawlJob]]): The jobs to run (default: get_crawl_jobs()).
+        workers (Optional[int]): Worker processes (default: CRAWL_WORKERS, or one per core).
+
+    Returns:
+        List[Dict]: One {"name", "episodes", "season"} record per series and season.
+    """
+    jobs = jobs if jobs is not None else get_crawl_jobs()
+    workers = workers or get_settings().CRAWL_WORKERS or os.cpu_count() or 1
+
+    # Spawned, not forked: callers such as the async pipeline run this from a worker thread,
+    # and forking a process with live threads (and their locks) can deadlock the children.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        category_shards = shard(jobs, workers)
+        listings = pool.map(list_categories, category_shards, repeat(len(category_shards)))
+        listed = [series for part in listings for series in part]
+
+        # A series listed by two categories under the same season is fetched once.
+        unique_series = list({(s["series_url"], s["season"]): s for s in listed}.values())
+        log.info("Sharded crawl", categories=len(jobs), series=len(unique_series), workers=workers)
+
+        series_shards = shard(unique_series, workers)
+        results = pool.map(fetch_series, series_shards, repeat(len(series_shards)))
+        return [record for part in results for record in part]
@@ -1,4 +1,48 @@
-from .spider import scraper
+from importlib import import_module
+
 from .constants import LAROZA_OUTPUT_DIR
-from .download_manager import download_video
-from .helper import get_domain, save_to_json, read_data_from_json_file, vk_extract_url
\ No newline at end of file
+from .helper import get_domain, save_to_json, read_data_from_json_file, vk_extract_url
+from .output_formats import OutputFormat, atomic_write, get_format, register_format, read_records, write_records
+from .incremental import load_watermarks, save_watermarks, episodes_since, advance_watermarks, merge_records
+from .catalog_store import CatalogStore
+from .extractor import MediaUrl, iter_media_urls, classify_media_urls, find_m3u8, find_mp4, unpack
+from .logs import get_logger, configure_logging
+from .metrics import Metrics, metrics, trace_key
+
+# Names below pull in httpx / httpx_html / yt-dlp, so they are imported on first access.
+_LAZY_EXPORTS = {
+    "scraper": ".spider",
+    "AsyncLarozaScraper": ".async_spider",
+    "ResponseCache": ".http_cache",
+    "download_video": ".download_manager",
+    "DownloadScheduler": ".download_scheduler",
+    "DownloadJob": ".download_scheduler",
+    "DownloadIndex": ".download_index",
+    "HLSDownloader": ".hls",
+    "UnsupportedPlaylistError": ".hls",
+    "SourceSelector": ".source_select",
+    "ResolverRegistry": ".resolvers",
+    "registry": ".resolvers",
+    "resolve_embeds": ".resolvers",
+    "PlayerCache": ".player_cache",
+    "HostHealth": ".host_health",
+    "CircuitOpenError": ".host_health",
+    "host_health": ".host_health",
+    "RetryPolicy": ".retry",
+    "CrawlDeadline": ".retry",
+    "CrawlDeadlineExceeded": ".retry",
+    "HostRateLimiter": ".rate_limit",
+    "TokenBucket": ".rate_limit",
+    "SharedTransport": ".transport",
+    "TransportConfig": ".transport",
+    "shared_transport": ".transport",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .host_health import HostHealth, host_health
+from .http_cache import ResponseCache
+from .logs import get_logger
+from .rate_limit import HostRateLimiter
+from .retry import RetryPolicy, CrawlDeadline
+from .spider import BaseLarozaScraper
+from .transport import SharedTransport, shared_transport
+
+log = get_logger(__name__)
+
+class AsyncLarozaScraper(BaseLarozaScraper):
+    """
+    Asyncio counterpart of LarozaScraper built on httpx.AsyncClient.
+
+    Offers the same fetch methods as coroutines so callers can gather many
+    pages at once. Fan-out is bounded by a global concurrency limit and a
+    per-host limit so a single provider is never flooded.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_per_host: int = 4,
+        timeout: float = 30.0,
+        cache: Optional[ResponseCache] = None,
+        health: HostHealth = host_health,
+        retry_policy: Optional[RetryPolicy] = None,
+        deadline: Optional[CrawlDeadline] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        transport: SharedTransport = shared_transport,
+    ):
+        """
+        Initializes the AsyncLarozaScraper.
+
+        Args:
+            max_concurrency (int): Maximum number of in-flight requests overall.
+            max_per_host (int): Maximum number of in-flight requests per host.
+            timeout (float): Per-request timeout in seconds.
+            cache (Optional[ResponseCache]): On-disk response cache shared with
+                the sync scraper.
+            health (HostHealth): Per-host health tracker and circuit breaker.
+            retry_policy (Optional[RetryPolicy]): Retry/backoff and timeout settings.
+            deadline (Optional[CrawlDeadline]): Total time budget of the crawl.
+            rate_limiter (Optional[HostRateLimiter]): Per-host token buckets,
+                shareable with the sync scraper.
+            transport (SharedTransport): Connection pools shared with the sync
+                scraper and the HLS engine.
+        """
+        self.cache = cache
+        self.health = health
+        self.retry_policy = retry_policy or RetryPolicy(timeout=timeout)
+        self.deadline = deadline or CrawlDeadline()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.transport = transport
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.PLAYERS_NAMES = list(BaseLarozaScraper.PLAYERS_NAMES)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns the underlying AsyncClient, creating it on first use.
+
+        The client and semaphores are created lazily so they bind to the
+        running event loop rather than the one active at construction time.
+        The client sends through that loop's shared connection pool; the
+        semaphores below bound how many requests it has in flight.
+        """
+        if self._client is None:
+            self._client = self.transport.async_client(follow_redirects=True, timeout=self.timeout)
+            self._global_limit = asyncio.Semaphore(self.max_concurrency)
+            self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+        return self._client
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """
+        Performs a GET request while holding both the global and per-host slots.
+        """
+        client = self.client
+        request = client.build_request("GET", url, headers=headers)
+        cached, entry = self.cache.serve(request) if self.cache else (None, None)
+        if cached is not None:
+            return cached
+
+        host = urlparse(url).netloc
+        # One breaker check per request; only the final outcome is recorded below
+        self.health.check(host)
+        attempt = 0
+        while True:
+            # Wait for a token before taking a slot so throttled hosts don't hold slots idle
+            await asyncio.sleep(self.rate_limiter.acquire(host))
+            timeout = self.deadline.timeout(self.retry_policy.timeout)
+            async with self._global_limit, self._host_limits[host]:
+                start = time.perf_counter()
+                try:
+                    request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+                    response = await client.send(request)
+                except httpx.TransportError as e:
+                    delay = self.retry_policy.next_delay(self.deadline, "GET", attempt)
+                    if delay is None:
+                        self.health.record(host, False, time.perf_counter() - start, str(e))
+                        raise
+                    log.warning("Retrying request", url=url, delay=round(delay, 1), error=e)
+                    response = None
+            if response is not None:
+                self.rate_limiter.feedback(host, response.status_code)
+                delay = self.retry_policy.next_delay(self.deadline, "GET", attempt, response)
+                if delay is None:
+                    failed = response.status_code >= 500 or response.status_code == 429
+                    self.health.record(
+                        host, not failed, time.perf_counter() - start,
+                        f"HTTP {response.status_code}" if failed else None,
+                    )
+                    break
+                log.warning("Retrying request", url=url, delay=round(delay, 1), status=response.status_code)
+                await response.aclose()
+            attempt += 1
+            # Back off outside the concurrency slots so other requests keep flowing
+            await asyncio.sleep(delay)
+
+        if self.cache:
+            response = self.cache.complete(request, entry, response)
+        response.raise_for_status()
+        return response
+
+    async def _fetch_pages(self, url: str, last_page: int, headers: Dict[str, str], parse) -> List:
+        """
+        Fetches pages 2..last_page of a listing concurrently and returns
+        ``parse`` of every page that loaded; a failed page is reported and skipped.
+        """
+        async def load(page: int):
+            page_url = self.page_url(url, page)
+            try:
+                return parse(self.page_source(await self._get(page_url, headers)))
+            except (httpx.HTTPError, ValueError) as e:
+                log.warning("Skipping page", url=page_url, error=e)
+                return None
+
+        results = await asyncio.gather(*(load(page) for page in range(2, last_page + 1)))
+        return [result for result in results if result is not None]
+
+    async def fetch_series_list(
+        self, url: str, headers: Dict[str, str]
+    ) -> List[Dict[str, str]]:
+        """
+        Fetches a unique list of series names and URLs from the given site,
+        following the category's pagination.
+        """
+        try:
+            response = await self._get(url, headers)
+            first_page, last_page = self.parse_series_page(self.page_source(response))
+        except httpx.HTTPError as e:
+            log.error("Request failed", error=e)
+            return []
+        except ValueError as e:
+            log.error("Parsing error", error=e)
+            return []
+
+        pages = await self._fetch_pages(url, last_page, headers, lambda html: self.parse_series_page(html)[0])
+        return self.merge_series_pages([first_page, *pages])
+
+    async def fetch_episodes(
+        self, series_data: Dict[str, str], headers: Dict[str, str]
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Fetches the episode list from the given series URL, following its pagination.
+        """
+        try:
+            resp = await self._get(series_data["series_url"], headers)
+        except Exception as e:
+            log.error("Error fetching episodes", series=series_data["series_name"], error=e)
+            return {"name": series_data["series_name"], "episodes": []}
+
+        first_page, last_page = self.parse_episodes_page(self.page_source(resp), series_data)
+        pages = await self._fetch_pages(
+            series_data["series_url"], last_page, headers,
+            lambda html: self.parse_episodes_page(html, series_data)[0],
+        )
+        return self.merge_episode_pages(series_data["series_name"], [first_page, *pages])
+
+    async def extract_embeds(self, url: str, headers: Dict[str, str]) -> List[str]:
+        """
+        Extracts embed URLs from the given webpage based on supported player names.
+        """
+        try:
+            resp = await self._get(url, headers)
+            return self.parse_embeds(self.page_source(resp))
+        except Exception as e:
+            log.error("Error extracting embed links", url=url, error=e)
+            return []
+
+    async def extract_and_print_media_url(self, url: str, headers: Dict[str, str]) -> str:
+        """
+        Fetches a URL, extracts media URLs, and returns the most relevant one.
+        """
+        try:
+            response = await self._get(url, headers)
+            return self.parse_media_url(response.text)
+        except Exception as e:
+            log.error("Error extracting media URL", url=url, error=e)
+        return ""
+
+    async def fetch_uqload_mp4_links(self, url: str, headers: Dict[str, str]) -> str:
+        """
+        Fetches MP4 links from a given URL.
+        """
+        try:
+            response = await self._get(url, headers)
+            return self.parse_uqload_mp4(response.text)
+        except Exception as e:
+            log.error("Error fetching MP4 links", url=url, error=e)
+            return ""
+
+    async def close_session(self):
+        """
+        Closes the async HTTP client to free resources.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
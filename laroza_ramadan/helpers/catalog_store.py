@@ -0,0 +1,249 @@
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .constants import DB_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY,
+    series_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    season INTEGER NOT NULL DEFAULT 1,
+    ep_number INTEGER NOT NULL,
+    ep_url TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (series_id, season, ep_number)
+);
+CREATE INDEX IF NOT EXISTS idx_episodes_ep_number ON episodes (ep_number);
+
+CREATE TABLE IF NOT EXISTS embeds (
+    episode_id INTEGER NOT NULL REFERENCES episodes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    embed_url TEXT NOT NULL,
+    PRIMARY KEY (episode_id, embed_url)
+);
+
+CREATE TABLE IF NOT EXISTS players (
+    episode_id INTEGER NOT NULL REFERENCES episodes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    player_url TEXT NOT NULL,
+    resolved_at REAL NOT NULL,
+    PRIMARY KEY (episode_id, player_url)
+);
+"""
+
+_EPISODE_ID = """
+SELECT episodes.id FROM episodes JOIN series ON series.id = episodes.series_id
+WHERE series.name = ? AND episodes.season = ? AND episodes.ep_number = ?
+"""
+
+
+class CatalogStore:
+    """
+    SQLite storage for the crawled catalog: series, episodes, embeds and
+    resolved players.
+
+    Every stage upserts its rows in one batched transaction, and the query
+    helpers let later stages read only the rows they need instead of
+    reloading a whole JSON file.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        """
+        Opens (and creates if needed) the catalog database.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def _upsert_episode_rows(self, name: str, season: int, episodes: Iterable[Dict]) -> None:
+        now = time.time()
+        self.conn.execute(
+            "INSERT INTO series (name, updated_at) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET updated_at = excluded.updated_at",
+            (name, now),
+        )
+        self.conn.executemany(
+            "INSERT INTO episodes (series_id, season, ep_number, ep_url, updated_at) "
+            "VALUES ((SELECT id FROM series WHERE name = ?), ?, ?, ?, ?) "
+            "ON CONFLICT(series_id, season, ep_number) DO UPDATE SET "
+            "ep_url = excluded.ep_url, updated_at = excluded.updated_at",
+            [(name, season, ep["ep_number"], ep["ep_url"], now) for ep in episodes],
+        )
+
+    def upsert_series_data(self, data_eps: List[Dict], season: int = 1) -> None:
+        """
+        Stores the output of fetch_series_data in one transaction.
+
+        Args:
+            data_eps (List[Dict]): Records shaped like {"name", "episodes": [...]}.
+            season (int): The season of records without a "season" field.
+        """
+        with self.conn:
+            for item in data_eps:
+                self._upsert_episode_rows(item["name"], item.get("season", season), item["episodes"])
+
+    def upsert_embeds(self, eps_embeds: List[Dict], season: int = 1) -> None:
+        """
+        Stores the output of extract_episode_embeds in one transaction.
+
+        The embeds of each episode replace the previously stored ones; records
+        without a "season" field belong to ``season``.
+        """
+        with self.conn:
+            for record in eps_embeds:
+                record_season = record.get("season", season)
+                self._upsert_episode_rows(
+                    record["name"],
+                    record_season,
+                    [{"ep_number": record["ep_number"], "ep_url": record["last_ep_url"]}],
+                )
+                episode_id = self.conn.execute(
+                    _EPISODE_ID, (record["name"], record_season, record["ep_number"])
+                ).fetchone()[0]
+                self.conn.execute("DELETE FROM embeds WHERE episode_id = ?", (episode_id,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO embeds (episode_id, position, embed_url) VALUES (?, ?, ?)",
+                    [(episode_id, pos, url) for pos, url in enumerate(record["embeds"])],
+                )
+
+    def upsert_players(self, data_players: List[Dict]) -> None:
+        """
+        Stores resolved players in one transaction.
+
+        The players of each episode replace the previously stored ones.
+        """
+        now = time.time()
+        with self.conn:
+            for record in data_players:
+                row = self.conn.execute(
+                    _EPISODE_ID, (record["ep_name"], record["season"], record["ep_number"])
+                ).fetchone()
+                if row is None:
+                    continue
+                self.conn.execute("DELETE FROM players WHERE episode_id = ?", (row[0],))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO players (episode_id, position, player_url, resolved_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(row[0], pos, url, now) for pos, url in enumerate(record["players"])],
+                )
+
+    def series_seasons(self) -> List[tuple]:
+        """
+        Returns (series name, season) for every season with stored episodes.
+        """
+        rows = self.conn.execute(
+            "SELECT DISTINCT series.name, episodes.season FROM episodes "
+            "JOIN series ON series.id = episodes.series_id ORDER BY series.name, episodes.season"
+        )
+        return [tuple(row) for row in rows]
+
+    def episodes(self, series_name: str, season: int = 1) -> List[Dict]:
+        """
+        Returns a series' episodes, oldest first.
+        """
+        rows = self.conn.execute(
+            "SELECT episodes.ep_number, episodes.ep_url FROM episodes "
+            "JOIN series ON series.id = episodes.series_id "
+            "WHERE series.name = ? AND episodes.season = ? "
+            "ORDER BY episodes.ep_number",
+            (series_name, season),
+        )
+        return [dict(row) for row in rows]
+
+    def episodes_without_players(self) -> List[Dict]:
+        """
+        Returns episodes that have embeds but no resolved players yet, shaped
+        like extract_episode_embeds records.
+        """
+        rows = self.conn.execute(
+            "SELECT series.id AS series_id, series.name, episodes.season, episodes.ep_number, "
+            "episodes.ep_url, group_concat(embeds.embed_url, char(10)) AS embed_urls "
+            "FROM episodes "
+            "JOIN series ON series.id = episodes.series_id "
+            "JOIN embeds ON embeds.episode_id = episodes.id "
+            "WHERE NOT EXISTS (SELECT 1 FROM players WHERE players.episode_id = episodes.id) "
+            "GROUP BY episodes.id ORDER BY series.name, episodes.ep_number"
+        )
+        return [
+            {
+                "id": row["series_id"],
+                "ep_number": row["ep_number"],
+                "name": row["name"],
+                "season": row["season"],
+                "last_ep_url": row["ep_url"],
+                "embeds": row["embed_urls"].split("\n"),
+            }
+            for row in rows
+        ]
+
+    def players(self, series_name: Optional[str] = None, season: Optional[int] = None) -> List[Dict]:
+        """
+        Returns resolved players shaped like players_list.json records,
+        optionally filtered by series and season.
+        """
+        clauses, params = [], []
+        if series_name is not None:
+            clauses.append("series.name = ?")
+            params.append(series_name)
+        if season is not None:
+            clauses.append("episodes.season = ?")
+            params.append(season)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self.conn.execute(
+            "SELECT series.name, episodes.season, episodes.ep_number, players.player_url "
+            "FROM players "
+            "JOIN episodes ON episodes.id = players.episode_id "
+            "JOIN series ON series.id = episodes.series_id "
+            f"{where}ORDER BY series.name, episodes.season, episodes.ep_number, players.position",
+            params,
+        )
+
+        records: Dict[tuple, Dict] = {}
+        for row in rows:
+            key = (row["name"], row["season"], row["ep_number"])
+            record = records.setdefault(
+                key,
+                {"ep_name": row["name"], "season": row["season"], "ep_number": row["ep_number"], "players": []},
+            )
+            record["players"].append(row["player_url"])
+        return list(records.values())
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of rows in each catalog table.
+        """
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("series", "episodes", "embeds", "players")
+        }
+
+    def download_job_states(self) -> Dict[str, int]:
+        """
+        Returns the number of download jobs per state (empty before the first download).
+        """
+        try:
+            rows = self.conn.execute("SELECT state, COUNT(*) FROM download_jobs GROUP BY state")
+        except sqlite3.OperationalError:
+            return {}
+        return {state: count for state, count in rows}
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
@@ -4,4 +4,11 @@ import os
 BASE_DIR: Final = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_DIR: Final = os.path.join(BASE_DIR, "output")
 LAROZA_OUTPUT_DIR: Final = os.path.join(OUTPUT_DIR, "laroza_")
-DB_PATH: Final = os.path.join(BASE_DIR, "database.json")
\ No newline at end of file
+DB_PATH: Final = os.path.join(BASE_DIR, "database.sqlite3")
+HTTP_CACHE_DIR: Final = os.path.join(OUTPUT_DIR, "http_cache")
+HTTP_CACHE_MAX_BYTES: Final = 256 * 1024 * 1024
+WATERMARKS_PATH: Final = f"{LAROZA_OUTPUT_DIR}watermarks.json"
+RESOLVER_STATS_PATH: Final = f"{LAROZA_OUTPUT_DIR}resolver_stats.json"
+HOST_HEALTH_PATH: Final = f"{LAROZA_OUTPUT_DIR}host_health.json"
+METRICS_PATH: Final = f"{LAROZA_OUTPUT_DIR}metrics.prom"
+RUN_SUMMARY_PATH: Final = f"{LAROZA_OUTPUT_DIR}run_summary.json"
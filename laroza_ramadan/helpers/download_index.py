@@ -0,0 +1,130 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+from .constants import DB_PATH
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    series_name TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    episode INTEGER NOT NULL,
+    source_url TEXT NOT NULL,
+    filepath TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    sha256 TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    postprocess TEXT,
+    postprocess_seconds REAL,
+    PRIMARY KEY (series_name, season, episode, source_url)
+);
+"""
+
+# Columns added after the first release, created on databases that predate them.
+_ADDED_COLUMNS = {"postprocess": "TEXT", "postprocess_seconds": "REAL"}
+
+
+def file_sha256(filepath: str) -> str:
+    """
+    Computes the SHA-256 checksum of a file without loading it into memory.
+    """
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class DownloadIndex:
+    """
+    Records completed downloads keyed by (series, season, episode, source URL).
+
+    Used by download_video to skip episodes that are already on disk without
+    starting yt-dlp at all. Safe to share between the scheduler's worker threads.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        """
+        Opens (and creates if needed) the downloads table.
+
+        Args:
+            db_path (str): SQLite database holding the index.
+        """
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(INDEX_SCHEMA)
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(downloads)")}
+            for name, column_type in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE downloads ADD COLUMN {name} {column_type}")
+
+    def completed(self, series_name: str, season: int, episode: int) -> Optional[Dict]:
+        """
+        Returns the record of a completed episode whose file is still intact.
+
+        Any source counts: signed player URLs change between runs, but the
+        episode itself only needs to be downloaded once. A record whose file
+        was deleted or changed size is ignored.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM downloads WHERE series_name = ? AND season = ? AND episode = ? "
+                "ORDER BY completed_at DESC",
+                (series_name, season, episode),
+            ).fetchall()
+        for row in rows:
+            if os.path.isfile(row["filepath"]) and os.path.getsize(row["filepath"]) == row["size"]:
+                return dict(row)
+        return None
+
+    def record(
+        self,
+        series_name: str,
+        season: int,
+        episode: int,
+        source_url: str,
+        filepath: str,
+        duration: Optional[float] = None,
+        postprocess: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Records a finished download with its final size and checksum, and
+        which post-processing path it took ("none", "remux", "transcode" or
+        "skipped") and how long that took.
+        """
+        entry = {
+            "series_name": series_name,
+            "season": season,
+            "episode": episode,
+            "source_url": source_url,
+            "filepath": filepath,
+            "size": os.path.getsize(filepath),
+            "duration": duration,
+            "sha256": file_sha256(filepath),
+            "completed_at": time.time(),
+            "postprocess": postprocess["action"] if postprocess else None,
+            "postprocess_seconds": postprocess["seconds"] if postprocess else None,
+        }
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO downloads "
+                "(series_name, season, episode, source_url, filepath, size, duration, sha256, completed_at, "
+                "postprocess, postprocess_seconds) VALUES "
+                "(:series_name, :season, :episode, :source_url, :filepath, :size, :duration, :sha256, :completed_at, "
+                ":postprocess, :postprocess_seconds)",
+                entry,
+            )
+        return entry
+
+
+@lru_cache(maxsize=None)
+def get_download_index() -> DownloadIndex:
+    """
+    Returns the shared DownloadIndex, opening it on first use.
+    """
+    return DownloadIndex()
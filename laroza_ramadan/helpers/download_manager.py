@@ -1,5 +1,14 @@
-import yt_dlp
+import glob
 import os
+from urllib.parse import urlparse
+
+from .download_index import DownloadIndex, get_download_index
+from .logs import get_logger
+from .metrics import metrics
+from .postprocess import postprocess
+
+log = get_logger(__name__)
+
 
 def get_default_download_path():
     """Returns the default Downloads directory path for the current OS."""
@@ -9,9 +18,28 @@ def get_default_download_path():
     else:  # macOS & Linux
         return os.path.join(home, "Downloads")
 
-def download_video(url: str, series_name: str, output_folder: str = None, referer: str = None, season: int = 1, episode: int = 1):
+def finish_download(index: DownloadIndex, series_name: str, season: int, episode: int, url: str, filepath: str, duration: float = None) -> str:
+    """
+    Post-processes a downloaded file into an MP4 (only as much as needed) and records it in the index.
+
+    :return: The final file path.
+    """
+    metrics.inc("download_bytes_total", os.path.getsize(filepath), host=urlparse(url).netloc)
+    result = postprocess(filepath)
+    metrics.observe("postprocess_duration_seconds", result['seconds'], action=result['action'])
+    if result.get('error'):
+        log.warning("Post-processing failed", action=result['action'], filepath=filepath, error=result['error'])
+    else:
+        log.info("Post-processed", action=result['action'], seconds=round(result['seconds'], 1))
+    index.record(series_name, season, episode, url, result['filepath'], duration=duration, postprocess=result)
+    return result['filepath']
+
+def download_video(url: str, series_name: str, output_folder: str = None, referer: str = None, season: int = 1, episode: int = 1, rate_limit: int = None, index: DownloadIndex = None, native_hls: bool = True, hls_concurrency: int = 8, hls_max_bandwidth: int = None) -> bool:
     """
-    Downloads a video using yt-dlp with the highest available quality.
+    Downloads a video with the highest available quality.
+
+    M3U8 URLs go through the built-in HLS engine (parallel segment fetching);
+    everything else, and playlists the engine cannot handle, goes through yt-dlp.
 
     :param url: The video URL to download.
     :param series_name: The name of the series to include in the filename.
@@ -19,8 +47,23 @@ def download_video(url: str, series_name: str, output_folder: str = None, refere
     :param referer: The referer URL to bypass restrictions (optional).
     :param season: The season number for naming the file (default: 1).
     :param episode: The episode number for naming the file (default: 1).
+    :param rate_limit: Maximum download rate in bytes per second (optional).
+    :param index: The download index used to skip completed episodes (default: the shared index).
+    :param native_hls: Download M3U8 URLs with the built-in HLS engine (default: True).
+    :param hls_concurrency: Number of HLS segments fetched at once (default: 8).
+    :param hls_max_bandwidth: Highest HLS variant bandwidth in bits per second to pick (optional).
+    :return: True if the episode is on disk (downloaded now or earlier), False otherwise.
     """
 
+    if index is None:
+        index = get_download_index()
+
+    # Skip episodes that are already complete on disk without starting yt-dlp
+    done = index.completed(series_name, season, episode)
+    if done:
+        log.info("Already downloaded, skipping", filepath=done['filepath'])
+        return True
+
     # If output_folder is not provided, use the system's default Downloads folder
     if output_folder is None:
         output_folder = get_default_download_path()
@@ -35,30 +78,74 @@ def download_video(url: str, series_name: str, output_folder: str = None, refere
     episode_str = f"E{episode}" if episode >= 10 else f"E0{episode}"
     season_str = f"S{season:02d}"
     filename_template = f"{series_name}.{season_str}.{episode_str}.%(ext)s"
+    http_headers = {
+        'Referer': referer if referer else '',  # Add referer to bypass restrictions
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',  # Fake browser user-agent
+    }
+
+    if native_hls and urlparse(url).path.endswith('.m3u8'):
+        from .hls import HLSDownloader
+
+        downloader = HLSDownloader(
+            concurrency=hls_concurrency,
+            headers=http_headers,
+            rate_limit=rate_limit,
+            max_bandwidth=hls_max_bandwidth,
+        )
+        try:
+            filepath = downloader.download(url, os.path.join(ramadan_folder, filename_template))
+        except Exception as e:
+            # Unsupported playlists, HTTP, decryption and write errors alike: yt-dlp gets a go
+            log.warning("Native HLS download failed, falling back to yt-dlp", url=url, error=repr(e))
+        else:
+            try:
+                filepath = finish_download(index, series_name, season, episode, url, filepath)
+            except Exception as e:
+                log.error("Download failed", url=url, error=e)
+                return False
+            log.info("Download completed", filepath=filepath)
+            return True
 
     # yt-dlp options
     ydl_opts = {
         'format': 'bestvideo+bestaudio/best',  # Download best video and audio available
         'outtmpl': os.path.join(ramadan_folder, filename_template),  # Output filename format
-        'merge_output_format': 'mp4',  # Ensure the final file is in MP4 format
         'nocheckcertificate': True,  # Bypass SSL certificate verification
         'quiet': False,  # Show detailed output
         'noprogress': False,  # Display download progress
-        'postprocessors': [{'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'}],  # Ensure MP4 format after merging
-        'http_headers': {
-            'Referer': referer if referer else '',  # Add referer to bypass restrictions
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',  # Fake browser user-agent
-        }
+        'http_headers': http_headers,
     }
+    # Resuming needs no options: by default yt-dlp continues a direct file's .part with a Range
+    # request (starting over if the server ignores it). HLS resumes through the native engine.
+    if rate_limit:
+        ydl_opts['ratelimit'] = rate_limit  # Share of the overall bandwidth cap
+
+    import yt_dlp  # Imported on first download: it is slow to import and unused by other stages
 
     try:
         # Initialize yt-dlp with the options and start the download
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        print(f"✅ Download completed successfully! Saved in: {ramadan_folder}")
+            info = ydl.extract_info(url, download=True)
+            requested = info.get('requested_downloads') or [{}]
+            filepath = requested[0].get('filepath') or ydl.prepare_filename(info)
+        if not os.path.isfile(filepath):
+            # Merging or remuxing may have changed the extension yt-dlp reported
+            stem = os.path.splitext(filepath)[0]
+            candidates = [
+                path for path in glob.glob(f"{glob.escape(stem)}.*")
+                if not path.endswith(('.part', '.ytdl', '.tmp'))
+            ]
+            if not candidates:
+                log.warning("Downloaded file not found", url=url, filepath=filepath)
+                return False
+            filepath = max(candidates, key=os.path.getmtime)
+        filepath = finish_download(index, series_name, season, episode, url, filepath, duration=info.get('duration'))
+        log.info("Download completed", filepath=filepath)
+        return True
     except Exception as e:
-        # Handle errors and print the error message
-        print(f"❌ An error occurred during download: {e}")
+        # Handle errors and log the error message
+        log.error("Download failed", url=url, error=e)
+        return False
 
 # Example usage
 # url = r"https://example.com/video.mp4"
@@ -0,0 +1,287 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from .constants import DB_PATH
+from .download_index import DownloadIndex
+from .logs import get_logger
+from .metrics import metrics, trace_key
+from .retry import RetryPolicy
+
+log = get_logger(__name__)
+
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS download_jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    series_name TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    episode INTEGER NOT NULL,
+    referer TEXT,
+    host TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    retry_at REAL,
+    UNIQUE (series_name, season, episode, url)
+);
+CREATE INDEX IF NOT EXISTS idx_download_jobs_state ON download_jobs (state, priority);
+"""
+
+# Columns added after the first release, created on databases that predate them.
+_ADDED_COLUMNS = {"retry_at": "REAL"}
+
+
+@dataclass
+class DownloadJob:
+    url: str
+    series_name: str
+    season: int = 1
+    episode: int = 1
+    referer: Optional[str] = None
+    priority: int = 0  # Higher runs first
+    id: Optional[int] = None
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.url).netloc
+
+
+class DownloadScheduler:
+    """
+    Runs download jobs in parallel on a worker pool.
+
+    Jobs are persisted in a ``download_jobs`` table so an interrupted batch
+    picks up where it stopped. Dispatch honours priority, a global slot
+    count, a per-host slot count and an overall bandwidth cap that is split
+    between the running downloads. A failed job waits out a jittered
+    exponential backoff before its next attempt, and an episode marked done
+    is queued again when its file is no longer on disk.
+
+    Jobs may be enqueued from another thread while ``run`` is going, which is
+    how the streaming pipeline starts downloads before the crawl is over.
+    """
+
+    def __init__(
+        self,
+        download: Callable[..., bool],
+        slots: int = 3,
+        per_host_slots: int = 2,
+        bandwidth_limit: Optional[int] = None,
+        max_attempts: int = 3,
+        db_path: str = DB_PATH,
+        retry_policy: Optional[RetryPolicy] = None,
+        index: Optional[DownloadIndex] = None,
+    ):
+        """
+        Initializes the scheduler and recovers jobs left running by a crash.
+
+        Args:
+            download (Callable[..., bool]): Function performing one download,
+                called like download_video and returning True on success.
+            slots (int): Number of downloads running at once.
+            per_host_slots (int): Number of downloads running at once per host.
+            bandwidth_limit (Optional[int]): Overall cap in bytes per second.
+            max_attempts (int): Attempts before a job is marked as failed.
+            db_path (str): SQLite database holding the job state table.
+            retry_policy (Optional[RetryPolicy]): Backoff between the attempts of a job.
+            index (Optional[DownloadIndex]): Completed downloads, to find done jobs whose file is gone.
+        """
+        self.download = download
+        self.slots = slots
+        self.per_host_slots = per_host_slots
+        self.bandwidth_limit = bandwidth_limit
+        self.max_attempts = max_attempts
+        self.retry_policy = retry_policy or RetryPolicy(backoff_base=10.0, backoff_max=600.0)
+        self.index = index or DownloadIndex(db_path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(JOBS_SCHEMA)
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(download_jobs)")}
+            for name, column_type in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE download_jobs ADD COLUMN {name} {column_type}")
+            self.conn.execute("UPDATE download_jobs SET state = 'pending' WHERE state = 'running'")
+
+    def enqueue(self, jobs: List[DownloadJob]) -> None:
+        """
+        Adds jobs to the queue, one per episode. Signed media URLs change
+        between runs, so a new job replaces the episode's pending or failed
+        jobs (and their expired URLs) instead of queuing next to them. An
+        episode downloading, or downloaded with its file still on disk, is not
+        queued again; failed jobs (and done jobs whose file was deleted) get a
+        fresh set of attempts.
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            for job in jobs:
+                episode = (job.series_name, job.season, job.episode)
+                row = self.conn.execute(
+                    "SELECT state FROM download_jobs WHERE series_name = ? AND season = ? AND episode = ? "
+                    "AND state IN ('done', 'running')",
+                    episode,
+                ).fetchone()
+                if row is not None and (row["state"] == "running" or self.index.completed(*episode)):
+                    continue
+                self.conn.execute(
+                    "DELETE FROM download_jobs WHERE series_name = ? AND season = ? AND episode = ? AND url != ?",
+                    (*episode, job.url),
+                )
+                self.conn.execute(
+                    "INSERT INTO download_jobs (url, series_name, season, episode, referer, host, priority, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(series_name, season, episode, url) DO UPDATE SET priority = excluded.priority, "
+                    "referer = excluded.referer, updated_at = excluded.updated_at, "
+                    "attempts = CASE WHEN state IN ('failed', 'done') THEN 0 ELSE attempts END, "
+                    "retry_at = CASE WHEN state IN ('failed', 'done') THEN NULL ELSE retry_at END, "
+                    "state = CASE WHEN state IN ('failed', 'done') THEN 'pending' ELSE state END",
+                    (job.url, *episode, job.referer, job.host, job.priority, now),
+                )
+
+    def _set_state(
+        self, job_id: int, state: str, error: Optional[str] = None, retry_at: Optional[float] = None
+    ) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE download_jobs SET state = ?, error = ?, updated_at = ?, retry_at = ?, "
+                "attempts = attempts + (? = 'running') WHERE id = ?",
+                (state, error, time.time(), retry_at, state, job_id),
+            )
+
+    def _pending_jobs(self) -> List[DownloadJob]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, url, series_name, season, episode, referer, priority FROM download_jobs "
+                "WHERE state = 'pending' AND (retry_at IS NULL OR retry_at <= ?) ORDER BY priority DESC, id",
+                (time.time(),),
+            ).fetchall()
+        return [DownloadJob(**dict(row)) for row in rows]
+
+    def _retry_delay(self) -> Optional[float]:
+        """
+        Returns the seconds until the next backed-off job may run, or None if none is waiting.
+        """
+        with self._lock:
+            retry_at = self.conn.execute(
+                "SELECT MIN(retry_at) FROM download_jobs WHERE state = 'pending' AND retry_at > ?", (time.time(),)
+            ).fetchone()[0]
+        return None if retry_at is None else max(retry_at - time.time(), 0.0)
+
+    def _next_job(self, running_hosts: Dict[str, int], taken: set) -> Optional[DownloadJob]:
+        for job in self._pending_jobs():
+            if job.id not in taken and running_hosts.get(job.host, 0) < self.per_host_slots:
+                return job
+        return None
+
+    def _rate_limit(self, concurrent: int) -> Optional[int]:
+        """
+        Returns the share of the bandwidth cap of a download starting next to
+        ``concurrent - 1`` others.
+        """
+        if not self.bandwidth_limit:
+            return None
+        return max(self.bandwidth_limit // max(concurrent, 1), 1)
+
+    def _run_job(self, job: DownloadJob, rate_limit: Optional[int]) -> bool:
+        with metrics.span("download", trace=trace_key(job.series_name, job.season, job.episode), host=job.host) as span:
+            ok = self.download(
+                job.url,
+                job.series_name,
+                referer=job.referer,
+                season=job.season,
+                episode=job.episode,
+                rate_limit=rate_limit,
+            )
+            if not ok:
+                span.status = "failed"
+            return ok
+
+    def run(self, until: Optional[threading.Event] = None, poll_interval: float = 1.0) -> Dict[str, int]:
+        """
+        Runs until no pending job can be dispatched.
+
+        Args:
+            until (Optional[threading.Event]): When given, keeps waiting for newly
+                enqueued jobs until the event is set, then drains the queue.
+            poll_interval (float): Seconds between checks for new jobs while waiting.
+
+        Returns:
+            Dict[str, int]: Number of jobs per state after the run.
+        """
+        running: Dict[Future, DownloadJob] = {}
+        running_hosts: Dict[str, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.slots) as pool:
+            while True:
+                # Read before dispatching: jobs enqueued before the event was set are still picked up.
+                producer_done = until is None or until.is_set()
+                while len(running) < self.slots:
+                    job = self._next_job(running_hosts, {j.id for j in running.values()})
+                    if job is None:
+                        break
+                    self._set_state(job.id, "running")
+                    running_hosts[job.host] = running_hosts.get(job.host, 0) + 1
+                    # yt-dlp fixes a download's rate limit when it starts, so the cap is split
+                    # between the downloads that will run alongside this one: those running and
+                    # the ones still queued, up to the slot count.
+                    concurrent = min(self.slots, len(running) + 1 + len(self._pending_jobs()))
+                    running[pool.submit(self._run_job, job, self._rate_limit(concurrent))] = job
+                    log.info("Download started", series=job.series_name, season=job.season, episode=job.episode, host=job.host)
+
+                retry_in = self._retry_delay()
+                if not running:
+                    if retry_in is None and producer_done:
+                        break
+                    if until is None:
+                        time.sleep(retry_in)
+                    else:
+                        until.wait(poll_interval if retry_in is None else min(retry_in, poll_interval))
+                    continue
+
+                timeouts = [t for t in (retry_in, None if until is None else poll_interval) if t is not None]
+                done, _ = wait(running, timeout=min(timeouts, default=None), return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    running_hosts[job.host] -= 1
+                    try:
+                        ok, error = bool(future.result()), None
+                    except Exception as e:
+                        ok, error = False, str(e)
+                    if ok:
+                        self._set_state(job.id, "done")
+                    else:
+                        with self._lock:
+                            attempts = self.conn.execute(
+                                "SELECT attempts FROM download_jobs WHERE id = ?", (job.id,)
+                            ).fetchone()[0]
+                        if attempts >= self.max_attempts:
+                            self._set_state(job.id, "failed", error or "download failed")
+                        else:
+                            # Retried after a backoff, so a host that is down is not hammered.
+                            delay = self.retry_policy.backoff(attempts - 1)
+                            self._set_state(job.id, "pending", error or "download failed", time.time() + delay)
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Returns the number of jobs in each state.
+        """
+        with self._lock:
+            rows = self.conn.execute("SELECT state, COUNT(*) FROM download_jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self) -> None:
+        """
+        Closes the job state database connection.
+        """
+        self.conn.close()
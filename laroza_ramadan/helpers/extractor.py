@@ -0,0 +1,142 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+# One pattern for every media URL, including JSON-escaped `https:\/\/` ones.
+# The URL stops at quotes, whitespace and markup, so JSON/JS delimiters such
+# as `"}],` never leak into a match.
+MEDIA_URL_RE = re.compile(
+    r"""https?:\\?/\\?/[^\s"'<>]+?\.(?P<ext>mp4|m3u8)(?![\w.-])(?P<query>\?[^\s"'<>]*)?"""
+)
+# Quality hints such as `_720p`, `/1080/` or `-480.mp4` in the URL path.
+QUALITY_RE = re.compile(r"(?<![\d])(2160|1440|1080|720|480|360|240)p?(?![\d])")
+PACKER_MARK = "eval(function(p,a,c,k,e,"
+# Dean Edwards' packer: eval(function(p,a,c,k,e,d){...}('payload',base,count,'sym|bols'.split('|')
+PACKED_RE = re.compile(
+    r"""eval\(function\(p,a,c,k,e,[dr]\).*?\}\(\s*'(?P<payload>(?:[^'\\]|\\.)*)'\s*,\s*(?P<base>\d+)\s*,"""
+    r"""\s*(?P<count>\d+)\s*,\s*'(?P<symbols>(?:[^'\\]|\\.)*)'\.split\('\|'\)""",
+    re.S,
+)
+WORD_RE = re.compile(r"\b\w+\b")
+
+_BASE62 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+@dataclass(frozen=True)
+class MediaUrl:
+    url: str
+    kind: str  # "m3u8", "m3u8_query" (signed/parameterized playlist) or "mp4"
+    quality: Optional[int] = None
+
+
+def _classify(match: re.Match) -> MediaUrl:
+    url = match.group(0)
+    if "\\" in url:
+        url = url.replace("\\/", "/")
+    if match.group("ext") == "mp4":
+        kind = "mp4"
+    else:
+        kind = "m3u8_query" if match.group("query") else "m3u8"
+    quality = QUALITY_RE.findall(url.split("?", 1)[0])
+    return MediaUrl(url, kind, int(quality[-1]) if quality else None)
+
+
+def _base_n(number: int, base: int) -> str:
+    if number == 0:
+        return "0"
+    digits = []
+    while number:
+        number, rem = divmod(number, base)
+        digits.append(_BASE62[rem])
+    return "".join(reversed(digits))
+
+
+def _iter_unpacked(text: str) -> Iterator[str]:
+    # str.find locates the packer far faster than letting the regex scan the page.
+    pos = text.find(PACKER_MARK)
+    while pos != -1:
+        match = PACKED_RE.match(text, pos)
+        if match is None:
+            pos = text.find(PACKER_MARK, pos + 1)
+            continue
+        pos = text.find(PACKER_MARK, match.end())
+
+        base, count = int(match.group("base")), int(match.group("count"))
+        if not 2 <= base <= 62:
+            continue
+        symbols = match.group("symbols").split("|")
+        table = {}
+        for index in range(min(count, len(symbols))):
+            key = _base_n(index, base)
+            table[key] = symbols[index] or key
+        payload = match.group("payload").replace("\\'", "'").replace("\\\\", "\\")
+        yield WORD_RE.sub(lambda word: table.get(word.group(0), word.group(0)), payload)
+
+
+def unpack(text: str) -> List[str]:
+    """
+    Decodes every `eval(function(p,a,c,k,e,d)` packed script found in the text.
+
+    Args:
+        text (str): A player page.
+
+    Returns:
+        List[str]: The unpacked scripts, in page order (empty if none).
+    """
+    return list(_iter_unpacked(text))
+
+
+def iter_media_urls(text: str) -> Iterator[MediaUrl]:
+    """
+    Yields every mp4/m3u8 URL of a player page in a single pass, the plain
+    page first and then any packed scripts.
+
+    Being a generator, callers that stop at the first good match never scan
+    (or unpack) the rest of the page.
+    """
+    for match in MEDIA_URL_RE.finditer(text):
+        yield _classify(match)
+    for script in _iter_unpacked(text):
+        for match in MEDIA_URL_RE.finditer(script):
+            yield _classify(match)
+
+
+def classify_media_urls(text: str) -> Dict[str, List[MediaUrl]]:
+    """
+    Groups every media URL of a page by kind: "m3u8", "m3u8_query" and "mp4".
+    """
+    groups: Dict[str, List[MediaUrl]] = {"m3u8": [], "m3u8_query": [], "mp4": []}
+    seen = set()
+    for media in iter_media_urls(text):
+        if media.url not in seen:
+            seen.add(media.url)
+            groups[media.kind].append(media)
+    return groups
+
+
+def find_m3u8(text: str) -> str:
+    """
+    Returns the preferred M3U8 URL of a player page, or "".
+
+    A plain playlist URL wins and stops the scan; otherwise the first
+    parameterized (signed) playlist is returned.
+    """
+    fallback = ""
+    for media in iter_media_urls(text):
+        if media.kind == "m3u8":
+            return media.url
+        if media.kind == "m3u8_query" and not fallback:
+            fallback = media.url
+    return fallback
+
+
+def find_mp4(text: str, suffix: str = "v.mp4") -> str:
+    """
+    Returns the first MP4 URL whose path ends with ``suffix`` (uqload serves
+    its video as `.../v.mp4`), or "".
+    """
+    for media in iter_media_urls(text):
+        if media.kind == "mp4" and media.url.split("?", 1)[0].endswith(suffix):
+            return media.url
+    return ""
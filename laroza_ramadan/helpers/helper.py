@@ -1,7 +1,12 @@
 import re
-from typing import Optional
+from typing import Dict, Iterator, Optional
 from urllib.parse import urlparse
 
+from .logs import get_logger
+from .output_formats import FORMATS, JSONFormat, load_json
+
+log = get_logger(__name__)
+
 
 def get_domain(url: str) -> str:
     """
@@ -24,22 +29,17 @@ def get_domain(url: str) -> str:
     return f"{parsed_url.scheme}://{parsed_url.netloc}"
 
 
-
-import json
-
-
-def save_to_json(data: list, filename: str) -> None:
+def save_to_json(data: list, filename: str, indent: Optional[int] = 4) -> None:
     """
-    Saves the given data to a JSON file.
+    Saves the given data to a JSON file, atomically (temporary file, then rename).
 
     Args:
         data (list): The data to save.
         filename (str): The name of the JSON file.
+        indent (Optional[int]): Indentation, or None for compact JSON.
     """
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-        print()
-        print(f"{filename} created is done !")
+    JSONFormat(indent).write(data, filename)
+    log.info("Saved JSON file", filename=filename, records=len(data))
 
 
 
@@ -54,14 +54,32 @@ def read_data_from_json_file(filename: str) -> dict:
         The parsed JSON data as a dictionary, or None if an error occurs.
     """
     try:
-        with open(f"{filename}", encoding='utf-8') as f:
-            data = json.load(f)
-            return data
+        return load_json(filename)
     except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
+        log.error("File not found", filename=filename)
         return None
 
 
+def append_ndjson(record: dict, filename: str) -> None:
+    """
+    Appends one record as a JSON line and flushes it to disk, so a crash
+    loses at most the line being written.
+
+    Args:
+        record (dict): The record to append.
+        filename (str): The NDJSON file.
+    """
+    FORMATS["ndjson"].append(record, filename)
+
+
+def read_ndjson(filename: str) -> Iterator[Dict]:
+    """
+    Yields the records of an NDJSON file one at a time, skipping a torn last
+    line left by a crash. Yields nothing if the file does not exist.
+    """
+    return FORMATS["ndjson"].read(filename)
+
+
 def vk_extract_url(original_url: str) -> Optional[str]:
     """
     Extracts the URL of the format 'https://vk.com/video<numeric>_<numeric>' 
@@ -87,5 +105,5 @@ def vk_extract_url(original_url: str) -> Optional[str]:
         else:
             return None
     except Exception as e:
-        print(f"An error occurred: {e}")
+        log.error("Could not extract the VK video URL", url=original_url, error=e)
         return None
\ No newline at end of file
@@ -0,0 +1,369 @@
+import asyncio
+import contextlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from .logs import get_logger
+from .rate_limit import TokenBucket
+from .retry import CrawlDeadline, RetryPolicy
+from .transport import SharedTransport, shared_transport
+
+log = get_logger(__name__)
+
+
+# KEY=VALUE pairs of an #EXT-X-... tag; quoted values may contain commas.
+ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+class UnsupportedPlaylistError(ValueError):
+    """
+    Raised for playlists the native engine cannot download (e.g. SAMPLE-AES),
+    so the caller can fall back to yt-dlp.
+    """
+
+
+@dataclass
+class Variant:
+    url: str
+    bandwidth: int = 0
+    resolution: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class SegmentKey:
+    method: str
+    uri: str
+    iv: Optional[bytes] = None
+
+
+@dataclass
+class Segment:
+    url: str
+    sequence: int
+    key: Optional[SegmentKey] = None
+
+
+@dataclass
+class MediaPlaylist:
+    segments: List[Segment] = field(default_factory=list)
+    init_url: Optional[str] = None  # EXT-X-MAP, present for fragmented MP4 streams
+
+    @property
+    def extension(self) -> str:
+        return "mp4" if self.init_url else "ts"
+
+
+def parse_attributes(line: str) -> Dict[str, str]:
+    """
+    Parses the attribute list of an HLS tag line into a dict.
+    """
+    _, _, attributes = line.partition(":")
+    return {key: value.strip('"') for key, value in ATTRIBUTE_RE.findall(attributes)}
+
+
+def is_master_playlist(text: str) -> bool:
+    return "#EXT-X-STREAM-INF" in text
+
+
+def parse_master_playlist(text: str, base_url: str) -> List[Variant]:
+    """
+    Returns the variants of a master playlist with absolute URLs.
+    """
+    variants: List[Variant] = []
+    attributes: Optional[Dict[str, str]] = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF"):
+            attributes = parse_attributes(line)
+        elif line and not line.startswith("#") and attributes is not None:
+            resolution = attributes.get("RESOLUTION", "")
+            width, _, height = resolution.partition("x")
+            variants.append(
+                Variant(
+                    url=urljoin(base_url, line),
+                    bandwidth=int(attributes.get("BANDWIDTH", 0) or 0),
+                    resolution=(int(width), int(height)) if width.isdigit() and height.isdigit() else None,
+                )
+            )
+            attributes = None
+    return variants
+
+
+def parse_media_playlist(text: str, base_url: str) -> MediaPlaylist:
+    """
+    Parses a media playlist into its segments, keeping track of the active
+    encryption key and the media sequence number of every segment.
+
+    Raises:
+        UnsupportedPlaylistError: For encryption methods other than AES-128 or byte-range segments.
+    """
+    playlist = MediaPlaylist()
+    sequence = 0
+    key: Optional[SegmentKey] = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE"):
+            sequence = int(line.partition(":")[2])
+        elif line.startswith("#EXT-X-KEY"):
+            attributes = parse_attributes(line)
+            method = attributes.get("METHOD", "NONE")
+            if method == "NONE":
+                key = None
+            elif method == "AES-128":
+                iv = attributes.get("IV")
+                key = SegmentKey(
+                    method=method,
+                    uri=urljoin(base_url, attributes["URI"]),
+                    iv=bytes.fromhex(iv[2:] if iv.lower().startswith("0x") else iv) if iv else None,
+                )
+            else:
+                raise UnsupportedPlaylistError(f"Unsupported HLS encryption method: {method}")
+        elif line.startswith("#EXT-X-MAP"):
+            playlist.init_url = urljoin(base_url, parse_attributes(line)["URI"])
+        elif line.startswith("#EXT-X-BYTERANGE"):
+            raise UnsupportedPlaylistError("Byte-range HLS segments are not supported")
+        elif line and not line.startswith("#"):
+            playlist.segments.append(Segment(url=urljoin(base_url, line), sequence=sequence, key=key))
+            sequence += 1
+    return playlist
+
+
+def choose_variant(variants: List[Variant], max_bandwidth: Optional[int] = None) -> Variant:
+    """
+    Picks the highest-bandwidth variant, not above ``max_bandwidth`` when
+    given (falling back to the lowest one if every variant is above it).
+    """
+    ordered = sorted(variants, key=lambda variant: variant.bandwidth)
+    if max_bandwidth is not None:
+        allowed = [variant for variant in ordered if variant.bandwidth <= max_bandwidth]
+        return allowed[-1] if allowed else ordered[0]
+    return ordered[-1]
+
+
+def decrypt_segment(data: bytes, key: bytes, iv: bytes) -> bytes:
+    """
+    Decrypts an AES-128-CBC segment and strips its PKCS#7 padding.
+    """
+    # yt-dlp ships AES; it uses the native pycryptodomex pinned in pyproject.toml, and a much
+    # slower pure-Python cipher if that package is missing.
+    from yt_dlp.aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+
+    return unpad_pkcs7(aes_cbc_decrypt_bytes(data, key, iv))
+
+
+def resume_point(part_path: str, progress_path: str, segment_count: int) -> Tuple[int, int]:
+    """
+    Returns (complete segments, their byte length) of a previous attempt at
+    the same playlist, or (0, 0) if there is nothing to resume.
+    """
+    try:
+        with open(progress_path, encoding="utf-8") as f:
+            progress = json.load(f)
+        size = os.path.getsize(part_path)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+    # Another variant or playlist, or a part file shorter than recorded: start over.
+    if progress.get("segments") != segment_count or not 0 < progress.get("bytes", 0) <= size:
+        return 0, 0
+    return progress["written"], progress["bytes"]
+
+
+def save_progress(progress_path: str, segment_count: int, written: int, size: int) -> None:
+    """
+    Records that the first ``written`` segments (``size`` bytes) of the part file are complete.
+    """
+    tmp_path = f"{progress_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"segments": segment_count, "written": written, "bytes": size}, f)
+    os.replace(tmp_path, progress_path)
+
+
+class HLSDownloader:
+    """
+    Downloads an HLS stream by fetching its segments concurrently over one
+    pooled client and writing them, in order, straight to the output file.
+
+    Requests go through the shared transport, so the playlist, key and
+    segment requests of every download reuse the same pooled connections.
+    Segments complete out of order; a reorder buffer of at most ``window``
+    segments holds them until every earlier segment has been written, so
+    memory stays bounded however slow a single segment is. Nothing is
+    re-encoded: MPEG-TS segments are concatenated into a .ts file and
+    fragmented MP4 streams into an .mp4 file.
+
+    Segments are written to ``<output>.part``, and a ``.progress`` file next
+    to it records how many segments (and bytes) are complete. An interrupted
+    download resumes after the last complete segment instead of starting over.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        window: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limit: Optional[int] = None,
+        max_bandwidth: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: float = 30.0,
+        transport: SharedTransport = shared_transport,
+    ):
+        """
+        Args:
+            concurrency (int): Segments fetched at once.
+            window (Optional[int]): Most segments held in the reorder buffer (default 4 × concurrency).
+            headers (Optional[Dict[str, str]]): Headers sent with every request (Referer, User-Agent).
+            rate_limit (Optional[int]): Download cap in bytes per second.
+            max_bandwidth (Optional[int]): Highest variant BANDWIDTH to pick from a master playlist.
+            retry_policy (Optional[RetryPolicy]): Retries for playlist, key and segment requests.
+            timeout (float): Per-request timeout in seconds.
+            transport (SharedTransport): Connection pools shared with the scrapers.
+        """
+        self.concurrency = concurrency
+        self.window = window or concurrency * 4
+        self.headers = headers or {}
+        self.rate_limit = rate_limit
+        self.max_bandwidth = max_bandwidth
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+        self.transport = transport
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        deadline = CrawlDeadline()
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(url)
+            except httpx.TransportError:
+                delay = self.retry_policy.next_delay(deadline, "GET", attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.next_delay(deadline, "GET", attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def fetch_playlist(self, client: httpx.AsyncClient, url: str) -> MediaPlaylist:
+        """
+        Fetches a playlist, following a master playlist to its chosen variant.
+        """
+        response = await self._fetch(client, url)
+        text, base_url = response.text, str(response.url)
+        if is_master_playlist(text):
+            variants = parse_master_playlist(text, base_url)
+            if not variants:
+                raise UnsupportedPlaylistError(f"Master playlist without variants: {url}")
+            variant = choose_variant(variants, self.max_bandwidth)
+            log.info("HLS variant", resolution=variant.resolution or "?", bandwidth=variant.bandwidth)
+            response = await self._fetch(client, variant.url)
+            text, base_url = response.text, str(response.url)
+        playlist = parse_media_playlist(text, base_url)
+        if not playlist.segments:
+            raise UnsupportedPlaylistError(f"Playlist without segments: {url}")
+        return playlist
+
+    async def _download(self, url: str, outtmpl: str) -> str:
+        async with self.transport.async_client(
+            headers=self.headers, follow_redirects=True, timeout=self.timeout
+        ) as client:
+            playlist = await self.fetch_playlist(client, url)
+            segments = playlist.segments
+            output_path = outtmpl.replace("%(ext)s", playlist.extension)
+            part_path = f"{output_path}.part"
+            progress_path = f"{part_path}.progress"
+            done, offset = resume_point(part_path, progress_path, len(segments))
+            if done:
+                log.info("Resuming HLS download", segments_done=done, segments=len(segments))
+
+            keys: Dict[str, asyncio.Task] = {}
+            bucket = TokenBucket(self.rate_limit, self.rate_limit) if self.rate_limit else None
+            pending: Dict[int, bytes] = {}
+            buffer_changed = asyncio.Condition()
+            indexes = iter(range(done, len(segments)))
+            written = done
+            total_bytes = 0
+            start = time.perf_counter()
+
+            async def segment_data(segment: Segment) -> bytes:
+                data = (await self._fetch(client, segment.url)).content
+                if segment.key is None:
+                    return data
+                if segment.key.uri not in keys:
+                    keys[segment.key.uri] = asyncio.ensure_future(self._fetch(client, segment.key.uri))
+                key = (await keys[segment.key.uri]).content
+                iv = segment.key.iv or segment.sequence.to_bytes(16, "big")
+                return decrypt_segment(data, key, iv)
+
+            async def worker(out) -> None:
+                nonlocal written, total_bytes
+                # Indexes are handed out in order, so the segment due next is never held back by the window.
+                for index in indexes:
+                    async with buffer_changed:
+                        await buffer_changed.wait_for(lambda: index < written + self.window)
+                    data = await segment_data(segments[index])
+                    if bucket:
+                        await asyncio.sleep(bucket.reserve(len(data)))
+                    async with buffer_changed:
+                        pending[index] = data
+                        if written in pending:
+                            while written in pending:
+                                chunk = pending.pop(written)
+                                out.write(chunk)
+                                total_bytes += len(chunk)
+                                written += 1
+                            out.flush()
+                            save_progress(progress_path, len(segments), written, out.tell())
+                        buffer_changed.notify_all()
+
+            if done:
+                # Drop whatever follows the last complete segment (a segment torn by the interruption).
+                os.truncate(part_path, offset)
+            with open(part_path, "ab" if done else "wb") as out:
+                if playlist.init_url and not done:
+                    out.write((await self._fetch(client, playlist.init_url)).content)
+                try:
+                    async with asyncio.TaskGroup() as group:
+                        for _ in range(min(self.concurrency, len(segments))):
+                            group.create_task(worker(out))
+                except ExceptionGroup as errors:
+                    # Surface the first failure as-is (e.g. httpx.HTTPStatusError) for the caller.
+                    raise errors.exceptions[0]
+            os.replace(part_path, output_path)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(progress_path)
+
+        elapsed = time.perf_counter() - start
+        log.info(
+            "HLS download completed",
+            segments=len(segments),
+            mb=round(total_bytes / 1e6, 1),
+            seconds=round(elapsed, 1),
+            mb_per_s=round(total_bytes / 1e6 / max(elapsed, 1e-9), 1),
+        )
+        return output_path
+
+    def download(self, url: str, outtmpl: str) -> str:
+        """
+        Downloads an HLS stream to a file.
+
+        Args:
+            url (str): Master or media playlist URL.
+            outtmpl (str): Output path where ``%(ext)s`` becomes "ts" or "mp4".
+
+        Returns:
+            str: The path of the written file.
+
+        Raises:
+            UnsupportedPlaylistError: If the playlist needs features the engine lacks.
+            httpx.HTTPError: If a playlist, key or segment cannot be fetched.
+        """
+        return self.transport.run(self._download(url, outtmpl))
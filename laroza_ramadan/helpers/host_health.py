@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from .constants import HOST_HEALTH_PATH
+from .logs import get_logger
+
+log = get_logger(__name__)
+
+
+class CircuitOpenError(httpx.RequestError):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+    """
+
+
+class HostHealth:
+    """
+    Per-host health stats with a circuit breaker.
+
+    Every request the scrapers make is recorded here (latency, success,
+    last failure). The error rate covers the last ``window`` outcomes only,
+    so a host that recovers climbs back in the ranking. After ``failure_threshold`` consecutive failures a host's
+    circuit opens and requests to it are refused for ``cooldown`` seconds;
+    once the cooldown has passed requests go through again, and the next
+    success closes the circuit while the next failure re-opens it. Stats are
+    persisted so a dead host starts the next run already deprioritized.
+
+    Exempt hosts (the catalog site itself) are tracked but never refused:
+    the whole crawl depends on them, so they rely on the retry policy alone.
+    """
+
+    def __init__(
+        self,
+        path: str = HOST_HEALTH_PATH,
+        failure_threshold: int = 3,
+        cooldown: float = 600.0,
+        window: int = 200,
+        exempt_hosts: Iterable[str] = (),
+    ):
+        """
+        Initializes the tracker and loads the stats of previous runs.
+
+        Args:
+            path (str): JSON file where the stats are persisted.
+            failure_threshold (int): Consecutive failures that open a circuit.
+            cooldown (float): Seconds an open circuit refuses requests.
+            window (int): Number of latency samples and outcomes kept per host.
+            exempt_hosts (Iterable[str]): Hosts whose circuit never opens.
+        """
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.window = window
+        self.exempt_hosts = set(exempt_hosts)
+        self.hosts: Dict[str, Dict] = {}
+        # The sync scraper records from its page threads.
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                for host, stats in json.load(f).items():
+                    stats["latencies"] = deque(stats["latencies"], maxlen=window)
+                    stats["outcomes"] = deque(stats.get("outcomes", ()), maxlen=window)
+                    self.hosts[host] = stats
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def _stats(self, host: str) -> Dict:
+        if host not in self.hosts:
+            self.hosts[host] = {
+                "requests": 0,
+                "errors": 0,
+                "consecutive_failures": 0,
+                "opened_at": None,
+                "last_failure": None,
+                "last_error": None,
+                "latencies": deque(maxlen=self.window),
+                "outcomes": deque(maxlen=self.window),  # 1 per failure, 0 per success
+            }
+        return self.hosts[host]
+
+    def allow(self, host: str) -> bool:
+        """
+        Returns False while the host's circuit is open.
+        """
+        if host in self.exempt_hosts:
+            return True
+        stats = self.hosts.get(host)
+        if not stats or stats["opened_at"] is None:
+            return True
+        return time.time() - stats["opened_at"] >= self.cooldown
+
+    def record(self, host: str, ok: bool, latency: float, error: Optional[str] = None) -> None:
+        """
+        Records the outcome of one request and opens or closes the circuit.
+        """
+        with self._lock:
+            stats = self._stats(host)
+            stats["requests"] += 1
+            stats["latencies"].append(latency)
+            stats["outcomes"].append(0 if ok else 1)
+            if ok:
+                stats["consecutive_failures"] = 0
+                stats["opened_at"] = None
+                return
+
+            stats["errors"] += 1
+            stats["consecutive_failures"] += 1
+            stats["last_failure"] = time.time()
+            stats["last_error"] = error
+            if stats["consecutive_failures"] >= self.failure_threshold and host not in self.exempt_hosts:
+                if stats["opened_at"] is None:
+                    log.warning("Circuit opened", host=host, failures=stats['consecutive_failures'], error=error)
+                stats["opened_at"] = time.time()
+
+    def check(self, host: str) -> None:
+        """
+        Raises CircuitOpenError if the host's circuit is open.
+        """
+        if not self.allow(host):
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request.")
+
+    def error_rate(self, host: str) -> float:
+        """
+        Returns the fraction of failed requests among a host's last ``window``
+        requests (0.0 if unseen).
+        """
+        stats = self.hosts.get(host)
+        outcomes = stats["outcomes"] if stats else ()
+        return sum(outcomes) / len(outcomes) if outcomes else 0.0
+
+    def percentile(self, host: str, pct: float) -> Optional[float]:
+        """
+        Returns a latency percentile in seconds over the recent samples.
+        """
+        stats = self.hosts.get(host)
+        if not stats or not stats["latencies"]:
+            return None
+        samples = sorted(stats["latencies"])
+        return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns p50/p90/p99 latency, error rate and circuit state per host.
+        """
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self.hosts.items()}
+        return {
+            host: {
+                "requests": stats["requests"],
+                "error_rate": round(self.error_rate(host), 3),
+                "p50": self.percentile(host, 50),
+                "p90": self.percentile(host, 90),
+                "p99": self.percentile(host, 99),
+                "circuit": "open" if not self.allow(host) else "closed",
+                "last_error": stats["last_error"],
+            }
+            for host, stats in hosts.items()
+        }
+
+    def save(self) -> None:
+        """
+        Persists the stats for the next run.
+        """
+        with self._lock:
+            data = {
+                host: {**stats, "latencies": list(stats["latencies"]), "outcomes": list(stats["outcomes"])}
+                for host, stats in self.hosts.items()
+            }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+
+host_health = HostHealth()
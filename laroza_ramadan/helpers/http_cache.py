@@ -0,0 +1,297 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .constants import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+from .logs import get_logger
+
+log = get_logger(__name__)
+
+
+# (url regex, ttl in seconds) — first match wins, unmatched URLs are not cached.
+DEFAULT_TTL_RULES: List[Tuple[str, int]] = [
+    (r"/play\.php", 3 * 24 * 60 * 60),  # WatchList embeds rarely change once published
+    (r"/category\.php", 10 * 60),  # Category and series listings gain new episodes
+    (r"/video\.php", 10 * 60),
+]
+
+# Only headers that remain valid for the decoded body we store on disk.
+_STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class ResponseCache:
+    """
+    A persistent, size-bounded LRU cache of response bodies keyed by URL.
+
+    Bodies live in one file per URL inside ``cache_dir``; metadata (ETag,
+    Last-Modified, store/access times) is kept in ``index.json``, rewritten
+    every ``flush_every`` changes, on report() and at exit. Entries
+    younger than their URL's TTL are served without touching the network,
+    older ones are revalidated with If-None-Match / If-Modified-Since.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = HTTP_CACHE_DIR,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        ttl_rules: Optional[List[Tuple[str, int]]] = None,
+        flush_every: int = 100,
+    ):
+        """
+        Initializes the cache and loads the existing index from disk.
+
+        Args:
+            cache_dir (str): Directory holding the index and cached bodies.
+            max_bytes (int): Total body size above which LRU entries are evicted.
+            ttl_rules (List[Tuple[str, int]]): (url regex, ttl seconds) pairs.
+            flush_every (int): Index changes kept in memory before index.json is rewritten.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self.ttl_rules = [
+            (re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or DEFAULT_TTL_RULES)
+        ]
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stored": 0,
+            "evicted": 0,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index_path = os.path.join(self.cache_dir, "index.json")
+        self._entries: "OrderedDict[str, Dict]" = self._load_index()
+        # The sync scraper fetches the pages of a listing from several threads.
+        self._lock = threading.RLock()
+        self._unsaved = 0  # Index changes not yet written to index.json
+        atexit.register(self.flush)
+
+    def _load_index(self) -> "OrderedDict[str, Dict]":
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return OrderedDict()
+        return OrderedDict(sorted(entries.items(), key=lambda item: item[1]["last_access"]))
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path)
+        self._unsaved = 0
+
+    def _changed(self) -> None:
+        # Called under the lock; rewriting the whole index on every change is O(N²) over a crawl.
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            self._save_index()
+
+    def flush(self) -> None:
+        """
+        Writes the index to disk if it has unsaved changes.
+        """
+        with self._lock:
+            if self._unsaved:
+                self._save_index()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def ttl_for(self, url: str) -> Optional[int]:
+        """
+        Returns the TTL in seconds for a URL, or None if it should not be cached.
+        """
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Returns the cache entry for a URL, or None if it is not cached.
+        """
+        entry = self._entries.get(self._key(url))
+        if entry is None or not os.path.exists(self._body_path(self._key(url))):
+            return None
+        return entry
+
+    def is_fresh(self, url: str, entry: Dict) -> bool:
+        """
+        Returns True if the entry is still within its URL's TTL.
+        """
+        ttl = self.ttl_for(url) or 0
+        return time.time() - entry["stored_at"] < ttl
+
+    def has_fresh(self, url: str) -> bool:
+        """
+        Returns True if the URL would be served from the cache without a request.
+        """
+        if self.ttl_for(url) is None:
+            return False
+        entry = self.lookup(url)
+        return entry is not None and self.is_fresh(url, entry)
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """
+        Builds the revalidation headers for a stale entry.
+        """
+        conditional = {}
+        if entry["headers"].get("etag"):
+            conditional["If-None-Match"] = entry["headers"]["etag"]
+        if entry["headers"].get("last-modified"):
+            conditional["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return conditional
+
+    def to_response(self, url: str, entry: Dict, request: httpx.Request) -> httpx.Response:
+        """
+        Rebuilds an httpx.Response from a cache entry and marks it recently used.
+        """
+        key = self._key(url)
+        with open(self._body_path(key), "rb") as f:
+            body = f.read()
+        with self._lock:
+            entry["last_access"] = time.time()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return httpx.Response(
+            200,
+            headers=entry["headers"],
+            content=body,
+            request=request,
+            extensions={"from_cache": True},
+        )
+
+    def serve(self, request: httpx.Request) -> Tuple[Optional[httpx.Response], Optional[Dict]]:
+        """
+        First half of a cached GET, shared by the sync and async clients.
+
+        Returns (response, None) when a fresh entry answers the request.
+        Otherwise returns (None, entry), where entry is the stale entry (or
+        None), and adds that entry's revalidation headers to the request.
+        Pass the network response to complete() with the same entry.
+        """
+        url = str(request.url)
+        if request.method != "GET" or self.ttl_for(url) is None:
+            return None, None
+        entry = self.lookup(url)
+        if entry is not None and self.is_fresh(url, entry):
+            self.count("hits")
+            return self.to_response(url, entry, request), None
+        if entry is not None:
+            request.headers.update(self.conditional_headers(entry))
+        return None, entry
+
+    def complete(self, request: httpx.Request, entry: Optional[Dict], response: httpx.Response) -> httpx.Response:
+        """
+        Second half of a cached GET: answers a 304 from the revalidated entry,
+        or counts a miss and stores the response.
+        """
+        url = str(request.url)
+        if request.method != "GET" or self.ttl_for(url) is None:
+            return response
+        if entry is not None and response.status_code == 304:
+            response.close()
+            self.revalidated(url, entry, response)
+            return self.to_response(url, entry, request)
+        self.count("misses")
+        self.store(url, response)
+        return response
+
+    def revalidated(self, url: str, entry: Dict, response: httpx.Response) -> None:
+        """
+        Refreshes a stale entry after the server answered 304 Not Modified.
+        """
+        with self._lock:
+            for name in ("etag", "last-modified"):
+                if response.headers.get(name):
+                    entry["headers"][name] = response.headers[name]
+            entry["stored_at"] = time.time()
+            self.stats["revalidated"] += 1
+            self._changed()
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """
+        Stores a successful response body, evicting LRU entries when over budget.
+        """
+        if self.ttl_for(url) is None or response.status_code != 200:
+            return
+
+        key = self._key(url)
+        body = response.content
+        tmp_path = f"{self._body_path(key)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self._body_path(key))
+
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "url": url,
+                "size": len(body),
+                "stored_at": now,
+                "last_access": now,
+                "headers": {
+                    name: response.headers[name]
+                    for name in _STORED_HEADERS
+                    if name in response.headers
+                },
+            }
+            self._entries.move_to_end(key)
+            self.stats["stored"] += 1
+            self._evict()
+            self._changed()
+
+    def _evict(self) -> None:
+        total = sum(entry["size"] for entry in self._entries.values())
+        while total > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            total -= entry["size"]
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+            self.stats["evicted"] += 1
+
+    def report(self) -> None:
+        """
+        Saves the index and logs the hit/miss counters for the current run.
+        """
+        self.flush()
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        ratio = (self.stats["hits"] + self.stats["revalidated"]) / lookups if lookups else 0.0
+        log.info("HTTP cache", **self.stats, hit_ratio=f"{ratio:.0%}")
+
+
+class CachedClient(httpx.Client):
+    """
+    An httpx.Client that serves GET requests through a ResponseCache.
+    """
+
+    def __init__(self, cache: ResponseCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        cached, entry = self.cache.serve(request)
+        if cached is not None:
+            return cached
+        return self.cache.complete(request, entry, super().send(request, **kwargs))
@@ -0,0 +1,164 @@
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .constants import WATERMARKS_PATH
+from .logs import get_logger
+
+if TYPE_CHECKING:
+    from laroza_ramadan.schemas import Episode
+
+log = get_logger(__name__)
+
+
+def load_watermarks(filename: str = WATERMARKS_PATH) -> Dict[str, Dict]:
+    """
+    Loads the per-series watermarks saved by the previous incremental run.
+
+    Args:
+        filename (str): Path of the watermarks JSON file.
+
+    Returns:
+        Dict[str, Dict]: watermark_key(series name, season) -> {"ep_number", "ep_url"} of the last
+        episode whose embeds were resolved, plus the "empty_runs" of the episodes after it
+        that came back without embeds. Empty on the first run.
+    """
+    try:
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermarks(watermarks: Dict[str, Dict], filename: str = WATERMARKS_PATH) -> None:
+    """
+    Atomically writes the watermarks so a crash never leaves a truncated file.
+
+    Args:
+        watermarks (Dict[str, Dict]): The watermarks to persist.
+        filename (str): Path of the watermarks JSON file.
+    """
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_filename, filename)
+
+
+def watermark_key(series_name: str, season: int = 1) -> str:
+    """
+    Returns the watermarks key of a series season; season 1 keeps the bare
+    series name used by earlier runs.
+    """
+    return series_name if season == 1 else f"{series_name} S{season:02d}"
+
+
+def episodes_since(episodes: Sequence["Episode"], watermark: Optional[Dict]) -> List["Episode"]:
+    """
+    Returns the episodes added after the watermark.
+
+    A series seen for the first time only yields its latest episode, which is
+    what the full (non-incremental) run resolves as well.
+
+    Args:
+        episodes (Sequence[Episode]): The series episodes, oldest first.
+        watermark (Optional[Dict]): The series watermark, if any.
+
+    Returns:
+        List[Episode]: The episodes that still need embeds and players.
+    """
+    if not episodes:
+        return []
+    if not watermark:
+        return [episodes[-1]]
+    return [
+        ep for ep in episodes
+        if ep.ep_number > watermark["ep_number"] and ep.ep_url != watermark["ep_url"]
+    ]
+
+
+def advance_watermarks(
+    watermarks: Dict[str, Dict], eps_embeds: Iterable[Dict], max_empty_runs: int = 3
+) -> Dict[str, Dict]:
+    """
+    Moves each series watermark to its newest episode that produced embeds,
+    but never past an episode whose WatchList came back empty: that episode
+    stays after the watermark, so the next run retries it (along with the
+    episodes after it, whose embeds are simply stored again).
+
+    The watermark counts the runs each such episode came back empty
+    ("empty_runs", by episode URL); after ``max_empty_runs`` of them the
+    episode is given up on and no longer holds the watermark back.
+
+    Args:
+        watermarks (Dict[str, Dict]): The current watermarks (updated in place).
+        eps_embeds (Iterable[Dict]): Records produced by extract_episode_embeds.
+        max_empty_runs (int): Runs an episode without embeds holds its series watermark.
+
+    Returns:
+        Dict[str, Dict]: The updated watermarks.
+    """
+    per_series: Dict[str, List[Dict]] = {}
+    for record in eps_embeds:
+        per_series.setdefault(watermark_key(record["name"], record.get("season", 1)), []).append(record)
+
+    for key, records in per_series.items():
+        previous_runs = (watermarks.get(key) or {}).get("empty_runs", {})
+        empty_runs: Dict[str, int] = {}
+        for record in records:
+            if record["embeds"]:
+                continue
+            runs = previous_runs.get(record["last_ep_url"], 0) + 1
+            if runs >= max_empty_runs:
+                log.warning("Giving up on episode without embeds", series=key,
+                            ep_number=record["ep_number"], runs=runs)
+            else:
+                empty_runs[record["last_ep_url"]] = runs
+
+        first_empty = min(
+            (r["ep_number"] for r in records if r["last_ep_url"] in empty_runs), default=None
+        )
+        for record in sorted(records, key=lambda r: r["ep_number"]):
+            if first_empty is not None and record["ep_number"] >= first_empty:
+                break
+            current = watermarks.get(key)
+            if current is None or record["ep_number"] > current["ep_number"]:
+                watermarks[key] = {
+                    "ep_number": record["ep_number"],
+                    "ep_url": record["last_ep_url"],
+                }
+
+        # A series without a watermark only retries its latest episode, which
+        # changes as soon as a new one is published, so it needs no count.
+        current = watermarks.get(key)
+        if current is not None:
+            current.pop("empty_runs", None)
+            if empty_runs:
+                current["empty_runs"] = empty_runs
+    return watermarks
+
+
+def merge_records(
+    existing: Optional[List[Dict]], new: List[Dict], key_fields: Tuple[str, ...]
+) -> List[Dict]:
+    """
+    Merges freshly produced records into a previously saved output list.
+
+    Records with the same key replace the old ones in place; unseen records
+    are appended in their original order.
+
+    Args:
+        existing (Optional[List[Dict]]): Records loaded from the previous output.
+        new (List[Dict]): Records produced by this run.
+        key_fields (Tuple[str, ...]): Fields identifying a record. A missing
+            "season" (records saved before seasons were tracked) counts as 1.
+
+    Returns:
+        List[Dict]: The merged records.
+    """
+    def key(item: Dict) -> tuple:
+        return tuple(item.get(k, 1) if k == "season" else item[k] for k in key_fields)
+
+    merged = {key(item): item for item in existing or []}
+    for item in new:
+        merged[key(item)] = item
+    return list(merged.values())
@@ -0,0 +1,71 @@
+import json
+import logging
+import sys
+import time
+from typing import Optional
+
+_RESERVED = ("exc_info", "stack_info", "stacklevel", "extra")
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    A logger taking structured fields as keyword arguments::
+
+        log.info("Retrying request", url=url, delay=1.5)
+
+    The fields travel on the record (``record.fields``) so the formatter can
+    render them as ``key=value`` pairs or JSON.
+    """
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _RESERVED}
+        kwargs.setdefault("extra", {})["fields"] = fields
+        return msg, kwargs
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """
+    Returns the structured logger of a module, under the "laroza" logger.
+    Until configure_logging is called, INFO and above go to stderr as text.
+    """
+    if not logging.getLogger("laroza").handlers:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"laroza.{name.rsplit('.', 1)[-1]}"), {})
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text", stream: Optional[object] = None) -> None:
+    """
+    Sends the "laroza" loggers to stderr (or ``stream``) at ``level``, as
+    readable text or one JSON object per line (``fmt="json"``).
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+    logger = logging.getLogger("laroza")
+    logger.handlers[:] = [handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
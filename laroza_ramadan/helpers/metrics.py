@@ -0,0 +1,264 @@
+import bisect
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from .constants import METRICS_PATH, RUN_SUMMARY_PATH
+
+# Latency buckets in seconds, from cached pages to multi-minute downloads.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# The innermost open span: its kind labels every metric recorded inside it
+# (e.g. the HTTP requests of an "embed" span), and its trace is inherited by
+# nested spans. Context variables follow asyncio tasks and asyncio.to_thread.
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("laroza_span", default=None)
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def current_stage() -> str:
+    """
+    Returns the kind of the innermost open span, or "none" outside spans.
+    """
+    span = _current_span.get()
+    return span.kind if span is not None else "none"
+
+
+def trace_key(series_name: str, season: int = 1, ep_number: Optional[int] = None) -> str:
+    """
+    Identifies the series → episode → embed → player → download chain of one episode.
+    """
+    key = f"{series_name}/S{season:02d}"
+    return key if ep_number is None else f"{key}/E{ep_number:02d}"
+
+
+class Histogram:
+    """
+    Bucketed observations for Prometheus, plus the latest ``window`` samples
+    for the percentiles of the run summary.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 10000):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.samples.append(value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {"count": self.count, "sum": round(self.total, 6), "p50": self.percentile(50), "p99": self.percentile(99)}
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "kind", "trace", "trace_root", "attrs", "start", "duration", "status")
+
+    def __init__(self, span_id: int, parent: Optional["Span"], kind: str, trace: Optional[str], attrs: Dict):
+        self.id = span_id
+        self.parent_id = parent.id if parent is not None else None
+        self.kind = kind
+        self.trace = trace or (parent.trace if parent is not None else None)
+        # The outermost span of its trace, e.g. a "player" span but not the "embed" spans inside it.
+        self.trace_root = parent is None or parent.trace != self.trace
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration = 0.0
+        self.status = "ok"
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "trace": self.trace,
+            "start": round(self.start, 3),
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            **self.attrs,
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters, latency histograms and spans of one run.
+
+    Counters and histograms are keyed by name and labels (stage, host, ...)
+    and exported in the Prometheus text format. Spans time each step of the
+    series → episode → embed → player → download chain; spans of the same
+    episode share a trace key so the run summary can show where each
+    episode's time went.
+    """
+
+    def __init__(self, max_spans: int = 100000):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.started_at = time.time()
+        self.counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """
+        Adds ``value`` to a counter; the current stage is added to the labels.
+        """
+        key = _labels({"stage": current_stage(), **labels})
+        with self._lock:
+            self.counters[name][key] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Records an observation (usually seconds) in a histogram, labelled with the current stage.
+        """
+        key = _labels({"stage": current_stage(), **labels})
+        with self._lock:
+            histogram = self.histograms[name].get(key)
+            if histogram is None:
+                histogram = self.histograms[name][key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, kind: str, trace: Optional[str] = None, **attrs) -> Iterator[Span]:
+        """
+        Times a block as a span of ``kind``; nested spans become its children
+        and metrics recorded inside are labelled ``stage=kind``.
+
+        An exception marks the span as failed and is re-raised.
+        """
+        span = Span(next(self._ids), _current_span.get(), kind, trace, attrs)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = f"error: {type(e).__name__}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+            self.observe("span_duration_seconds", span.duration, kind=kind, status=span.status.split(":")[0])
+
+    def to_prometheus(self) -> str:
+        """
+        Renders every counter and histogram in the Prometheus text exposition format.
+        """
+        def render(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+            return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE laroza_{name} counter")
+                lines += [f"laroza_{name}{render(labels)} {value:g}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE laroza_{name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, math.inf), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else f"{bound:g}"
+                        lines.append(f"laroza_{name}_bucket{render(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"laroza_{name}_sum{render(labels)} {histogram.total:g}")
+                    lines.append(f"laroza_{name}_count{render(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, slowest: int = 10) -> Dict:
+        """
+        Builds the JSON run summary: time per stage, per host request stats,
+        totals of every counter and the slowest episode chains.
+        """
+        with self._lock:
+            spans = list(self.spans)
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: dict(series) for name, series in self.histograms.items()}
+
+        stages: Dict[str, Dict] = {}
+        for labels, histogram in histograms.get("span_duration_seconds", {}).items():
+            label_map = dict(labels)
+            stage = stages.setdefault(label_map["kind"], {"count": 0, "errors": 0, "seconds": 0.0})
+            stage["count"] += histogram.count
+            stage["seconds"] = round(stage["seconds"] + histogram.total, 3)
+            if label_map["status"] != "ok":
+                stage["errors"] += histogram.count
+
+        hosts: Dict[str, Dict] = defaultdict(lambda: {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0})
+        for labels, value in counters.get("http_requests_total", {}).items():
+            label_map = dict(labels)
+            hosts[label_map["host"]]["requests"] += int(value)
+            if not label_map.get("status", "").startswith(("2", "3")):
+                hosts[label_map["host"]]["errors"] += int(value)
+        for labels, value in counters.get("http_response_bytes_total", {}).items():
+            hosts[dict(labels)["host"]]["bytes"] += int(value)
+        latencies: Dict[str, Histogram] = defaultdict(Histogram)
+        for labels, histogram in histograms.get("http_request_duration_seconds", {}).items():
+            host = dict(labels)["host"]
+            hosts[host]["seconds"] = round(hosts[host]["seconds"] + histogram.total, 3)
+            for sample in histogram.samples:
+                latencies[host].observe(sample)
+        for host, histogram in latencies.items():
+            hosts[host]["p50"], hosts[host]["p99"] = round(histogram.percentile(50), 6), round(histogram.percentile(99), 6)
+
+        traces: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for span in spans:
+            if span.trace and span.trace_root:
+                traces[span.trace][span.kind] += span.duration
+        slowest_traces = sorted(traces.items(), key=lambda item: -sum(item[1].values()))[:slowest]
+
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(time.time() - self.started_at, 3),
+            "stages": stages,
+            "hosts": dict(sorted(hosts.items(), key=lambda item: -item[1]["seconds"])),
+            "counters": {
+                name: round(sum(series.values()), 3) for name, series in sorted(counters.items())
+            },
+            "slowest_traces": [
+                {"trace": trace, "seconds": round(sum(kinds.values()), 3), **{k: round(v, 3) for k, v in kinds.items()}}
+                for trace, kinds in slowest_traces
+            ],
+        }
+
+    def export(self, prometheus_path: str = METRICS_PATH, summary_path: str = RUN_SUMMARY_PATH) -> Dict:
+        """
+        Writes the Prometheus text file and the JSON run summary; returns the summary.
+        """
+        summary = self.summary()
+        for path, content in (
+            (prometheus_path, self.to_prometheus()),
+            (summary_path, json.dumps(summary, ensure_ascii=False, indent=2)),
+        ):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return summary
+
+
+metrics = Metrics()
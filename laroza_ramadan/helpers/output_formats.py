@@ -0,0 +1,221 @@
+import json
+import mmap
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, suppress
+from typing import IO, Dict, Iterable, Iterator, Optional
+
+from .logs import get_logger
+
+try:
+    import orjson
+except ImportError:  # Optional: several times faster than json, with the same output
+    orjson = None
+
+log = get_logger(__name__)
+
+# json.dumps builds a new encoder whenever it gets options; NDJSON encodes once per record.
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(obj, indent: Optional[int] = None) -> bytes:
+    """
+    Encodes to UTF-8 JSON, compact unless ``indent`` is given; non-ASCII text
+    (the Arabic series names) is written as is rather than \\u-escaped.
+    """
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent is None:
+        return _COMPACT_ENCODER.encode(obj).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=indent).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def load_json(filename: str):
+    """
+    Decodes a JSON file from a memory map, so (with orjson) its contents are
+    never copied into a Python string first.
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return loads(b"")  # Raises the decoder's error, as for any invalid document
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if orjson is None:
+                return json.loads(mapped[:])
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+
+@contextmanager
+def atomic_write(filename: str, mode: str = "wb") -> Iterator[IO]:
+    """
+    Opens a temporary file next to ``filename`` and renames it over
+    ``filename`` once the block completes, so readers (and a crash mid-write)
+    only ever see the old or the new file, never half of one.
+    """
+    tmp_path = f"{filename}.tmp"
+    try:
+        with open(tmp_path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filename)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+class OutputFormat(ABC):
+    """
+    A file format for lists of records (dicts). ``write`` replaces the file
+    atomically; ``read`` yields the records without building a list first.
+    """
+
+    name: str = ""
+    extension: str = ""
+
+    @abstractmethod
+    def write(self, records: Iterable[Dict], filename: str) -> int:
+        """
+        Writes the records and returns how many were written.
+        """
+
+    @abstractmethod
+    def read(self, filename: str) -> Iterator[Dict]:
+        """
+        Yields the records of the file.
+        """
+
+
+class JSONFormat(OutputFormat):
+    """
+    One JSON array, compact by default and read from a memory map.
+    """
+
+    name = "json"
+    extension = ".json"
+
+    def __init__(self, indent: Optional[int] = None):
+        self.indent = indent
+
+    def write(self, records: Iterable[Dict], filename: str) -> int:
+        records = records if isinstance(records, list) else list(records)
+        with atomic_write(filename) as f:
+            f.write(dumps(records, self.indent))
+        return len(records)
+
+    def read(self, filename: str) -> Iterator[Dict]:
+        yield from load_json(filename)
+
+
+class NDJSONFormat(OutputFormat):
+    """
+    One JSON record per line: appendable record by record, and read one line
+    at a time, so memory does not grow with the file.
+    """
+
+    name = "ndjson"
+    extension = ".ndjson"
+
+    def write(self, records: Iterable[Dict], filename: str) -> int:
+        count = 0
+        with atomic_write(filename) as f:
+            for record in records:
+                f.write(dumps(record) + b"\n")
+                count += 1
+        return count
+
+    def append(self, record: Dict, filename: str) -> None:
+        """
+        Appends one record and flushes it to disk, so a crash loses at most
+        the line being written.
+        """
+        with open(filename, "ab") as f:
+            f.write(dumps(record) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, filename: str) -> Iterator[Dict]:
+        """
+        Yields the records one at a time, skipping a torn last line left by a
+        crash. Yields nothing if the file does not exist.
+        """
+        try:
+            # orjson decodes bytes directly; json would detect their encoding on every line.
+            with open(filename, "rb") if orjson is not None else open(filename, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield loads(line)
+                    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError
+                        continue
+        except FileNotFoundError:
+            return
+
+
+class ParquetFormat(OutputFormat):
+    """
+    Columnar and compressed (zstd), in the long-form layouts of
+    laroza_ramadan.schemas.columnar (one row per episode, embed or player,
+    names and hosts dictionary-encoded). Read memory-mapped, one batch of rows at a time.
+    """
+
+    name = "parquet"
+    extension = ".parquet"
+
+    def __init__(self, compression: str = "zstd"):
+        self.compression = compression
+
+    def write(self, records: Iterable[Dict], filename: str) -> int:
+        from laroza_ramadan.schemas.columnar import table_from_records, write_parquet
+
+        records = records if isinstance(records, list) else list(records)
+        write_parquet(table_from_records(records), filename, self.compression)
+        return len(records)
+
+    def read(self, filename: str) -> Iterator[Dict]:
+        from laroza_ramadan.schemas.columnar import iter_parquet_records
+
+        for record in iter_parquet_records(filename):
+            yield record.to_dict()
+
+
+FORMATS: Dict[str, OutputFormat] = {fmt.name: fmt for fmt in (JSONFormat(), NDJSONFormat(), ParquetFormat())}
+
+
+def register_format(fmt: OutputFormat) -> None:
+    FORMATS[fmt.name] = fmt
+
+
+def get_format(name: Optional[str] = None, filename: Optional[str] = None) -> OutputFormat:
+    """
+    Returns the format called ``name``, else the one matching the extension of ``filename``.
+
+    Raises:
+        ValueError: If no registered format matches.
+    """
+    if name is None and filename is not None:
+        extension = os.path.splitext(filename)[1]
+        name = next((fmt.name for fmt in FORMATS.values() if fmt.extension == extension), None)
+    if name not in FORMATS:
+        raise ValueError(f"Unknown output format {name!r}, expected one of {', '.join(FORMATS)}")
+    return FORMATS[name]
+
+
+def write_records(records: Iterable[Dict], filename: str, fmt: Optional[str] = None) -> int:
+    """
+    Atomically writes records in ``fmt`` (by default, the format of the file extension).
+    """
+    count = get_format(fmt, filename).write(records, filename)
+    log.info("Saved records", filename=filename, records=count)
+    return count
+
+
+def read_records(filename: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yields the records of a file in ``fmt`` (by default, the format of the file extension).
+    """
+    return get_format(fmt, filename).read(filename)
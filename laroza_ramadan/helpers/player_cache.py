@@ -0,0 +1,230 @@
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from .constants import DB_PATH
+from .logs import get_logger
+from .metrics import metrics
+
+log = get_logger(__name__)
+
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resolved_players (
+    embed_url TEXT PRIMARY KEY,
+    media_url TEXT NOT NULL,
+    resolved_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    validated_at REAL NOT NULL
+);
+"""
+
+# Query parameters holding the expiry of a signed URL: an epoch timestamp, or a
+# lifetime in seconds counted from the START_PARAMS timestamp (vidspeeds: s=...&e=...).
+EXPIRY_PARAMS = ("expires", "expire", "expiry", "exp", "e", "validto", "valid_to", "deadline")
+START_PARAMS = ("s", "st", "start", "ts", "t", "time", "issued")
+# Epoch seconds between 2020 and 2040, as found inside opaque tokens.
+EPOCH_RE = re.compile(r"(?<!\d)(1[6-9]\d{8}|2[01]\d{8})(?!\d)")
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _as_epoch(value: float) -> Optional[float]:
+    """
+    Reads a number as epoch seconds (or milliseconds); None if it is too small to be one.
+    """
+    if 1e12 <= value < 1e14:
+        return value / 1000
+    if 1e9 <= value < 1e11:
+        return value
+    return None
+
+
+def _token_params(params: Dict[str, str]) -> Dict[str, str]:
+    # Akamai-style tokens pack their timestamps in one value: hdnts=st=...~exp=...~hmac=...
+    packed = {}
+    for value in params.values():
+        for part in value.split("~"):
+            key, sep, sub_value = part.partition("=")
+            if sep and key.lower() in ("st", "exp"):
+                packed.setdefault(key.lower(), sub_value)
+    return packed
+
+
+def infer_expiry(url: str, now: Optional[float] = None) -> Optional[float]:
+    """
+    Infers when a signed media URL expires from its query string.
+
+    Understands absolute timestamps (``expires=1740000000``), lifetimes
+    relative to a start timestamp (``s=1740000000&e=129600``), AWS
+    ``X-Amz-Date``/``X-Amz-Expires`` and timestamps inside Akamai-style tokens
+    (``hdnts=st=...~exp=...``). As a last resort, a future epoch timestamp
+    embedded in any parameter counts as the expiry.
+
+    Returns:
+        Optional[float]: The expiry as epoch seconds, or None for unsigned URLs.
+    """
+    now = time.time() if now is None else now
+    params = {key.lower(): value for key, value in parse_qsl(urlsplit(url).query, keep_blank_values=True)}
+    for key, value in _token_params(params).items():
+        params.setdefault(key, value)
+
+    if "x-amz-date" in params and _number(params.get("x-amz-expires")) is not None:
+        try:
+            signed_at = datetime.strptime(params["x-amz-date"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            return signed_at.timestamp() + float(params["x-amz-expires"])
+        except ValueError:
+            pass
+
+    start = None
+    for key in START_PARAMS:
+        start = _as_epoch(_number(params.get(key)) or 0)
+        if start:
+            break
+    for key in EXPIRY_PARAMS:
+        value = _number(params.get(key))
+        if value is None or value <= 0:
+            continue
+        return _as_epoch(value) or (start or now) + value
+
+    future = [int(match) for value in params.values() for match in EPOCH_RE.findall(value) if int(match) > now]
+    return min(future) if future else None
+
+
+async def probe(client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> bool:
+    """
+    Checks that a media URL still serves content by asking for its first byte.
+
+    A ranged GET rather than HEAD: several video CDNs reject HEAD requests.
+    """
+    try:
+        async with client.stream("GET", url, headers={**(headers or {}), "Range": "bytes=0-0"}, timeout=timeout) as response:
+            return response.status_code in (200, 206)
+    except httpx.HTTPError:
+        return False
+
+
+class PlayerCache:
+    """
+    Persistent map from embed URL to the media URL its resolver returned.
+
+    Entries expire when their signed URL does (see infer_expiry), minus a
+    safety ``margin`` so a download started from a cached URL does not race
+    the signature; unsigned URLs keep for ``default_ttl``. Before reuse an
+    entry is checked with a one-byte probe, unless one succeeded in the last
+    ``revalidate_after`` seconds. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        default_ttl: float = 6 * 60 * 60,
+        margin: float = 10 * 60,
+        revalidate_after: float = 60.0,
+    ):
+        """
+        Opens (and creates if needed) the cache table and evicts expired entries.
+
+        Args:
+            db_path (str): SQLite database holding the cache.
+            default_ttl (float): Lifetime in seconds of URLs without an inferable expiry.
+            margin (float): Seconds taken off every expiry.
+            revalidate_after (float): Seconds a successful probe is trusted for.
+        """
+        self.default_ttl = default_ttl
+        self.margin = margin
+        self.revalidate_after = revalidate_after
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "invalid": 0}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(CACHE_SCHEMA)
+        self.evict_expired()
+
+    def expires_at(self, media_url: str, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        expiry = infer_expiry(media_url, now)
+        return (expiry if expiry is not None else now + self.default_ttl) - self.margin
+
+    def get(self, embed_url: str) -> Optional[Dict]:
+        """
+        Returns the unexpired entry of an embed URL, dropping it if it has expired.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM resolved_players WHERE embed_url = ?", (embed_url,)).fetchone()
+        if row is None:
+            return None
+        if row["expires_at"] <= time.time():
+            self._count("expired")
+            self.forget(embed_url)
+            return None
+        return dict(row)
+
+    def store(self, embed_url: str, media_url: str) -> None:
+        now = time.time()
+        expires_at = self.expires_at(media_url, now)
+        if expires_at <= now:
+            return  # Already too close to its expiry to be worth keeping
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resolved_players (embed_url, media_url, resolved_at, expires_at, validated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (embed_url, media_url, now, expires_at, now),
+            )
+
+    def forget(self, embed_url: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM resolved_players WHERE embed_url = ?", (embed_url,))
+
+    def evict_expired(self) -> int:
+        """
+        Deletes every expired entry; returns how many were deleted.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM resolved_players WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    async def lookup(self, embed_url: str, client: httpx.AsyncClient, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        Returns the cached media URL of an embed if it is unexpired and still
+        answers a probe, else "" (and drops an entry that failed its probe).
+        """
+        entry = self.get(embed_url)
+        if entry is None:
+            self._count("misses")
+            return ""
+        if time.time() - entry["validated_at"] > self.revalidate_after:
+            if not await probe(client, entry["media_url"], headers):
+                self._count("invalid")
+                self.forget(embed_url)
+                return ""
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "UPDATE resolved_players SET validated_at = ? WHERE embed_url = ?", (time.time(), embed_url)
+                )
+        self._count("hits")
+        return entry["media_url"]
+
+    def _count(self, result: str) -> None:
+        with self._lock:
+            self.stats[result] += 1
+        metrics.inc("player_cache_lookups_total", result=result)
+
+    def report(self) -> None:
+        """
+        Logs the hit/miss counters for the current run.
+        """
+        lookups = sum(self.stats.values()) - self.stats["expired"]
+        ratio = self.stats["hits"] / lookups if lookups else 0.0
+        log.info("Player cache", **self.stats, hit_ratio=f"{ratio:.0%}")
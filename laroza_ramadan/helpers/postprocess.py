@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# Containers ffprobe reports for MP4 files, and the codecs MP4 players accept as-is.
+MP4_FORMATS = {"mov", "mp4", "m4a", "3gp", "3g2", "mj2"}
+MP4_VIDEO_CODECS = {"h264", "hevc", "av1", "mpeg4"}
+MP4_AUDIO_CODECS = {"aac", "mp3", "ac3", "eac3", "alac"}
+
+
+@dataclass
+class MediaProbe:
+    format_names: List[str]
+    video_codecs: List[str] = field(default_factory=list)
+    audio_codecs: List[str] = field(default_factory=list)
+
+    @property
+    def is_mp4(self) -> bool:
+        return bool(MP4_FORMATS.intersection(self.format_names))
+
+    @property
+    def codecs_fit_mp4(self) -> bool:
+        return all(codec in MP4_VIDEO_CODECS for codec in self.video_codecs) and all(
+            codec in MP4_AUDIO_CODECS for codec in self.audio_codecs
+        )
+
+
+def probe(filepath: str) -> Optional[MediaProbe]:
+    """
+    Reads the container and stream codecs of a file with ffprobe.
+
+    Returns:
+        Optional[MediaProbe]: The probe result, or None if ffprobe is missing or fails.
+    """
+    if shutil.which("ffprobe") is None:
+        return None
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", filepath],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    info = json.loads(result.stdout or "{}")
+    streams = info.get("streams", [])
+    return MediaProbe(
+        format_names=info.get("format", {}).get("format_name", "").split(","),
+        video_codecs=[s.get("codec_name", "") for s in streams if s.get("codec_type") == "video"],
+        audio_codecs=[s.get("codec_name", "") for s in streams if s.get("codec_type") == "audio"],
+    )
+
+
+def plan(media: MediaProbe) -> str:
+    """
+    Picks the cheapest way to an MP4 file: "none", "remux" (stream copy) or "transcode".
+    """
+    if not media.codecs_fit_mp4:
+        return "transcode"
+    return "none" if media.is_mp4 else "remux"
+
+
+def _ffmpeg_args(media: MediaProbe, action: str) -> List[str]:
+    if action == "remux":
+        return ["-c", "copy"]
+    # Only the streams MP4 cannot hold are re-encoded; the rest is copied.
+    video = ["-c:v", "copy"]
+    if not all(codec in MP4_VIDEO_CODECS for codec in media.video_codecs):
+        video = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20"]
+    audio = ["-c:a", "copy"]
+    if not all(codec in MP4_AUDIO_CODECS for codec in media.audio_codecs):
+        audio = ["-c:a", "aac", "-b:a", "160k"]
+    return video + audio
+
+
+def postprocess(filepath: str) -> Dict:
+    """
+    Turns a downloaded file into an MP4 with as little work as possible.
+
+    An MP4 with MP4-compatible codecs is left untouched; other containers are
+    remuxed with a stream copy; only codecs MP4 cannot hold are transcoded.
+
+    Args:
+        filepath (str): The downloaded file.
+
+    Returns:
+        Dict: {"filepath": final path, "action": "none" | "remux" | "transcode" | "skipped",
+        "seconds": time spent, "error": message if ffmpeg failed}.
+    """
+    start = time.perf_counter()
+    media = probe(filepath)
+    if media is None or shutil.which("ffmpeg") is None:
+        return {"filepath": filepath, "action": "skipped", "seconds": time.perf_counter() - start}
+
+    action = plan(media)
+    if action == "none":
+        return {"filepath": filepath, "action": action, "seconds": time.perf_counter() - start}
+
+    target = f"{os.path.splitext(filepath)[0]}.mp4"
+    tmp_path = f"{target}.tmp"
+    result = subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-i", filepath, "-map", "0:v?", "-map", "0:a?",
+         *_ffmpeg_args(media, action), "-movflags", "+faststart", "-f", "mp4", tmp_path],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {
+            "filepath": filepath,
+            "action": action,
+            "seconds": time.perf_counter() - start,
+            "error": result.stderr.strip()[-500:],
+        }
+
+    os.replace(tmp_path, target)
+    if target != filepath:
+        os.remove(filepath)
+    return {"filepath": target, "action": action, "seconds": time.perf_counter() - start}
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Dict
+
+from .logs import get_logger
+
+log = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at ``rate`` tokens per second up to ``burst``.
+
+    ``reserve`` never blocks: it takes a token (possibly going into debt) and
+    returns how long the caller must wait, so the same bucket serves both
+    ``time.sleep`` and ``asyncio.sleep`` callers.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Takes ``amount`` tokens (one request, or a number of bytes for a
+        bandwidth bucket) and returns the seconds to wait before using them.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets with AIMD rate adaptation.
+
+    Each host starts at ``rate`` requests per second. A 429/503 halves the
+    host's rate (multiplicative decrease, down to ``min_rate``); every
+    ``success_window`` consecutive successes add ``increase`` (additive
+    increase, up to ``max_rate``). Each host settles near the highest rate it
+    tolerates.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 5,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        success_window: int = 10,
+    ):
+        """
+        Args:
+            rate (float): Initial requests per second per host.
+            burst (int): Requests a host may receive back to back.
+            min_rate (float): Lowest rate the adaptation may reach.
+            max_rate (float): Highest rate the adaptation may reach.
+            increase (float): Requests per second added after a success window.
+            decrease (float): Factor applied to the rate on a throttling response.
+            success_window (int): Consecutive successes needed before speeding up.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.success_window = success_window
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._successes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+            self._successes[host] = 0
+        return self._buckets[host]
+
+    def acquire(self, host: str) -> float:
+        """
+        Reserves a request slot for the host.
+
+        Returns:
+            float: Seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            return self._bucket(host).reserve()
+
+    def feedback(self, host: str, status_code: int) -> None:
+        """
+        Adapts the host's rate to the status of a response.
+        """
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code in self.THROTTLE_STATUSES:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                self._successes[host] = 0
+                log.warning("Slowing down host", host=host, rate=round(bucket.rate, 2), status=status_code)
+            elif status_code < 500:
+                self._successes[host] += 1
+                if self._successes[host] >= self.success_window:
+                    bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+                    self._successes[host] = 0
+
+    def rates(self) -> Dict[str, float]:
+        """
+        Returns the current requests-per-second rate of every host.
+        """
+        return {host: bucket.rate for host, bucket in self._buckets.items()}
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .async_spider import AsyncLarozaScraper
+from .constants import RESOLVER_STATS_PATH
+from .helper import vk_extract_url
+from .host_health import HostHealth, host_health
+from .logs import get_logger
+from .metrics import metrics
+from .player_cache import PlayerCache
+
+log = get_logger(__name__)
+
+
+Resolver = Callable[[AsyncLarozaScraper, str, Dict[str, str]], Awaitable[str]]
+
+
+class ResolverRegistry:
+    """
+    Maps embed hosts to the coroutine that turns an embed URL into a playable
+    media URL, and ranks hosts by their historical success rate and latency.
+
+    Resolvers are matched by substring in registration order; the ``"*"``
+    resolver handles every embed no other resolver claims.
+    """
+
+    def __init__(
+        self,
+        stats_path: str = RESOLVER_STATS_PATH,
+        health: HostHealth = host_health,
+        cache: Optional[PlayerCache] = None,
+    ):
+        """
+        Initializes the registry and loads the per-host stats of previous runs.
+
+        Args:
+            stats_path (str): JSON file where per-host stats are persisted.
+            health (HostHealth): Host health tracker; hosts with an open
+                circuit are skipped and error-prone hosts ranked lower.
+            cache (Optional[PlayerCache]): Resolved media URLs of previous runs,
+                reused while their signature is valid instead of resolving again.
+        """
+        self.stats_path = stats_path
+        self.health = health
+        self.cache = cache
+        self._resolvers: List[Tuple[str, Resolver]] = []
+        self._fallback: Optional[Resolver] = None
+        try:
+            with open(stats_path, encoding="utf-8") as f:
+                self.stats: Dict[str, Dict[str, float]] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.stats = {}
+
+    def register(self, host: str) -> Callable[[Resolver], Resolver]:
+        """
+        Decorator registering a resolver for embed URLs containing ``host``.
+        """
+        def decorator(func: Resolver) -> Resolver:
+            if host == "*":
+                self._fallback = func
+            else:
+                self._resolvers.append((host, func))
+            return func
+        return decorator
+
+    def resolver_for(self, embed_url: str) -> Optional[Resolver]:
+        """
+        Returns the resolver registered for an embed URL.
+        """
+        for host, func in self._resolvers:
+            if host in embed_url:
+                return func
+        return self._fallback
+
+    def score(self, embed_url: str) -> float:
+        """
+        Scores an embed host: smoothed success rate divided by mean latency.
+
+        Unseen hosts get a neutral score so they are still tried; the score is
+        scaled down by the host's HTTP error rate.
+        """
+        host = urlparse(embed_url).netloc
+        health_factor = 1.0 - self.health.error_rate(host)
+        stats = self.stats.get(host)
+        if not stats:
+            return 0.5 * health_factor
+        success_rate = (stats["successes"] + 1) / (stats["attempts"] + 2)
+        mean_latency = stats["total_latency"] / stats["attempts"] if stats["attempts"] else 1.0
+        return success_rate / (1.0 + mean_latency) * health_factor
+
+    def rank(self, embeds: List[str]) -> List[str]:
+        """
+        Orders embeds from the most to the least promising host, dropping
+        hosts whose circuit is currently open.
+        """
+        available = [emb for emb in embeds if self.health.allow(urlparse(emb).netloc)]
+        return sorted(available, key=self.score, reverse=True)
+
+    def _record(self, embed_url: str, ok: bool, latency: float) -> None:
+        stats = self.stats.setdefault(
+            urlparse(embed_url).netloc, {"attempts": 0, "successes": 0, "total_latency": 0.0}
+        )
+        stats["attempts"] += 1
+        stats["successes"] += int(ok)
+        stats["total_latency"] += latency
+
+    async def _run(self, scraper: AsyncLarozaScraper, embed_url: str, headers: Dict[str, str]) -> str:
+        resolver = self.resolver_for(embed_url)
+        if resolver is None:
+            return ""
+        with metrics.span("embed", host=urlparse(embed_url).netloc) as span:
+            if self.cache is not None:
+                cached = await self.cache.lookup(embed_url, scraper.client, headers)
+                if cached:
+                    span.attrs["cached"] = True
+                    return cached
+            start = time.perf_counter()
+            try:
+                result = await resolver(scraper, embed_url, headers) or ""
+            except Exception as e:
+                log.warning("Resolver failed", url=embed_url, error=e)
+                result = ""
+            if not result:
+                span.status = "failed"
+        self._record(embed_url, bool(result), time.perf_counter() - start)
+        if result and self.cache is not None:
+            self.cache.store(embed_url, result)
+        return result
+
+    async def resolve(
+        self,
+        scraper: AsyncLarozaScraper,
+        embeds: List[str],
+        headers: Dict[str, str],
+        first_only: bool = False,
+    ) -> List[str]:
+        """
+        Resolves the embeds of one episode concurrently.
+
+        Args:
+            scraper (AsyncLarozaScraper): The scraper used by the resolvers.
+            embeds (List[str]): The episode embed URLs.
+            headers (Dict[str, str]): HTTP headers to use in the requests.
+            first_only (bool): Return as soon as one resolver succeeds and
+                cancel the others, instead of waiting for all of them.
+
+        Returns:
+            List[str]: Playable URLs ordered by host rank (at most one if first_only).
+        """
+        ranked = self.rank(embeds)
+        if not first_only:
+            results = await asyncio.gather(*(self._run(scraper, emb, headers) for emb in ranked))
+            return [result for result in results if result]
+
+        tasks = [asyncio.create_task(self._run(scraper, emb, headers)) for emb in ranked]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result:
+                    return [result]
+            return []
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def save_stats(self) -> None:
+        """
+        Persists the per-host stats for the next run.
+        """
+        tmp_path = f"{self.stats_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f, indent=4)
+        os.replace(tmp_path, self.stats_path)
+
+
+registry = ResolverRegistry()
+
+
+@registry.register("uqload")
+async def resolve_uqload(scraper: AsyncLarozaScraper, url: str, headers: Dict[str, str]) -> str:
+    return await scraper.fetch_uqload_mp4_links(url, headers)
+
+
+@registry.register("vk.com")
+async def resolve_vk(scraper: AsyncLarozaScraper, url: str, headers: Dict[str, str]) -> str:
+    return vk_extract_url(url) or ""
+
+
+@registry.register("ok.ru")
+async def resolve_ok_ru(scraper: AsyncLarozaScraper, url: str, headers: Dict[str, str]) -> str:
+    return url  # yt-dlp handles ok.ru embeds directly
+
+
+@registry.register("*")
+async def resolve_m3u8(scraper: AsyncLarozaScraper, url: str, headers: Dict[str, str]) -> str:
+    return await scraper.extract_and_print_media_url(url, headers)
+
+
+def resolve_embeds(
+    embeds: List[str], headers: Dict[str, str], first_only: bool = False, **scraper_options
+) -> List[str]:
+    """
+    Blocking helper resolving one episode's embeds with a throwaway async scraper.
+
+    ``scraper_options`` are passed to AsyncLarozaScraper, e.g. to share the
+    caller's rate limiter and retry policy. The scraper runs on the shared
+    transport's per-thread event loop, so connections to the embed hosts stay
+    open from one episode to the next.
+    """
+    async_scraper = AsyncLarozaScraper(**scraper_options)
+
+    async def run() -> List[str]:
+        try:
+            return await registry.resolve(async_scraper, embeds, headers, first_only=first_only)
+        finally:
+            await async_scraper.close_session()
+
+    players = async_scraper.transport.run(run())
+    registry.save_stats()
+    registry.health.save()
+    return players
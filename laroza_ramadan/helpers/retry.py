@@ -0,0 +1,133 @@
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+import httpx
+
+
+class CrawlDeadlineExceeded(httpx.TimeoutException):
+    """
+    Raised when the crawl's total time budget is used up.
+    """
+
+
+class CrawlDeadline:
+    """
+    A total time budget shared by every request of one crawl.
+
+    The clock starts on the first request; ``reset`` starts a new crawl.
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        """
+        Args:
+            budget (Optional[float]): Seconds allowed for the whole crawl, or None for no limit.
+        """
+        self.budget = budget
+        self.started_at: Optional[float] = None
+
+    def reset(self) -> None:
+        self.started_at = None
+
+    def remaining(self) -> Optional[float]:
+        """
+        Returns the seconds left in the budget, or None if unlimited.
+        """
+        if self.budget is None:
+            return None
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        return self.budget - (time.monotonic() - self.started_at)
+
+    def timeout(self, per_request: float) -> float:
+        """
+        Returns the timeout for the next request, never past the deadline.
+
+        Raises:
+            CrawlDeadlineExceeded: If the budget is already used up.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return per_request
+        if remaining <= 0:
+            raise CrawlDeadlineExceeded("Crawl deadline exceeded, giving up on request.")
+        return min(per_request, remaining)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Capped exponential backoff with full jitter for idempotent requests.
+
+    Transport errors and the statuses in ``retry_statuses`` are retried up to
+    ``max_attempts`` attempts in total. A ``Retry-After`` header replaces the
+    computed backoff, unless it asks for more than ``max_retry_after`` seconds.
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    max_retry_after: float = 120.0
+    timeout: float = 20.0
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: frozenset({429, 500, 502, 503, 504}))
+    idempotent_methods: FrozenSet[str] = field(default_factory=lambda: frozenset({"GET", "HEAD", "OPTIONS"}))
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns a jittered delay in seconds for the given (0-based) attempt.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response: httpx.Response) -> Optional[float]:
+        """
+        Parses a Retry-After header given in seconds or as an HTTP date.
+        """
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def next_delay(
+        self,
+        deadline: CrawlDeadline,
+        method: str,
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+    ) -> Optional[float]:
+        """
+        Decides whether a failed attempt should be retried.
+
+        Args:
+            deadline (CrawlDeadline): The crawl's total time budget.
+            method (str): The HTTP method of the request.
+            attempt (int): The 0-based attempt that just finished.
+            response (Optional[httpx.Response]): The response, or None after a transport error.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None to give up.
+        """
+        if method.upper() not in self.idempotent_methods or attempt + 1 >= self.max_attempts:
+            return None
+        if response is not None and response.status_code not in self.retry_statuses:
+            return None
+
+        delay = self.retry_after(response) if response is not None else None
+        if delay is None:
+            delay = self.backoff(attempt)
+        elif delay > self.max_retry_after:
+            return None
+
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
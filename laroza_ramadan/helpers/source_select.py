@@ -0,0 +1,188 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import httpx
+
+from .extractor import QUALITY_RE
+from .hls import choose_variant, is_master_playlist, parse_master_playlist, parse_media_playlist
+from .logs import get_logger
+from .metrics import metrics
+from .transport import SharedTransport, shared_transport
+
+log = get_logger(__name__)
+
+POLICIES = ("first", "fastest", "quality", "balanced")
+
+
+@dataclass
+class SourceProbe:
+    url: str
+    kind: str  # "hls" or "mp4"
+    ok: bool = False
+    height: Optional[int] = None  # Vertical resolution: declared by the HLS variant or hinted in the URL
+    bandwidth: int = 0  # Declared HLS variant bandwidth, bits per second
+    size: Optional[int] = None  # MP4 file size in bytes
+    throughput: float = 0.0  # Measured on the sample, bytes per second
+    latency: float = 0.0  # Seconds until the sample's first byte
+    error: Optional[str] = None
+
+    @property
+    def quality(self) -> tuple:
+        """
+        Sort key of the picture quality: resolution first, then declared
+        bandwidth, then file size. Unknown values rank lowest.
+        """
+        return self.height or 0, self.bandwidth, self.size or 0
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    # A ranged answer carries the full size in Content-Range: bytes 0-262143/73400320
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    if total.isdigit():
+        return int(total)
+    length = response.headers.get("Content-Length", "")
+    return int(length) if response.status_code == 200 and length.isdigit() else None
+
+
+class SourceSelector:
+    """
+    Picks the player to download among the resolved players of an episode.
+
+    Every player is probed at once: an HLS player's master playlist gives the
+    bandwidth and resolution of the variant the HLS engine would download,
+    an MP4 player its size, and both time a short ranged sample (the first
+    media segment or the first bytes of the file) for their throughput.
+
+    Policies:
+        - ``fastest``: the highest measured throughput;
+        - ``quality``: the highest resolution (then bandwidth, then size);
+        - ``balanced``: the highest quality among players sampled at
+          ``min_speed`` bytes per second or more, else the fastest;
+        - ``first``: no probing, the first player (ranked by the resolvers).
+    """
+
+    def __init__(
+        self,
+        policy: str = "balanced",
+        min_speed: int = 1_000_000,
+        sample_bytes: int = 256 * 1024,
+        timeout: float = 10.0,
+        max_bandwidth: Optional[int] = None,
+        transport: SharedTransport = shared_transport,
+    ):
+        """
+        Args:
+            policy (str): One of POLICIES.
+            min_speed (int): Throughput in bytes per second the ``balanced`` policy requires.
+            sample_bytes (int): Bytes downloaded to measure a player's throughput.
+            timeout (float): Per-request timeout of the probes in seconds.
+            max_bandwidth (Optional[int]): Highest HLS variant bandwidth the downloads pick (HLS_MAX_BANDWIDTH).
+            transport (SharedTransport): Connection pools shared with the scrapers and downloads.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown source policy {policy!r}, expected one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self.min_speed = min_speed
+        self.sample_bytes = sample_bytes
+        self.timeout = timeout
+        self.max_bandwidth = max_bandwidth
+        self.transport = transport
+
+    async def _sample(self, client: httpx.AsyncClient, url: str, probe: SourceProbe) -> httpx.Response:
+        """
+        Downloads the first ``sample_bytes`` of a URL, timing them into the probe.
+        """
+        start = time.perf_counter()
+        received = 0
+        async with client.stream("GET", url, headers={"Range": f"bytes=0-{self.sample_bytes - 1}"}) as response:
+            response.raise_for_status()
+            first_byte = time.perf_counter()
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+                if received >= self.sample_bytes:
+                    break
+        elapsed = time.perf_counter() - first_byte
+        probe.latency = first_byte - start
+        # A sample that arrived in one read is measured from the request instead.
+        probe.throughput = received / (elapsed if elapsed > 1e-3 else time.perf_counter() - start)
+        return response
+
+    async def probe(self, client: httpx.AsyncClient, url: str) -> SourceProbe:
+        """
+        Probes one player; failures are recorded on the probe rather than raised.
+        """
+        kind = "hls" if ".m3u8" in urlparse(url).path else "mp4"
+        probe = SourceProbe(url=url, kind=kind)
+        hint = QUALITY_RE.search(urlparse(url).path)
+        probe.height = int(hint.group(1)) if hint else None
+        try:
+            if kind == "hls":
+                response = await client.get(url)
+                response.raise_for_status()
+                text, base_url = response.text, str(response.url)
+                if is_master_playlist(text):
+                    variant = choose_variant(parse_master_playlist(text, base_url), self.max_bandwidth)
+                    probe.bandwidth = variant.bandwidth
+                    probe.height = variant.resolution[1] if variant.resolution else probe.height
+                    response = await client.get(variant.url)
+                    response.raise_for_status()
+                    text, base_url = response.text, str(response.url)
+                segments = parse_media_playlist(text, base_url).segments
+                if not segments:
+                    raise ValueError("playlist without segments")
+                await self._sample(client, segments[0].url, probe)
+            else:
+                probe.size = _content_length(await self._sample(client, url, probe))
+            probe.ok = True
+        except (httpx.HTTPError, ValueError) as e:
+            probe.error = f"{type(e).__name__}: {e}".splitlines()[0]
+        metrics.inc("source_probes_total", host=urlparse(url).netloc, result="ok" if probe.ok else "failed")
+        return probe
+
+    async def probe_all(self, players: Sequence[str], headers: Optional[Dict[str, str]] = None) -> List[SourceProbe]:
+        async with self.transport.async_client(
+            headers=headers or {}, follow_redirects=True, timeout=self.timeout
+        ) as client:
+            return list(await asyncio.gather(*(self.probe(client, url) for url in players)))
+
+    def choose(self, probes: Sequence[SourceProbe]) -> Optional[SourceProbe]:
+        """
+        Applies the policy to probed players; None if every probe failed.
+        """
+        working = [probe for probe in probes if probe.ok]
+        if not working:
+            return None
+        fastest = max(working, key=lambda probe: probe.throughput)
+        if self.policy == "fastest":
+            return fastest
+        if self.policy == "balanced":
+            working = [probe for probe in working if probe.throughput >= self.min_speed]
+            if not working:
+                return fastest
+        # max() keeps the first of equals, so ties go to the better-ranked player.
+        return max(working, key=lambda probe: (probe.quality, probe.throughput))
+
+    async def select(self, players: Sequence[str], headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Returns the player to download under the policy. Falls back to the
+        first player when every probe fails, so the download still gets tried.
+        """
+        if not players:
+            return None
+        if self.policy == "first" or len(players) == 1:
+            return players[0]
+        probes = await self.probe_all(players, headers)
+        chosen = self.choose(probes)
+        for probe in probes:
+            log.debug("Source probe", url=probe.url, ok=probe.ok, height=probe.height, bandwidth=probe.bandwidth,
+                      size=probe.size, kb_per_s=round(probe.throughput / 1024), error=probe.error)
+        if chosen is None:
+            log.warning("Every source probe failed, keeping the first player", url=players[0])
+            return players[0]
+        metrics.inc("source_selected_total", policy=self.policy, kind=chosen.kind)
+        log.debug("Source selected", url=chosen.url, policy=self.policy, height=chosen.height,
+                  kb_per_s=round(chosen.throughput / 1024))
+        return chosen.url
@@ -1,58 +1,88 @@
+import contextvars
 import re
-from typing import List, Dict, Optional, Set
-from httpx_html import HTMLSession
-from httpx import RequestError
-from selectolax.parser import HTMLParser
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
+from httpx import HTTPError, RequestError, Response, TransportError
+from selectolax.parser import HTMLParser, Node
+from .extractor import classify_media_urls, find_m3u8, find_mp4
 from .helper import get_domain
+from .host_health import HostHealth, host_health
+from .http_cache import ResponseCache, CachedClient
+from .logs import get_logger
+from .rate_limit import HostRateLimiter
+from .retry import RetryPolicy, CrawlDeadline
+from .transport import SharedTransport, shared_transport
 
+log = get_logger(__name__)
 
-class LarozaScraper:
+# `page=N` in the pagination links of category (and series) pages.
+PAGE_RE = re.compile(r"([?&])page=(\d+)")
+# "الحلقة 12" / "حلقة 12" / "Episode 12" in an episode title; \d also matches Arabic-Indic digits.
+EPISODE_NUMBER_RE = re.compile(r"(?:الحلقة|حلقة|episode|ep\.?)\s*(\d+)", re.IGNORECASE)
+
+
+class BaseLarozaScraper:
     """
-    A utility class for scraping Laroza, providing methods to extract MP4 URLs,
-    fetch pagination details, and extract series and episode data.
+    Shared parsing logic for the sync and async Laroza scrapers.
+
+    Subclasses are responsible for fetching pages; everything here works on
+    already downloaded HTML/text so both transports produce identical results.
+    HTML is handed to selectolax as raw bytes whenever possible, so each page
+    is decoded and parsed exactly once.
     """
 
-    def __init__(self):
+    PLAYERS_NAMES = [
+        "okprime",
+        "vidspeeds",
+        "vidroba",
+        "uqload",
+        "ok.ru",
+        "vk",
+    ]
+    MAX_PAGES = 100  # Upper bound on the pages fetched for one listing
+
+    @staticmethod
+    def page_source(response: Response) -> Union[str, bytes]:
         """
-        Initializes the LarozaScraper with an HTMLSession.
+        Returns the body to parse: decoded text when the server declares a
+        charset, otherwise the raw bytes so lexbor can detect the encoding.
         """
-        self.session = HTMLSession()
-        self.PLAYERS_NAMES = [
-            "okprime",
-            "vidspeeds",
-            "vidroba",
-            "uqload",
-            "ok.ru",
-            "vk",
-        ]
+        if response.charset_encoding:
+            return response.text
+        return response.content
 
-    def extract_media_urls(self, text: str) -> Optional[List[str]]:
+    @staticmethod
+    def html_parser(html: Union[str, bytes]) -> HTMLParser:
+        """
+        Builds a selectolax parser, detecting the encoding of byte input from
+        its BOM or <meta charset> and falling back to lexbor's sniffing.
         """
-        Extracts MP4 and M3U8 URLs from the provided text and classifies M3U8 URLs.
+        if isinstance(html, bytes):
+            return HTMLParser(html, detect_encoding=True, use_meta_tags=True)
+        return HTMLParser(html)
+
+    def extract_media_urls(self, text: str) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """
+        Extracts M3U8 URLs from the provided text (including packed scripts) and classifies them.
 
         Args:
             text (str): The input text containing possible MP4/M3U8 URLs.
 
         Returns:
-            Tuple[Optional[List[str]], Optional[List[str]]]: 
+            Tuple[Optional[List[str]], Optional[List[str]]]:
             - First list: M3U8 URLs without extra parameters.
             - Second list: M3U8 URLs with additional parameters.
         """
-        pattern = r"https?://\S+?\.(?:mp4|m3u8)(?:\?.*)?"
-        urls = re.findall(pattern, text)
-
-        if not urls:
-            return None, None
-
-        clean_urls = [url for url in urls if url.endswith(".m3u8")]
-        full_urls = [url for url in urls if ".m3u8?" in url]
-
-        return clean_urls if clean_urls else None, full_urls if full_urls else None
-
+        groups = classify_media_urls(text)
+        clean_urls = [media.url for media in groups["m3u8"]]
+        full_urls = [media.url for media in groups["m3u8_query"]]
+        return clean_urls or None, full_urls or None
 
     def extract_mp4s(self, text: str) -> Optional[List[str]]:
         """
-        Extracts MP4 URLs from the provided text.
+        Extracts uqload-style MP4 URLs (ending in `v.mp4`) from the provided text.
 
         Args:
             text (str): The input text containing possible MP4 URLs.
@@ -60,92 +90,373 @@ class LarozaScraper:
         Returns:
             Optional[List[str]]: A list of MP4 URLs if found, otherwise None.
         """
-        try:
-            pattern = r"https?://.*?v.mp4"
-            mp4_urls = re.findall(pattern, text)
-            return mp4_urls if mp4_urls else None
-        except Exception as e:
-            print(f"Error extracting MP4 URLs: {e}")
-            return None
+        mp4_urls = [
+            media.url for media in classify_media_urls(text)["mp4"]
+            if media.url.split("?", 1)[0].endswith("v.mp4")
+        ]
+        return mp4_urls or None
 
-    def fetch_series_list(
-        self, url: str, headers: Dict[str, str]
-    ) -> List[Dict[str, str]]:
+    @staticmethod
+    def page_url(url: str, page: int) -> str:
+        """
+        Returns the URL of another page of a listing, setting its `page` parameter.
+        """
+        if PAGE_RE.search(url):
+            return PAGE_RE.sub(lambda match: f"{match.group(1)}page={page}", url, count=1)
+        return f"{url}{'&' if '?' in url else '?'}page={page}"
+
+    def last_page(self, parser: HTMLParser) -> int:
+        """
+        Returns the highest page number linked from a listing's pagination
+        (1 when it has none), capped at MAX_PAGES.
+        """
+        pages = [
+            int(match.group(2))
+            for anchor in parser.css(".pagination a")
+            for match in [PAGE_RE.search(anchor.attributes.get("href") or "")]
+            if match
+        ]
+        return min(max(pages, default=1), self.MAX_PAGES)
+
+    @staticmethod
+    def _series_entries(parser: HTMLParser) -> List[Dict[str, str]]:
+        all_series = parser.css_first("div.pm-category-description")
+        if not all_series:
+            raise ValueError("Could not find series container in the HTML.")
+
+        entries = []
+        for anchor in all_series.css("a.icon-link"):
+            series_name = anchor.text().strip()
+            series_url = anchor.attributes.get("href", "").strip()
+            if series_name and series_url:  # Ensure no empty values
+                entries.append({"series_name": series_name, "series_url": series_url})
+        return entries
+
+    @staticmethod
+    def merge_series_pages(pages: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """
+        Merges the series of every page of a category, in page order and without duplicates.
         """
-        Fetches a unique list of series names and URLs from the given site.
+        unique_series: Set[tuple] = set()  # To ensure uniqueness
+        series_data: List[Dict[str, str]] = []
+        for page in pages:
+            for series in page:
+                series_tuple = (series["series_name"], series["series_url"])
+                if series_tuple not in unique_series:
+                    unique_series.add(series_tuple)
+                    series_data.append(series)
+        return series_data
+
+    def parse_series_page(self, html: Union[str, bytes]) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Parses one page of a category into its series and the category's last page number.
+
+        Raises:
+            ValueError: If the series container is missing from the page.
+        """
+        parser = self.html_parser(html)
+        return self._series_entries(parser), self.last_page(parser)
+
+    def parse_series_list(self, html: Union[str, bytes]) -> List[Dict[str, str]]:
+        """
+        Parses a category page into a unique list of series names and URLs.
 
         Args:
-            url (str): The URL of the series list page.
-            headers (Dict[str, str]): The request headers.
+            html (Union[str, bytes]): The category page HTML, decoded or raw.
 
         Returns:
             List[Dict[str, str]]: A list of dictionaries containing series names and URLs.
+
+        Raises:
+            ValueError: If the series container is missing from the page.
         """
-        try:
-            response = self.session.get(url=url, headers=headers)
-            response.raise_for_status()  # Raise error for failed requests
+        return self.merge_series_pages([self._series_entries(self.html_parser(html))])
+
+    @staticmethod
+    def _episode_title(li: Node) -> str:
+        title = li.css_first("h3 a")
+        if title is not None and title.text().strip():
+            return title.text().strip()
+        image = li.css_first("img")
+        return (image.attributes.get("alt") or "") if image is not None else ""
+
+    def parse_episodes_page(
+        self, html: Union[str, bytes], series_data: Dict[str, str]
+    ) -> Tuple[List[Dict], int]:
+        """
+        Parses one page of a series into its episode entries and the series' last page number.
 
-            html = response.html.html
-            parser = HTMLParser(html)
+        Entries are {"ep_url", "title_number"}, where title_number is the
+        episode number read from the title (None when it has none).
+        """
+        parser = self.html_parser(html)
+        base_url = get_domain(series_data["series_url"])
+        ul = parser.css_first("ul.pm-ul-browse-videos")
+        if not ul:
+            return [], 1
+
+        entries = []
+        for li in ul.css("li"):
+            anchor = li.css_first("a")
+            if anchor is None or not anchor.attributes.get("href"):
+                continue
+            match = EPISODE_NUMBER_RE.search(self._episode_title(li))
+            entries.append({
+                "ep_url": f"{base_url}/{anchor.attributes['href'].replace('video', 'play').strip()}",
+                "title_number": int(match.group(1)) if match else None,
+            })
+        return entries, self.last_page(parser)
+
+    @staticmethod
+    def merge_episode_pages(name: str, pages: List[List[Dict]]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Merges the episode entries of every page of a series.
 
-            all_series = parser.css_first("div.pm-category-description")
-            if not all_series:
-                raise ValueError("Could not find series container in the HTML.")
+        Episodes are deduplicated by URL and numbered from their titles. The
+        listing is newest first, so episodes without a number in their title
+        are numbered after the highest title number, oldest first; an episode
+        whose title repeats an earlier (newer) entry's number is dropped. The
+        result is sorted by episode number, latest last.
+        """
+        seen: Set[str] = set()
+        numbered: Dict[int, str] = {}
+        untitled: List[str] = []
+        for entry in (entry for page in pages for entry in page):
+            if entry["ep_url"] in seen:
+                continue
+            seen.add(entry["ep_url"])
+            number = entry["title_number"]
+            if number is None:
+                untitled.append(entry["ep_url"])
+            elif number in numbered:
+                log.warning("Duplicate episode number, skipping", series=name, episode=number, url=entry["ep_url"])
+            else:
+                numbered[number] = entry["ep_url"]
+
+        next_number = max(numbered, default=0) + 1
+        for offset, url in enumerate(reversed(untitled)):
+            numbered[next_number + offset] = url
+        episodes = [{"ep_number": number, "ep_url": url} for number, url in sorted(numbered.items())]
+        assert len({episode["ep_number"] for episode in episodes}) == len(episodes), "duplicate episode numbers"
+        return {"name": name, "episodes": episodes}
+
+    def parse_episodes(
+        self, html: Union[str, bytes], series_data: Dict[str, str]
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Parses a series page into its episode list.
+        """
+        entries, _ = self.parse_episodes_page(html, series_data)
+        return self.merge_episode_pages(series_data["series_name"], [entries])
 
-            anchors = all_series.css("a.icon-link")
+    def parse_embeds(self, html: Union[str, bytes]) -> List[str]:
+        """
+        Parses a play page and returns the embed URLs of supported players.
+        """
+        parser = self.html_parser(html)
 
-            unique_series: Set[tuple] = set()  # To ensure uniqueness
-            series_data: List[Dict[str, str]] = []
+        # Find the first <ul> element with class 'WatchList'
+        ul = parser.css_first("ul.WatchList")
+        if not ul:
+            return []  # Return an empty list if the element is not found
+
+        # Extract embed URLs that match the supported players
+        return [
+            li.attributes["data-embed-url"].strip()
+            for li in ul.css("li")
+            if "data-embed-url" in li.attributes
+            and any(
+                player in li.attributes["data-embed-url"]
+                for player in self.PLAYERS_NAMES
+            )
+        ]
 
-            for anchor in anchors:
-                series_name = anchor.text().strip()
-                series_url = anchor.attributes.get("href", "").strip()
+    def parse_media_url(self, text: str) -> str:
+        """
+        Returns the most relevant M3U8 URL found in a player page, or "".
+        """
+        return find_m3u8(text)
 
-                if series_name and series_url:  # Ensure no empty values
-                    series_tuple = (series_name, series_url)
-                    if series_tuple not in unique_series:
-                        unique_series.add(series_tuple)
-                        series_data.append(
-                            {"series_name": series_name, "series_url": series_url}
-                        )
+    def parse_uqload_mp4(self, text: str) -> str:
+        """
+        Returns the first uqload MP4 link found in a player page, or "".
+        """
+        return find_mp4(text)
+
+
+class LarozaScraper(BaseLarozaScraper):
+    """
+    A utility class for scraping Laroza, providing methods to extract MP4 URLs,
+    fetch pagination details, and extract series and episode data.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        health: HostHealth = host_health,
+        retry_policy: Optional[RetryPolicy] = None,
+        deadline: Optional[CrawlDeadline] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        render_js: bool = False,
+        transport: SharedTransport = shared_transport,
+        page_workers: int = 4,
+    ):
+        """
+        Initializes the LarozaScraper with an httpx client.
+
+        Args:
+            cache (Optional[ResponseCache]): On-disk response cache; when given,
+                GET requests are served or revalidated through it.
+            health (HostHealth): Per-host health tracker and circuit breaker.
+            retry_policy (Optional[RetryPolicy]): Retry/backoff and timeout settings.
+            deadline (Optional[CrawlDeadline]): Total time budget of the crawl.
+            rate_limiter (Optional[HostRateLimiter]): Per-host token buckets.
+            render_js (bool): Render pages in headless Chromium through httpx_html
+                before parsing. Only needed for JavaScript-built pages; much slower.
+            transport (SharedTransport): Connection pools shared with the async
+                scraper, the resolvers and the HLS engine.
+            page_workers (int): Threads fetching the extra pages of a paginated listing.
+        """
+        self.cache = cache
+        self.health = health
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.deadline = deadline or CrawlDeadline()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.render_js = render_js
+        self.page_workers = page_workers
+        if cache:
+            self.session = transport.client(CachedClient, cache=cache, follow_redirects=True)
+        else:
+            self.session = transport.client(follow_redirects=True)
+        self.PLAYERS_NAMES = list(BaseLarozaScraper.PLAYERS_NAMES)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> Response:
+        """
+        Performs a GET request through the host's circuit breaker, retrying
+        transient failures according to the retry policy. The breaker is
+        checked once per request and only its final outcome is recorded in
+        the host health stats, so retried blips do not open the circuit.
+        """
+        host = urlparse(url).netloc
+        self.health.check(host)
+        attempt = 0
+        while True:
+            if not (self.cache and self.cache.has_fresh(url)):
+                time.sleep(self.rate_limiter.acquire(host))
+            timeout = self.deadline.timeout(self.retry_policy.timeout)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url=url, headers=headers, timeout=timeout)
+            except TransportError as e:
+                delay = self.retry_policy.next_delay(self.deadline, "GET", attempt)
+                if delay is None:
+                    self.health.record(host, False, time.perf_counter() - start, str(e))
+                    raise
+                log.warning("Retrying request", url=url, delay=round(delay, 1), error=e)
+            else:
+                if response.extensions.get("from_cache"):
+                    break
+                self.rate_limiter.feedback(host, response.status_code)
+                delay = self.retry_policy.next_delay(self.deadline, "GET", attempt, response)
+                if delay is None:
+                    failed = response.status_code >= 500 or response.status_code == 429
+                    self.health.record(
+                        host, not failed, time.perf_counter() - start,
+                        f"HTTP {response.status_code}" if failed else None,
+                    )
+                    break
+                log.warning("Retrying request", url=url, delay=round(delay, 1), status=response.status_code)
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+        response.raise_for_status()
+        return response
+
+    def _page(self, response: Response) -> Union[str, bytes]:
+        """
+        Returns the HTML to parse, rendered through httpx_html when render_js is on.
+        """
+        if not self.render_js:
+            return self.page_source(response)
+        # Opt-in only: httpx_html pulls in lxml, pyquery and pyppeteer.
+        from httpx_html import HTML
+
+        page = HTML(url=str(response.url), html=response.content)
+        page.render()
+        return page.html
 
-            return series_data
+    def _fetch_pages(self, url: str, last_page: int, headers: Dict[str, str], parse) -> List:
+        """
+        Fetches pages 2..last_page of a listing at once and returns ``parse``
+        of every page that loaded; a failed page is reported and skipped.
+        """
+        def load(page: int):
+            page_url = self.page_url(url, page)
+            try:
+                return parse(self._page(self._get(page_url, headers)))
+            except (HTTPError, ValueError) as e:
+                log.warning("Skipping page", url=page_url, error=e)
+                return None
+
+        pages = range(2, last_page + 1)
+        if not pages:
+            return []
+        if self.render_js:
+            # Headless Chromium renders one page at a time.
+            results = [load(page) for page in pages]
+        else:
+            # Page requests run in the caller's context, e.g. inside its metrics span.
+            context = contextvars.copy_context()
+            with ThreadPoolExecutor(max_workers=min(self.page_workers, len(pages))) as pool:
+                results = list(pool.map(lambda page: context.copy().run(load, page), pages))
+        return [result for result in results if result is not None]
 
+    def fetch_series_list(
+        self, url: str, headers: Dict[str, str]
+    ) -> List[Dict[str, str]]:
+        """
+        Fetches a unique list of series names and URLs from the given site,
+        following the category's pagination.
+
+        Args:
+            url (str): The URL of the series list page.
+            headers (Dict[str, str]): The request headers.
+
+        Returns:
+            List[Dict[str, str]]: A list of dictionaries containing series names and URLs.
+        """
+        try:
+            response = self._get(url, headers)
+            first_page, last_page = self.parse_series_page(self._page(response))
         except RequestError as e:
-            print(f"Request failed: {e}")
+            log.error("Request failed", error=e)
             return []
         except ValueError as e:
-            print(f"Parsing error: {e}")
+            log.error("Parsing error", error=e)
             return []
 
+        pages = self._fetch_pages(url, last_page, headers, lambda html: self.parse_series_page(html)[0])
+        return self.merge_series_pages([first_page, *pages])
+
     def fetch_episodes(
         self, series_data: Dict[str, str], headers: Dict[str, str]
     ) -> Dict[str, List[Dict[str, str]]]:
         """
-        Fetches the episode list from the given series URL.
+        Fetches the episode list from the given series URL, following its pagination.
         """
         try:
-            resp = self.session.get(url=series_data["series_url"], headers=headers)
-            resp.raise_for_status()
+            resp = self._get(series_data["series_url"], headers)
         except Exception as e:
-            print(f"Error fetching episodes: {e}")
+            log.error("Error fetching episodes", series=series_data["series_name"], error=e)
             return {"name": series_data["series_name"], "episodes": []}
 
-        parser = HTMLParser(resp.html.html)
-        base_url = get_domain(series_data["series_url"])
-        ul = parser.css_first("ul.pm-ul-browse-videos")
-        if not ul:
-            return {"name": series_data["series_name"], "episodes": []}
-
-        episodes = [
-            {
-                "ep_number": i + 1,
-                "ep_url": f"{base_url}/{li.css_first('a').attributes['href'].replace('video', 'play').strip()}",
-            }
-            for i, li in enumerate(ul.css("li"))
-        ]
-
-        return {"name": series_data["series_name"], "episodes": episodes}
+        first_page, last_page = self.parse_episodes_page(self._page(resp), series_data)
+        pages = self._fetch_pages(
+            series_data["series_url"], last_page, headers,
+            lambda html: self.parse_episodes_page(html, series_data)[0],
+        )
+        return self.merge_episode_pages(series_data["series_name"], [first_page, *pages])
 
     def extract_embeds(self, url: str, headers: Dict[str, str]) -> List[str]:
         """
@@ -160,30 +471,12 @@ class LarozaScraper:
         """
         try:
             # Send a GET request to the URL
-            resp = self.session.get(url=url, headers=headers)
-            resp.raise_for_status()  # Ensure the request was successful
-
-            # Parse the HTML content
-            parser = HTMLParser(resp.html.html)
-
-            # Find the first <ul> element with class 'WatchList'
-            ul = parser.css_first("ul.WatchList")
-            if not ul:
-                return []  # Return an empty list if the element is not found
-
-            # Extract embed URLs that match the supported players
-            return [
-                li.attributes["data-embed-url"].strip()
-                for li in ul.css("li")
-                if "data-embed-url" in li.attributes
-                and any(
-                    player in li.attributes["data-embed-url"]
-                    for player in self.PLAYERS_NAMES
-                )
-            ]
+            resp = self._get(url, headers)
+
+            return self.parse_embeds(self._page(resp))
 
         except Exception as e:
-            print(f"An error occurred while extracting embed links: {e}")
+            log.error("Error extracting embed links", url=url, error=e)
             return []
 
 
@@ -192,20 +485,12 @@ class LarozaScraper:
         Fetches a URL, extracts media URLs, and returns the most relevant one.
         """
         try:
-            response = self.session.get(url=url, headers=headers)
-            response.raise_for_status()
-            text = response.text
-            clean_urls, full_urls = self.extract_media_urls(text)
-            if clean_urls:
-                return clean_urls[0]
-            if full_urls:
-                sanitized_url = full_urls[0].replace('"}],', "") if '"}],' in full_urls[0] else full_urls[0]
-
-                return sanitized_url
+            response = self._get(url, headers)
+            return self.parse_media_url(response.text)
         except TypeError as e:
-            print(f"TypeError occurred: {e}")
+            log.error("TypeError occurred", url=url, error=e)
         except Exception as e:
-            print(f"An error occurred: {e}")
+            log.error("Error extracting media URL", url=url, error=e)
         return ""
 
 
@@ -214,16 +499,13 @@ class LarozaScraper:
         Fetches MP4 links from a given URL.
         """
         try:
-            response = self.session.get(url=url, headers=headers)
-            response.raise_for_status()
-            html_content = response.html.html
-            mp4 = self.extract_mp4s(str(html_content))
-            return mp4[0] if mp4 else ""
+            response = self._get(url, headers)
+            return self.parse_uqload_mp4(response.text)
         except Exception as e:
-            print(f"Error fetching MP4 links: {e}")
-            return []
-        
-        
+            log.error("Error fetching MP4 links", url=url, error=e)
+            return ""
+
+
 
     def close_session(self):
         """
@@ -232,4 +514,21 @@ class LarozaScraper:
         self.session.close()
 
 
-scraper = LarozaScraper()
+_scraper: Optional[LarozaScraper] = None
+
+
+def get_scraper() -> LarozaScraper:
+    """
+    Returns the shared LarozaScraper, creating its session and cache on first use.
+    """
+    global _scraper
+    if _scraper is None:
+        _scraper = LarozaScraper(cache=ResponseCache())
+    return _scraper
+
+
+def __getattr__(name):
+    # Keeps `from .spider import scraper` working without opening a session at import time.
+    if name == "scraper":
+        return get_scraper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,515 @@
+import asyncio
+import contextlib
+import socket
+import threading
+import time
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Coroutine, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from .logs import get_logger
+from .metrics import current_stage, metrics
+
+log = get_logger(__name__)
+
+
+@dataclass
+class TransportConfig:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    http2: bool = True  # Negotiated through ALPN, so HTTP/1.1-only hosts are unaffected
+    dns_ttl: float = 300.0  # Seconds a resolved address is reused, 0 to disable
+
+
+def http2_available() -> bool:
+    """
+    Returns True when the optional `h2` package needed for HTTP/2 is installed.
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TransportStats:
+    """
+    Thread-safe request, connection and DNS counters per host.
+
+    A request that did not open a connection reused a pooled one (or an
+    HTTP/2 stream on one), so ``1 - connections / requests`` is the share
+    of requests that skipped the TCP and TLS handshakes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "connections": 0, "http2": 0}
+        )
+        self.dns = {"hits": 0, "misses": 0}
+
+    def count(self, host: str, field: str) -> None:
+        with self._lock:
+            self.hosts[host][field] += 1
+
+    def count_dns(self, hit: bool) -> None:
+        with self._lock:
+            self.dns["hits" if hit else "misses"] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns the counters per host with their connection reuse ratio.
+        """
+        with self._lock:
+            return {
+                host: {
+                    **counts,
+                    "reuse": 1.0 - counts["connections"] / counts["requests"] if counts["requests"] else 0.0,
+                }
+                for host, counts in self.hosts.items()
+            }
+
+    def report(self) -> None:
+        """
+        Logs the reuse ratio of every host and the DNS cache counters.
+        """
+        summary = self.summary()
+        requests = sum(counts["requests"] for counts in summary.values())
+        connections = sum(counts["connections"] for counts in summary.values())
+        reuse = 1.0 - connections / requests if requests else 0.0
+        log.info("HTTP pool", requests=requests, connections=connections, reuse=f"{reuse:.0%}",
+                 dns_hits=self.dns["hits"], dns_misses=self.dns["misses"])
+        for host, counts in sorted(summary.items(), key=lambda item: -item[1]["requests"]):
+            log.info(
+                "HTTP pool host",
+                host=host,
+                requests=counts["requests"],
+                connections=counts["connections"],
+                http2=counts["http2"],
+                reuse=f"{counts['reuse']:.0%}",
+            )
+
+
+class DNSCache:
+    """
+    Caches getaddrinfo results for ``ttl`` seconds, shared by the sync and
+    async pools, so repeated connections to the same few hosts skip lookups.
+    """
+
+    def __init__(self, ttl: float, stats: TransportStats):
+        self.ttl = ttl
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def _cached(self, host: str, port: int) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get((host, port))
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self.stats.count_dns(True)
+            return entry[1]
+        self.stats.count_dns(False)
+        return None
+
+    def _store(self, host: str, port: int, infos) -> List[str]:
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[(host, port)] = (time.monotonic(), addresses)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        """
+        Drops a host's addresses, e.g. after a connection to them failed.
+        """
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        if self.ttl <= 0:
+            return [host]
+        addresses = self._cached(host, port)
+        if addresses is None:
+            addresses = self._store(host, port, socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+        return addresses
+
+    async def aresolve(self, host: str, port: int) -> List[str]:
+        if self.ttl <= 0:
+            return [host]
+        addresses = self._cached(host, port)
+        if addresses is None:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = self._store(host, port, infos)
+        return addresses
+
+
+class _Backend(httpcore.SyncBackend):
+    """
+    Connects through the DNS cache and counts every new connection. TLS
+    still uses the original host name for SNI and certificate checks.
+    """
+
+    def __init__(self, dns: DNSCache, stats: TransportStats):
+        self.dns = dns
+        self.stats = stats
+
+    def connect_tcp(self, host: str, port: int, timeout=None, local_address=None, socket_options=None):
+        self.stats.count(host, "connections")
+        addresses = self.dns.resolve(host, port)
+        for address in addresses[:-1]:
+            try:
+                return super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError:
+                continue
+        try:
+            return super().connect_tcp(addresses[-1], port, timeout, local_address, socket_options)
+        except httpcore.ConnectError:
+            self.dns.forget(host, port)
+            raise
+
+
+class _AsyncBackend(httpcore.AnyIOBackend):
+    def __init__(self, dns: DNSCache, stats: TransportStats):
+        self.dns = dns
+        self.stats = stats
+
+    async def connect_tcp(self, host: str, port: int, timeout=None, local_address=None, socket_options=None):
+        self.stats.count(host, "connections")
+        addresses = await self.dns.aresolve(host, port)
+        for address in addresses[:-1]:
+            try:
+                return await super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError:
+                continue
+        try:
+            return await super().connect_tcp(addresses[-1], port, timeout, local_address, socket_options)
+        except httpcore.ConnectError:
+            self.dns.forget(host, port)
+            raise
+
+
+def _pool_options(config: TransportConfig) -> Dict:
+    return {
+        "ssl_context": httpx.create_ssl_context(),
+        "max_connections": config.max_connections,
+        "max_keepalive_connections": config.max_keepalive_connections,
+        "keepalive_expiry": config.keepalive_expiry,
+        "http2": config.http2 and http2_available(),
+    }
+
+
+@contextlib.contextmanager
+def _map_errors(request: httpx.Request) -> Iterator[None]:
+    """
+    Re-raises httpcore errors as the httpx exception of the same name (e.g.
+    httpcore.ReadTimeout as httpx.ReadTimeout), so callers only catch httpx errors.
+    """
+    try:
+        yield
+    except httpcore.TimeoutException as e:
+        raise _httpx_error(e)(str(e), request=request) from e
+    except (httpcore.NetworkError, httpcore.ProtocolError, httpcore.ProxyError, httpcore.UnsupportedProtocol) as e:
+        raise _httpx_error(e)(str(e), request=request) from e
+
+
+def _httpx_error(error: Exception) -> type:
+    for cls in type(error).__mro__:
+        mapped = getattr(httpx, cls.__name__, None)
+        if isinstance(mapped, type) and issubclass(mapped, httpx.TransportError):
+            return mapped
+    return httpx.TransportError
+
+
+def _httpcore_request(request: httpx.Request) -> httpcore.Request:
+    return httpcore.Request(
+        method=request.method,
+        url=httpcore.URL(
+            scheme=request.url.raw_scheme,
+            host=request.url.raw_host,
+            port=request.url.port,
+            target=request.url.raw_path,
+        ),
+        headers=request.headers.raw,
+        content=request.stream,
+        extensions=request.extensions,
+    )
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """
+    Streams a pooled response body, counting its bytes into
+    ``http_response_bytes_total`` under the stage that sent the request.
+    """
+
+    def __init__(self, stream: Iterable[bytes], request: httpx.Request, stage: str):
+        self._stream = stream
+        self.request = request
+        self.stage = stage
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        with _map_errors(self.request):
+            for chunk in self._stream:
+                self.size += len(chunk)
+                yield chunk
+
+    def close(self) -> None:
+        # Closing the httpcore stream hands the connection back to the pool.
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+        metrics.inc("http_response_bytes_total", self.size, host=self.request.url.host, stage=self.stage)
+
+
+class _AsyncMeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes], request: httpx.Request, stage: str):
+        self._stream = stream
+        self.request = request
+        self.stage = stage
+        self.size = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_errors(self.request):
+            async for chunk in self._stream:
+                self.size += len(chunk)
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+        metrics.inc("http_response_bytes_total", self.size, host=self.request.url.host, stage=self.stage)
+
+
+def _record_response(request: httpx.Request, response: Optional[httpx.Response], error: Optional[Exception], start: float) -> None:
+    host = request.url.host
+    status = str(response.status_code) if response is not None else type(error).__name__
+    metrics.inc("http_requests_total", host=host, status=status)
+    metrics.observe("http_request_duration_seconds", time.perf_counter() - start, host=host)
+
+
+class _PooledTransport(httpx.BaseTransport):
+    """
+    A transport over an httpcore connection pool that outlives the clients
+    using it: closing a client leaves the pool open for the next one.
+    """
+
+    def __init__(self, config: TransportConfig, dns: DNSCache, stats: TransportStats):
+        self.stats = stats
+        self.backend = _Backend(dns, stats)
+        self.pool = httpcore.ConnectionPool(**_pool_options(config), network_backend=self.backend)
+
+    def rebuild(self, config: TransportConfig) -> None:
+        """
+        Swaps in a pool built from ``config`` and closes the old one.
+        """
+        old_pool, self.pool = self.pool, httpcore.ConnectionPool(**_pool_options(config), network_backend=self.backend)
+        old_pool.close()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.SyncByteStream)
+        host = request.url.host
+        self.stats.count(host, "requests")
+        start = time.perf_counter()
+        try:
+            with _map_errors(request):
+                core_response = self.pool.handle_request(_httpcore_request(request))
+        except httpx.TransportError as e:
+            _record_response(request, None, e, start)
+            raise
+        response = httpx.Response(
+            status_code=core_response.status,
+            headers=core_response.headers,
+            stream=_MeteredStream(core_response.stream, request, current_stage()),
+            extensions=core_response.extensions,
+        )
+        _record_response(request, response, None, start)
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.stats.count(host, "http2")
+        return response
+
+    def close(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        self.pool.close()
+
+
+class _AsyncPooledTransport(httpx.AsyncBaseTransport):
+    def __init__(self, config: TransportConfig, dns: DNSCache, stats: TransportStats):
+        self.stats = stats
+        self.pool = httpcore.AsyncConnectionPool(**_pool_options(config), network_backend=_AsyncBackend(dns, stats))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.AsyncByteStream)
+        host = request.url.host
+        self.stats.count(host, "requests")
+        start = time.perf_counter()
+        try:
+            with _map_errors(request):
+                core_response = await self.pool.handle_async_request(_httpcore_request(request))
+        except httpx.TransportError as e:
+            _record_response(request, None, e, start)
+            raise
+        response = httpx.Response(
+            status_code=core_response.status,
+            headers=core_response.headers,
+            stream=_AsyncMeteredStream(core_response.stream, request, current_stage()),
+            extensions=core_response.extensions,
+        )
+        _record_response(request, response, None, start)
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.stats.count(host, "http2")
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        await self.pool.aclose()
+
+
+class SharedTransport:
+    """
+    The connection pools shared by every HTTP client of a run: the sync
+    scraper, the async scraper and resolvers, and the HLS download engine.
+
+    Clients are cheap wrappers built with ``client()`` / ``async_client()``;
+    they keep their own headers and timeouts but send through one pool, so
+    hundreds of requests to the same few hosts reuse keep-alive connections
+    (or HTTP/2 streams) instead of paying a TCP and TLS handshake each time.
+    Async connections belong to an event loop, so there is one async pool
+    per loop; ``run()`` keeps a loop per thread alive for blocking callers.
+    ``shutdown()`` closes the pools and those loops at the end of a run.
+    yt-dlp downloads still open their own connections.
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        self.config = config or TransportConfig()
+        self.stats = TransportStats()
+        self.dns = DNSCache(self.config.dns_ttl, self.stats)
+        self._lock = threading.Lock()
+        self._sync: Optional[_PooledTransport] = None
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncPooledTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._local = threading.local()
+        self._runners: List[asyncio.Runner] = []
+
+    def configure(self, **options) -> None:
+        """
+        Updates the pool settings (see TransportConfig). The sync pool is
+        rebuilt in place, so clients created before keep working; async pools
+        are closed and recreated on their loop's next client. Call it before the first request.
+        """
+        for name, value in options.items():
+            setattr(self.config, name, value)
+        self.dns.ttl = self.config.dns_ttl
+        with self._lock:
+            if self._sync is not None:
+                self._sync.rebuild(self.config)
+            old_pools, self._async = list(self._async.items()), weakref.WeakKeyDictionary()
+        for loop, transport in old_pools:
+            _close_on_loop(loop, transport)
+
+    @property
+    def transport(self) -> _PooledTransport:
+        with self._lock:
+            if self._sync is None:
+                self._sync = _PooledTransport(self.config, self.dns, self.stats)
+            return self._sync
+
+    @property
+    def async_transport(self) -> _AsyncPooledTransport:
+        """
+        The async pool of the running event loop, created on first use.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async:
+                self._async[loop] = _AsyncPooledTransport(self.config, self.dns, self.stats)
+            return self._async[loop]
+
+    def client(self, client_class=httpx.Client, **kwargs) -> httpx.Client:
+        """
+        Builds a client (``client_class``, e.g. CachedClient) on the shared pool.
+        """
+        return client_class(transport=self.transport, **kwargs)
+
+    def async_client(self, **kwargs) -> httpx.AsyncClient:
+        """
+        Builds an AsyncClient on the running loop's shared pool.
+        """
+        return httpx.AsyncClient(transport=self.async_transport, **kwargs)
+
+    def run(self, coroutine: Coroutine):
+        """
+        Runs a coroutine on this thread's long-lived event loop.
+
+        Unlike ``asyncio.run``, the loop (and so its connection pool) survives
+        between calls, so blocking helpers called once per episode or per
+        download keep their connections warm.
+        """
+        runner = getattr(self._local, "runner", None)
+        with self._lock:
+            if runner is None or runner not in self._runners:
+                runner = self._local.runner = asyncio.Runner()
+                self._runners.append(runner)
+        return runner.run(coroutine)
+
+    async def aclose(self) -> None:
+        """
+        Closes the running loop's async pool; call it before the loop ends,
+        e.g. at the end of a coroutine passed to ``asyncio.run``.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._async.pop(loop, None)
+        if transport is not None:
+            await transport.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Closes every pool and the event loops of ``run()``. The transport
+        stays usable: the next client opens new pools.
+        """
+        with self._lock:
+            sync, self._sync = self._sync, None
+            pools, self._async = list(self._async.items()), weakref.WeakKeyDictionary()
+            runners, self._runners = self._runners, []
+        if sync is not None:
+            sync.shutdown()
+        for loop, transport in pools:
+            _close_on_loop(loop, transport)
+        for runner in runners:
+            try:
+                runner.close()
+            except RuntimeError as e:
+                # Still running a coroutine on another thread.
+                log.warning("Event loop not closed", error=str(e))
+
+
+def _close_on_loop(loop: asyncio.AbstractEventLoop, transport: _AsyncPooledTransport) -> None:
+    """
+    Closes an async pool on the loop that owns its connections.
+    """
+    if loop.is_closed():
+        return
+    if not loop.is_running():
+        loop.run_until_complete(transport.shutdown())
+    elif _running_loop() is loop:
+        loop.create_task(transport.shutdown())
+    else:
+        asyncio.run_coroutine_threadsafe(transport.shutdown(), loop)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+shared_transport = SharedTransport()
@@ -0,0 +1,776 @@
+"""
+Crawl, embed, resolve and download stages shared by ``series.py`` and the CLI.
+
+Heavy dependencies (httpx_html, httpx, yt-dlp, fake_useragent) are imported
+inside the stages that use them, so importing this module stays cheap.
+"""
+import asyncio
+import os
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from laroza_ramadan.helpers.catalog_store import CatalogStore
+from laroza_ramadan.helpers.constants import LAROZA_OUTPUT_DIR, METRICS_PATH, RUN_SUMMARY_PATH
+from laroza_ramadan.helpers.helper import append_ndjson, read_ndjson
+from laroza_ramadan.helpers.incremental import (
+    advance_watermarks,
+    episodes_since,
+    load_watermarks,
+    merge_records,
+    save_watermarks,
+    watermark_key,
+)
+from laroza_ramadan.helpers.logs import get_logger
+from laroza_ramadan.helpers.metrics import metrics, trace_key
+from laroza_ramadan.helpers.output_formats import get_format, write_records
+from laroza_ramadan.schemas import Episode, EpisodeEmbeds, EpisodePlayers, Series
+from laroza_ramadan.settings import get_headers, get_settings
+
+if TYPE_CHECKING:
+    from laroza_ramadan.helpers.async_spider import AsyncLarozaScraper
+    from laroza_ramadan.helpers.download_scheduler import DownloadJob, DownloadScheduler
+    from laroza_ramadan.helpers.source_select import SourceSelector
+    from laroza_ramadan.helpers.spider import LarozaScraper
+
+log = get_logger(__name__)
+
+EMBEDS_KEY = ("name", "season", "ep_number")
+SERIES_KEY = ("name", "season")
+PLAYERS_KEY = ("ep_name", "season", "ep_number")
+
+# Append-only logs of the streaming pipeline, removed once a run completes.
+STREAM_LOGS = {stage: f"{LAROZA_OUTPUT_DIR}stream_{stage}.ndjson" for stage in ("series", "embeds", "players")}
+
+
+@lru_cache(maxsize=None)
+def get_store() -> CatalogStore:
+    """
+    Returns the shared catalog store, opening it on first use.
+    """
+    return CatalogStore()
+
+
+@lru_cache(maxsize=None)
+def configure_transport() -> None:
+    """
+    Applies the HTTP pool settings to the shared transport before its first request.
+    """
+    from laroza_ramadan.helpers.transport import shared_transport
+
+    settings = get_settings()
+    shared_transport.configure(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        http2=settings.HTTP2,
+        dns_ttl=settings.DNS_CACHE_TTL,
+    )
+
+
+@lru_cache(maxsize=None)
+def configure_resolvers() -> None:
+    """
+    Attaches the persistent player cache to the resolver registry when PLAYER_CACHE is on.
+    """
+    settings = get_settings()
+    if not settings.PLAYER_CACHE:
+        return
+    from laroza_ramadan.helpers.player_cache import PlayerCache
+    from laroza_ramadan.helpers.resolvers import registry
+
+    registry.cache = PlayerCache(
+        default_ttl=settings.PLAYER_CACHE_DEFAULT_TTL,
+        margin=settings.PLAYER_CACHE_MARGIN,
+        revalidate_after=settings.PLAYER_CACHE_REVALIDATE_AFTER,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_crawl_options() -> Dict:
+    """
+    Builds the retry policy, crawl deadline and rate limiter from Settings,
+    and applies the host health thresholds. Shared by every scraper of a run.
+    """
+    from laroza_ramadan.helpers.host_health import host_health
+    from laroza_ramadan.helpers.rate_limit import HostRateLimiter
+    from laroza_ramadan.helpers.retry import CrawlDeadline, RetryPolicy
+
+    configure_transport()
+    configure_resolvers()
+    settings = get_settings()
+    host_health.failure_threshold = settings.HOST_FAILURE_THRESHOLD
+    host_health.cooldown = settings.HOST_COOLDOWN_SECONDS
+    # The breaker protects the crawl from dead embed hosts, never from the catalog site itself
+    host_health.exempt_hosts.update(
+        urlparse(url).netloc for url in (settings.LAROZA_SITE_URL, settings.LAROZA_SITE_SERIES_LIST_URL)
+    )
+
+    return {
+        "retry_policy": RetryPolicy(
+            max_attempts=settings.RETRY_MAX_ATTEMPTS,
+            backoff_base=settings.RETRY_BACKOFF_BASE,
+            backoff_max=settings.RETRY_BACKOFF_MAX,
+            timeout=settings.REQUEST_TIMEOUT,
+        ),
+        "deadline": CrawlDeadline(settings.CRAWL_DEADLINE_SECONDS),
+        "rate_limiter": HostRateLimiter(
+            rate=settings.RATE_LIMIT_RATE,
+            burst=settings.RATE_LIMIT_BURST,
+            min_rate=settings.RATE_LIMIT_MIN_RATE,
+            max_rate=settings.RATE_LIMIT_MAX_RATE,
+            increase=settings.RATE_LIMIT_INCREASE,
+            decrease=settings.RATE_LIMIT_DECREASE,
+            success_window=settings.RATE_LIMIT_SUCCESS_WINDOW,
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_scraper() -> "LarozaScraper":
+    """
+    Returns the shared sync scraper configured with this run's crawl options.
+    """
+    crawl_options = get_crawl_options()
+    from laroza_ramadan.helpers.spider import scraper
+
+    for name, value in crawl_options.items():
+        setattr(scraper, name, value)
+    scraper.render_js = get_settings().RENDER_JS
+    return scraper
+
+
+def new_async_scraper() -> "AsyncLarozaScraper":
+    """
+    Creates an async scraper sharing the cache and crawl options of the run.
+    """
+    from laroza_ramadan.helpers.async_spider import AsyncLarozaScraper
+
+    settings = get_settings()
+    return AsyncLarozaScraper(
+        max_concurrency=settings.CRAWL_MAX_CONCURRENCY,
+        max_per_host=settings.CRAWL_MAX_PER_HOST,
+        cache=get_scraper().cache,
+        **get_crawl_options(),
+    )
+
+
+def episodes_to_resolve(series: Series, watermarks: Optional[Dict[str, Dict]]) -> List[Episode]:
+    """
+    Returns the episodes whose embeds should be extracted this run.
+
+    Without watermarks only the latest episode is used; in incremental mode
+    every episode added since the previous run is returned.
+    """
+    if watermarks is None:
+        return list(series.episodes[-1:])
+    return episodes_since(series.episodes, watermarks.get(watermark_key(series.name, series.season)))
+
+
+def save_stage_output(records: List[Dict], filename: str, key_fields: Tuple[str, ...], incremental: bool) -> None:
+    """
+    Writes the optional export of a stage in EXPORT_FORMAT (``filename``
+    takes that format's extension), merging into the previous file in
+    incremental mode. The catalog store is the source of truth.
+    """
+    settings = get_settings()
+    if not settings.EXPORT_JSON:
+        return
+    fmt = get_format(settings.EXPORT_FORMAT)
+    filename = os.path.splitext(filename)[0] + fmt.extension
+    if incremental:
+        existing = list(fmt.read(filename)) if os.path.exists(filename) else None
+        records = merge_records(existing, records, key_fields)
+    write_records(records, filename, fmt.name)
+
+
+def stored_series() -> List[Series]:
+    """
+    Rebuilds the series list from the catalog store, for stages run on their own.
+    """
+    store = get_store()
+    return [
+        Series(name=name, episodes=store.episodes(name, season), season=season)
+        for name, season in store.series_seasons()
+    ]
+
+
+def fetch_series_data() -> List[Dict]:
+    """
+    Fetches series data including episodes and returns a list of dictionaries.
+    """
+    scraper, settings, headers = get_scraper(), get_settings(), get_headers()
+    series_list = scraper.fetch_series_list(settings.LAROZA_SITE_SERIES_LIST_URL, headers)
+    data_eps = []
+
+    if series_list:
+        for series in series_list:
+            with metrics.span("series", trace=trace_key(series["series_name"])):
+                episodes_data = scraper.fetch_episodes(series, headers)
+            data_eps.append(episodes_data)
+            log.debug("Fetched series", series=episodes_data["name"], episodes=len(episodes_data["episodes"]))
+
+    return data_eps
+
+
+def extract_episode_embeds(episode_data: List[Series], watermarks: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Extracts embed links from the last episode of each series, or from every
+    episode newer than the series watermark in incremental mode.
+    """
+    scraper, headers = get_scraper(), get_headers()
+    eps_embeds = []
+
+    for i, series in enumerate(episode_data, start=1):
+        for episode in episodes_to_resolve(series, watermarks):
+            with metrics.span("episode", trace=trace_key(series.name, series.season, episode.ep_number)):
+                embeds = scraper.extract_embeds(url=episode.ep_url, headers=headers)
+            eps_embeds.append({
+                "id": i,
+                "ep_number": episode.ep_number,
+                "name": series.name,
+                "season": series.season,
+                "last_ep_url": episode.ep_url,
+                "embeds": embeds
+            })
+            log.debug("Extracted embeds", series=series.name, url=episode.ep_url, embeds=len(embeds))
+
+    return eps_embeds
+
+
+def crawl_series() -> List[Dict]:
+    """
+    Crawl stage: fetches every series and its episodes into the store.
+
+    With a ``CRAWL_JOBS_FILE``, every category and season of the job file is
+    crawled on the sharded process pool instead.
+    """
+    if get_settings().CRAWL_JOBS_FILE:
+        from laroza_ramadan.crawl_jobs import run_sharded_crawl
+
+        data_eps = run_sharded_crawl()
+    else:
+        data_eps = fetch_series_data()
+    if data_eps:
+        get_store().upsert_series_data(data_eps)
+        save_stage_output(data_eps, f"{LAROZA_OUTPUT_DIR}series_list.json", SERIES_KEY, False)
+    return data_eps
+
+
+def extract_embeds_stage(episode_data: List[Series], watermarks: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Embeds stage: extracts embeds for the episodes to resolve into the store.
+    """
+    eps_embeds = extract_episode_embeds(episode_data, watermarks)
+    get_store().upsert_embeds(eps_embeds)
+    save_stage_output(eps_embeds, f"{LAROZA_OUTPUT_DIR}embeds_list.json", EMBEDS_KEY, watermarks is not None)
+    return eps_embeds
+
+
+def main(watermarks: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Main function to orchestrate fetching and processing of series data.
+
+    Returns the embeds extracted in this run (only new episodes when
+    watermarks are given).
+    """
+    data_eps = crawl_series()
+    if not data_eps:
+        return []
+
+    episode_data = [Series(**item) for item in data_eps]
+    return extract_embeds_stage(episode_data, watermarks)
+
+
+def resolve_episode_players(data_episodes: List[EpisodeEmbeds]) -> List[Dict]:
+    """
+    Resolves the embeds of each episode concurrently through the resolver
+    registry; players are ordered by host rank.
+    """
+    from laroza_ramadan.helpers.resolvers import resolve_embeds
+
+    settings, headers = get_settings(), get_headers()
+    data_players = []
+    for d_ep in data_episodes:
+        with metrics.span("player", trace=trace_key(d_ep.name, d_ep.season, d_ep.ep_number)):
+            sub_players = resolve_embeds(
+                d_ep.embeds or [],
+                headers,
+                first_only=settings.RESOLVE_MODE == "first",
+                **get_crawl_options(),
+            )
+        log.debug("Resolved players", series=d_ep.name, episode=d_ep.ep_number,
+                  embeds=len(d_ep.embeds or []), players=len(sub_players))
+        data_players.append({"ep_name": d_ep.name, "season": d_ep.season, "ep_number": d_ep.ep_number, "players": sub_players})
+
+    return data_players
+
+
+def resolve_stage(data_episodes: List[EpisodeEmbeds], incremental: bool = False) -> List[Dict]:
+    """
+    Resolve stage: resolves players for the given episodes into the store.
+    """
+    data_players = resolve_episode_players(data_episodes)
+    get_store().upsert_players(data_players)
+    save_stage_output(data_players, f"{LAROZA_OUTPUT_DIR}players_list.json", PLAYERS_KEY, incremental)
+    return data_players
+
+
+def new_download_scheduler() -> "DownloadScheduler":
+    """
+    Creates the parallel download scheduler configured from Settings.
+    """
+    from laroza_ramadan.helpers.download_manager import download_video
+    from laroza_ramadan.helpers.download_scheduler import DownloadScheduler
+
+    configure_transport()
+    settings = get_settings()
+    return DownloadScheduler(
+        partial(
+            download_video,
+            native_hls=settings.HLS_NATIVE,
+            hls_concurrency=settings.HLS_CONCURRENCY,
+            hls_max_bandwidth=settings.HLS_MAX_BANDWIDTH,
+        ),
+        slots=settings.DOWNLOAD_SLOTS,
+        per_host_slots=settings.DOWNLOAD_PER_HOST_SLOTS,
+        bandwidth_limit=settings.DOWNLOAD_BANDWIDTH_LIMIT,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_source_selector() -> "SourceSelector":
+    """
+    Returns the source selector configured from the SOURCE_* settings.
+    """
+    from laroza_ramadan.helpers.source_select import SourceSelector
+
+    configure_transport()
+    settings = get_settings()
+    return SourceSelector(
+        policy=settings.SOURCE_POLICY,
+        min_speed=settings.SOURCE_MIN_SPEED,
+        sample_bytes=settings.SOURCE_SAMPLE_BYTES,
+        timeout=settings.REQUEST_TIMEOUT,
+        max_bandwidth=settings.HLS_MAX_BANDWIDTH,
+    )
+
+
+async def select_source(record: Dict) -> Optional[str]:
+    """
+    Probes the players of a record and returns the one to download under SOURCE_POLICY.
+    """
+    return await _traced(
+        "select",
+        trace_key(record["ep_name"], record["season"], record["ep_number"]),
+        get_source_selector().select(record["players"], get_headers()),
+    )
+
+
+def download_job(record: Dict, url: Optional[str] = None) -> Optional["DownloadJob"]:
+    """
+    Builds the download job of a players record, if any: for ``url`` (the
+    selected source) or else its first player. Newer episodes get a higher priority.
+    """
+    from laroza_ramadan.helpers.download_scheduler import DownloadJob
+
+    if not record["players"]:
+        return None
+    return DownloadJob(
+        url=url or record["players"][0],
+        series_name=record["ep_name"],
+        season=record["season"],
+        episode=record["ep_number"],
+        priority=record["ep_number"],
+    )
+
+
+def download_episodes(episodes: List[EpisodePlayers]) -> None:
+    """
+    Downloads the selected player of every episode on the parallel download
+    scheduler. Newer episodes are downloaded first.
+    """
+    from laroza_ramadan.helpers.transport import shared_transport
+
+    async def select_all() -> List[Optional[str]]:
+        # One episode at a time, so the throughput samples do not compete for bandwidth.
+        return [await select_source(ep.to_dict()) for ep in episodes]
+
+    sources = shared_transport.run(select_all())
+    scheduler = new_download_scheduler()
+    try:
+        jobs = [download_job(ep.to_dict(), url) for ep, url in zip(episodes, sources)]
+        scheduler.enqueue([job for job in jobs if job is not None])
+        log.info("Downloads finished", **scheduler.run())
+    finally:
+        scheduler.close()
+
+
+async def _traced(kind: str, trace: str, awaitable):
+    """
+    Awaits inside a metrics span; under asyncio.gather every span gets its own task context.
+    """
+    with metrics.span(kind, trace=trace):
+        return await awaitable
+
+
+async def fetch_series_data_async(async_scraper: "AsyncLarozaScraper") -> List[Dict]:
+    """
+    Fetches the series list, then every series page concurrently.
+    """
+    headers = get_headers()
+    series_list = await async_scraper.fetch_series_list(get_settings().LAROZA_SITE_SERIES_LIST_URL, headers)
+    if not series_list:
+        return []
+
+    return list(await asyncio.gather(
+        *(
+            _traced("series", trace_key(series["series_name"]), async_scraper.fetch_episodes(series, headers))
+            for series in series_list
+        )
+    ))
+
+
+async def extract_episode_embeds_async(
+    async_scraper: "AsyncLarozaScraper",
+    episode_data: List[Series],
+    watermarks: Optional[Dict[str, Dict]] = None,
+) -> List[Dict]:
+    """
+    Extracts embed links for every episode to resolve, concurrently.
+    """
+    headers = get_headers()
+    targets = [
+        (i, series, episode)
+        for i, series in enumerate(episode_data, start=1)
+        for episode in episodes_to_resolve(series, watermarks)
+    ]
+    embeds_per_episode = await asyncio.gather(
+        *(
+            _traced(
+                "episode",
+                trace_key(series.name, series.season, episode.ep_number),
+                async_scraper.extract_embeds(url=episode.ep_url, headers=headers),
+            )
+            for _, series, episode in targets
+        )
+    )
+
+    return [
+        {
+            "id": i,
+            "ep_number": episode.ep_number,
+            "name": series.name,
+            "season": series.season,
+            "last_ep_url": episode.ep_url,
+            "embeds": embeds,
+        }
+        for (i, series, episode), embeds in zip(targets, embeds_per_episode)
+    ]
+
+
+async def resolve_episode_players_async(
+    async_scraper: "AsyncLarozaScraper", data_episodes: List[EpisodeEmbeds]
+) -> List[Dict]:
+    """
+    Resolves the embeds of every episode concurrently across all hosts.
+    """
+    from laroza_ramadan.helpers.resolvers import registry
+
+    settings, headers = get_settings(), get_headers()
+
+    async def resolve_episode(d_ep: EpisodeEmbeds) -> Dict:
+        players = await _traced(
+            "player",
+            trace_key(d_ep.name, d_ep.season, d_ep.ep_number),
+            registry.resolve(async_scraper, d_ep.embeds or [], headers, first_only=settings.RESOLVE_MODE == "first"),
+        )
+        return {
+            "ep_name": d_ep.name,
+            "season": d_ep.season,
+            "ep_number": d_ep.ep_number,
+            "players": players,
+        }
+
+    return list(await asyncio.gather(*(resolve_episode(d_ep) for d_ep in data_episodes)))
+
+
+async def run_async_pipeline(watermarks: Optional[Dict[str, Dict]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Async pipeline mode: every stage fans out all of its requests at once,
+    so a stage takes as long as its slowest request instead of their sum.
+
+    Returns the embeds and players produced in this run.
+    """
+    from laroza_ramadan.helpers.resolvers import registry
+
+    incremental = watermarks is not None
+    store = get_store()
+    async_scraper = new_async_scraper()
+    try:
+        if get_settings().CRAWL_JOBS_FILE:
+            from laroza_ramadan.crawl_jobs import run_sharded_crawl
+
+            data_eps = await asyncio.to_thread(run_sharded_crawl)
+        else:
+            data_eps = await fetch_series_data_async(async_scraper)
+        if not data_eps:
+            return [], []
+        store.upsert_series_data(data_eps)
+        save_stage_output(data_eps, f"{LAROZA_OUTPUT_DIR}series_list.json", SERIES_KEY, False)
+
+        episode_data = [Series(**item) for item in data_eps]
+        eps_embeds = await extract_episode_embeds_async(async_scraper, episode_data, watermarks)
+        store.upsert_embeds(eps_embeds)
+        save_stage_output(eps_embeds, f"{LAROZA_OUTPUT_DIR}embeds_list.json", EMBEDS_KEY, incremental)
+
+        data_episodes = [EpisodeEmbeds(**item) for item in eps_embeds]
+        data_players = await resolve_episode_players_async(async_scraper, data_episodes)
+        store.upsert_players(data_players)
+        registry.save_stats()
+        save_stage_output(data_players, f"{LAROZA_OUTPUT_DIR}players_list.json", PLAYERS_KEY, incremental)
+        return eps_embeds, data_players
+    finally:
+        await async_scraper.close_session()
+        await shared_transport.aclose()
+
+
+async def _stream_stage(inbox: asyncio.Queue, handle, workers: int, outbox: Optional[asyncio.Queue] = None) -> None:
+    """
+    Runs ``workers`` consumers of ``inbox`` until they meet the end-of-stream
+    marker (None), forwarding every item ``handle`` returns to ``outbox``.
+    """
+    async def worker() -> None:
+        while True:
+            item = await inbox.get()
+            if item is None:
+                await inbox.put(None)  # Let the sibling workers see the end too
+                return
+            for result in await handle(item):
+                if outbox is not None:
+                    await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    if outbox is not None:
+        await outbox.put(None)
+
+
+async def run_streaming_pipeline(watermarks: Optional[Dict[str, Dict]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Streaming pipeline mode: crawl, embeds, resolve and download are connected
+    by bounded queues, so each episode moves downstream as soon as it is ready
+    and the first downloads start while the catalog is still being crawled.
+
+    Every record is also appended to an NDJSON log (``STREAM_LOGS``). After a
+    crash, the next run reuses the logged embeds and players instead of
+    fetching them again; the logs are removed when a run completes.
+
+    Returns the embeds and players produced in this run.
+    """
+    import threading
+
+    from laroza_ramadan.crawl_jobs import get_crawl_jobs
+    from laroza_ramadan.helpers.resolvers import registry
+
+    settings, headers, store = get_settings(), get_headers(), get_store()
+    workers, queue_size = settings.CRAWL_MAX_CONCURRENCY, settings.STREAM_QUEUE_SIZE
+    logged_embeds = {(r["name"], r.get("season", 1), r["ep_number"]): r for r in read_ndjson(STREAM_LOGS["embeds"])}
+    logged_players = {(r["ep_name"], r["season"], r["ep_number"]): r for r in read_ndjson(STREAM_LOGS["players"])}
+    if logged_embeds or logged_players:
+        log.info("Recovering the previous run", embeds=len(logged_embeds), players=len(logged_players))
+
+    series_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    embeds_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    eps_embeds: List[Dict] = []
+    data_players: List[Dict] = []
+
+    scheduler = new_download_scheduler()
+    crawl_done = threading.Event()
+    async_scraper = new_async_scraper()
+
+    async def fetch_season(series: Dict, season: int) -> Dict:
+        with metrics.span("series", trace=trace_key(series["series_name"], season)):
+            return {**await async_scraper.fetch_episodes(series, headers), "season": season}
+
+    async def crawl() -> None:
+        # Every job of CRAWL_JOBS_FILE in this process; the sharded crawl needs a separate pass.
+        jobs = get_crawl_jobs()
+        listings = await asyncio.gather(*(async_scraper.fetch_series_list(job.url, headers) for job in jobs))
+        series_list = {
+            (series["series_url"], job.season_of(series["series_name"])): series
+            for job, listing in zip(jobs, listings)
+            for series in listing or []
+        }
+        ids = {series["series_name"]: i for i, series in enumerate(series_list.values(), start=1)}
+        for next_series in asyncio.as_completed(
+            [fetch_season(series, season) for (_, season), series in series_list.items()]
+        ):
+            item = await next_series
+            store.upsert_series_data([item])
+            append_ndjson(item, STREAM_LOGS["series"])
+            await series_queue.put((ids[item["name"]], Series(**item)))
+        await series_queue.put(None)
+
+    async def extract(entry: Tuple[int, Series]) -> List[Dict]:
+        series_id, series = entry
+        records = []
+        for episode in episodes_to_resolve(series, watermarks):
+            record = logged_embeds.get((series.name, series.season, episode.ep_number))
+            if record is None:
+                with metrics.span("episode", trace=trace_key(series.name, series.season, episode.ep_number)):
+                    embeds = await async_scraper.extract_embeds(url=episode.ep_url, headers=headers)
+                record = {
+                    "id": series_id,
+                    "ep_number": episode.ep_number,
+                    "name": series.name,
+                    "season": series.season,
+                    "last_ep_url": episode.ep_url,
+                    "embeds": embeds,
+                }
+                store.upsert_embeds([record])
+                append_ndjson(record, STREAM_LOGS["embeds"])
+            eps_embeds.append(record)
+            records.append(EpisodeEmbeds(**record))
+        return records
+
+    async def resolve(d_ep: EpisodeEmbeds) -> List[Dict]:
+        record = logged_players.get((d_ep.name, d_ep.season, d_ep.ep_number))
+        if record is None:
+            with metrics.span("player", trace=trace_key(d_ep.name, d_ep.season, d_ep.ep_number)):
+                players = await registry.resolve(
+                    async_scraper, d_ep.embeds or [], headers, first_only=settings.RESOLVE_MODE == "first"
+                )
+            record = {"ep_name": d_ep.name, "season": d_ep.season, "ep_number": d_ep.ep_number, "players": players}
+            store.upsert_players([record])
+            append_ndjson(record, STREAM_LOGS["players"])
+        data_players.append(record)
+        job = download_job(record, await select_source(record))
+        if job is not None:
+            scheduler.enqueue([job])
+        return []
+
+    async def produce() -> None:
+        try:
+            await asyncio.gather(
+                crawl(),
+                _stream_stage(series_queue, extract, workers, embeds_queue),
+                _stream_stage(embeds_queue, resolve, workers),
+            )
+        finally:
+            crawl_done.set()
+
+    downloads = asyncio.ensure_future(asyncio.to_thread(scheduler.run, until=crawl_done))
+    try:
+        await produce()
+        log.info("Downloads finished", **await downloads)
+    finally:
+        await async_scraper.close_session()
+        await shared_transport.aclose()
+        registry.save_stats()
+        # After a failure the scheduler thread still drains the jobs already queued.
+        if downloads.done():
+            scheduler.close()
+
+    for filename in STREAM_LOGS.values():
+        if os.path.exists(filename):
+            os.remove(filename)
+    return eps_embeds, data_players
+
+
+def report_run() -> None:
+    """
+    Logs the cache and connection pool counters and saves/logs the host health stats.
+    """
+    from laroza_ramadan.helpers.host_health import host_health
+    from laroza_ramadan.helpers.resolvers import registry
+    from laroza_ramadan.helpers.transport import shared_transport
+
+    scraper = get_scraper()
+    if scraper.cache:
+        scraper.cache.report()
+    if registry.cache:
+        registry.cache.report()
+    shared_transport.stats.report()
+
+    host_health.save()
+    for host, stats in host_health.summary().items():
+        log.info("Host health", host=host, **stats)
+
+
+def setup_logging() -> None:
+    """
+    Configures the structured logs from the LOG_LEVEL and LOG_FORMAT settings.
+    """
+    from laroza_ramadan.helpers.logs import configure_logging
+
+    settings = get_settings()
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+
+
+def export_metrics() -> Dict:
+    """
+    Writes the run metrics (Prometheus text file and JSON run summary) and
+    logs the time spent per stage.
+    """
+    summary = metrics.export()
+    for stage, stats in summary["stages"].items():
+        log.info("Stage", stage=stage, **stats)
+    log.info("Run metrics saved", prometheus=METRICS_PATH, summary=RUN_SUMMARY_PATH)
+    return summary
+
+
+def run_pipeline(
+    incremental: bool = False, use_async: bool = False, resolve_pending: bool = False, stream: bool = False
+) -> None:
+    """
+    Runs every stage end to end, as ``series.py`` does.
+
+    Args:
+        incremental (bool): Only handle episodes added since the previous run.
+        use_async (bool): Run the crawl, embeds and resolve stages concurrently.
+        resolve_pending (bool): Skip the crawl and resolve stored episodes without players.
+        stream (bool): Stream episodes through every stage, downloads included, as soon as they are ready.
+    """
+    from laroza_ramadan.helpers.transport import shared_transport
+
+    setup_logging()
+    try:
+        _run_stages(incremental, use_async, resolve_pending, stream)
+    finally:
+        shared_transport.shutdown()
+
+
+def _run_stages(incremental: bool, use_async: bool, resolve_pending: bool, stream: bool) -> None:
+    watermarks = load_watermarks() if incremental else None
+
+    if stream:
+        eps_embeds, _ = asyncio.run(run_streaming_pipeline(watermarks))
+        if incremental:
+            save_watermarks(advance_watermarks(watermarks, eps_embeds, get_settings().EMPTY_EPISODE_MAX_RUNS))
+        report_run()
+        export_metrics()
+        return
+
+    if use_async:
+        eps_embeds, data_players = asyncio.run(run_async_pipeline(watermarks))
+    else:
+        if resolve_pending:
+            # Skip the crawl and only resolve stored episodes that have no players yet.
+            eps_embeds = get_store().episodes_without_players()
+        else:
+            eps_embeds = main(watermarks)
+
+        data_episodes: List[EpisodeEmbeds] = [EpisodeEmbeds(**item) for item in eps_embeds]
+
+        data_players = resolve_stage(data_episodes, incremental)
+
+    if incremental:
+        save_watermarks(advance_watermarks(watermarks, eps_embeds, get_settings().EMPTY_EPISODE_MAX_RUNS))
+
+    # Only this run's players are downloaded; in incremental mode that is the new episodes.
+    episodes: List[EpisodePlayers] = [EpisodePlayers(**item) for item in data_players]
+
+    report_run()
+
+    download_episodes(episodes)
+    export_metrics()
@@ -0,0 +1,27 @@
+from importlib import import_module
+
+from .models import Episode, Series, EpisodeEmbeds, EpisodePlayers, Record
+
+# The columnar export pulls in pyarrow, so it is imported on first access.
+_LAZY_EXPORTS = {
+    "series_table": ".columnar",
+    "embeds_table": ".columnar",
+    "players_table": ".columnar",
+    "series_from_table": ".columnar",
+    "embeds_from_table": ".columnar",
+    "players_from_table": ".columnar",
+    "table_from_records": ".columnar",
+    "records_from_table": ".columnar",
+    "write_parquet": ".columnar",
+    "read_parquet": ".columnar",
+    "iter_parquet_records": ".columnar",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,221 @@
+from itertools import groupby, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..helpers.output_formats import atomic_write
+from .models import Episode, EpisodeEmbeds, EpisodePlayers, Record, Series
+
+# Tables are in long form, one row per episode URL, embed or player, ready to filter and
+# group without unnesting. Series names and hosts are dictionary-encoded (stored once per chunk).
+# A record without any (a series with no episodes, an episode with no embeds or players)
+# keeps one row whose URL is null, so it survives the round trip.
+_NAME = pa.dictionary(pa.int32(), pa.string())
+
+
+def _host(url: str) -> str:
+    # urlparse(url).netloc, without parsing the rest of the URL for every row
+    return url.partition("//")[2].partition("/")[0]
+
+
+SERIES_SCHEMA = pa.schema([
+    ("name", _NAME),
+    ("season", pa.int16()),
+    ("ep_number", pa.int32()),
+    ("ep_url", pa.string()),
+])
+EMBEDS_SCHEMA = pa.schema([
+    ("id", pa.int32()),  # Index of the series in the crawl
+    ("name", _NAME),
+    ("season", pa.int16()),
+    ("ep_number", pa.int32()),
+    ("last_ep_url", pa.string()),
+    ("position", pa.int16()),
+    ("embed_url", pa.string()),
+    ("host", _NAME),
+])
+PLAYERS_SCHEMA = pa.schema([
+    ("name", _NAME),
+    ("season", pa.int16()),
+    ("ep_number", pa.int32()),
+    ("position", pa.int16()),  # Rank of the player among the episode's players
+    ("player_url", pa.string()),
+    ("host", _NAME),
+])
+
+
+def series_table(records: Iterable[Series]) -> pa.Table:
+    columns: Dict[str, List] = {field: [] for field in SERIES_SCHEMA.names}
+    for series in records:
+        for episode in series.episodes or (None,):
+            columns["name"].append(series.name)
+            columns["season"].append(series.season)
+            columns["ep_number"].append(None if episode is None else episode.ep_number)
+            columns["ep_url"].append(None if episode is None else episode.ep_url)
+    return pa.table(columns, schema=SERIES_SCHEMA)
+
+
+def embeds_table(records: Iterable[EpisodeEmbeds]) -> pa.Table:
+    columns: Dict[str, List] = {field: [] for field in EMBEDS_SCHEMA.names}
+    for record in records:
+        for position, url in enumerate(record.embeds or (None,)):
+            columns["id"].append(record.id)
+            columns["name"].append(record.name)
+            columns["season"].append(record.season)
+            columns["ep_number"].append(record.ep_number)
+            columns["last_ep_url"].append(record.last_ep_url)
+            columns["position"].append(None if url is None else position)
+            columns["embed_url"].append(url)
+            columns["host"].append(None if url is None else _host(url))
+    return pa.table(columns, schema=EMBEDS_SCHEMA)
+
+
+def players_table(records: Iterable[EpisodePlayers]) -> pa.Table:
+    columns: Dict[str, List] = {field: [] for field in PLAYERS_SCHEMA.names}
+    for record in records:
+        for position, url in enumerate(record.players or (None,)):
+            columns["name"].append(record.ep_name)
+            columns["season"].append(record.season)
+            columns["ep_number"].append(record.ep_number)
+            columns["position"].append(None if url is None else position)
+            columns["player_url"].append(url)
+            columns["host"].append(None if url is None else _host(url))
+    return pa.table(columns, schema=PLAYERS_SCHEMA)
+
+
+def _decoded(table: pa.Table, column: str) -> List[str]:
+    # Decodes a dictionary column through its (small) dictionary instead of value by value.
+    array = table.unify_dictionaries().column(column).combine_chunks()
+    dictionary = array.dictionary.to_pylist()
+    return [dictionary[i] for i in array.indices.to_pylist()]
+
+
+def _column(table: pa.Table, name: str) -> list:
+    if pa.types.is_dictionary(table.schema.field(name).type):
+        return _decoded(table, name)
+    return table.column(name).to_pylist()
+
+
+def _grouped(table: pa.Table, keys: Sequence[str], values: Sequence[str]) -> Iterator[Tuple[tuple, list]]:
+    # Yields each record's key columns and the values of its rows (in table order),
+    # dropping the null row that stands for an empty record.
+    if "position" in table.schema.names:
+        # Records start at position 0 (or null): only the keys of those rows are decoded.
+        starts = [i for i, position in enumerate(table.column("position").to_pylist()) if not position]
+        heads = table.take(starts)
+        key_rows = zip(*(_column(heads, name) for name in keys))
+        sizes = [end - start for start, end in zip(starts, starts[1:] + [table.num_rows])]
+    else:
+        runs = [(key, sum(1 for _ in group)) for key, group in groupby(zip(*(_column(table, name) for name in keys)))]
+        key_rows, sizes = (key for key, _ in runs), [size for _, size in runs]
+
+    rows = iter(zip(*(_column(table, name) for name in values)) if len(values) > 1 else _column(table, values[0]))
+    for key, size in zip(key_rows, sizes):
+        chunk = list(islice(rows, size))
+        yield key, [] if chunk == [None] or chunk == [(None,) * len(values)] else chunk
+
+
+def series_from_table(table: pa.Table) -> List[Series]:
+    return [
+        Series(name, tuple(Episode(*ep) for ep in episodes), season)
+        for (name, season), episodes in _grouped(table, ("name", "season"), ("ep_number", "ep_url"))
+    ]
+
+
+def embeds_from_table(table: pa.Table) -> List[EpisodeEmbeds]:
+    return [
+        EpisodeEmbeds(id, ep_number, name, last_ep_url, tuple(urls), season)
+        for (id, name, season, ep_number, last_ep_url), urls in _grouped(
+            table, ("id", "name", "season", "ep_number", "last_ep_url"), ("embed_url",)
+        )
+    ]
+
+
+def players_from_table(table: pa.Table) -> List[EpisodePlayers]:
+    """
+    Rebuilds EpisodePlayers records from a players table (rows grouped by
+    episode and ordered by position, as players_table writes them).
+    """
+    return [
+        EpisodePlayers(name, season, ep_number, tuple(urls))
+        for (name, season, ep_number), urls in _grouped(table, ("name", "season", "ep_number"), ("player_url",))
+    ]
+
+
+# Per record type: its list field (which tells export dicts apart), table builder,
+# URL column (which tells tables apart) and table reader.
+_TABLES = (
+    (Series, "episodes", series_table, "ep_url", series_from_table),
+    (EpisodeEmbeds, "embeds", embeds_table, "embed_url", embeds_from_table),
+    (EpisodePlayers, "players", players_table, "player_url", players_from_table),
+)
+
+
+def table_from_records(records: Sequence[Union[Record, Dict]]) -> pa.Table:
+    """
+    Builds the table of one stage's records, given as models or as the
+    dicts of the stage exports. An empty stage gives an empty table.
+    """
+    if not records:
+        return pa.table({})
+    first = records[0]
+    for model, list_field, build, _, _ in _TABLES:
+        if isinstance(first, model) or (isinstance(first, dict) and list_field in first):
+            return build(record if isinstance(record, model) else model(**record) for record in records)
+    raise ValueError(f"No columnar layout for records like {records[0]!r:.80}")
+
+
+def records_from_table(table: pa.Table) -> List[Record]:
+    """
+    Rebuilds the records of a table written by table_from_records.
+    """
+    for _, _, _, url_column, read in _TABLES:
+        if url_column in table.schema.names:
+            return read(table)
+    return []
+
+
+def write_parquet(table: pa.Table, path: str, compression: str = "zstd") -> str:
+    """
+    Writes a table to a Parquet file atomically (temporary file, then rename).
+    """
+    with atomic_write(path) as f:
+        pq.write_table(table, f, compression=compression)
+    return path
+
+
+def iter_parquet_records(path: str, batch_size: int = 64 * 1024) -> Iterator[Record]:
+    """
+    Yields the records of a Parquet file written by write_parquet, reading it
+    (memory-mapped) one batch of rows at a time, so memory is bounded by the
+    batch size rather than the file size.
+    """
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    layout = next((t for t in _TABLES if t[3] in parquet_file.schema_arrow.names), None)
+    if layout is None:
+        return
+    _, list_field, _, _, read = layout
+
+    carry = None
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        table = pa.Table.from_batches([batch])
+        if carry is not None:
+            table = pa.concat_tables([carry, table])
+        records = read(table)
+        if not records:
+            continue
+        # The last record may go on in the next batch: keep its rows (one per
+        # list item, or the one null row of an empty record) for the next round.
+        last = records.pop()
+        carry = table.slice(table.num_rows - max(1, len(getattr(last, list_field))))
+        yield from records
+    if carry is not None:
+        yield from read(carry)
+
+
+def read_parquet(path: str, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Reads a Parquet file, memory-mapped, optionally only some of its columns.
+    """
+    return pq.read_table(path, columns=columns, memory_map=True)
@@ -0,0 +1,79 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple, Union
+
+
+def _interned(value: str) -> str:
+    # Series names repeat on every episode and record; one shared copy each.
+    return sys.intern(value) if type(value) is str else value
+
+
+def _urls(values: Iterable[str]) -> Tuple[str, ...]:
+    return values if type(values) is tuple else tuple(values or ())
+
+
+@dataclass(frozen=True, slots=True)
+class Episode:
+    ep_number: int
+    ep_url: str
+
+    def to_dict(self) -> Dict:
+        return {"ep_number": self.ep_number, "ep_url": self.ep_url}
+
+
+@dataclass(frozen=True, slots=True)
+class Series:
+    name: str
+    episodes: Tuple[Episode, ...]
+    season: int = 1
+
+    def __post_init__(self):
+        # Accepts the {"ep_number", "ep_url"} dicts of fetch_episodes and the catalog store.
+        episodes = tuple(ep if type(ep) is Episode else Episode(**ep) for ep in self.episodes or ())
+        object.__setattr__(self, "name", _interned(self.name))
+        object.__setattr__(self, "episodes", episodes)
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "episodes": [ep.to_dict() for ep in self.episodes], "season": self.season}
+
+
+@dataclass(frozen=True, slots=True)
+class EpisodeEmbeds:
+    id: int
+    ep_number: int
+    name: str
+    last_ep_url: str
+    embeds: Tuple[str, ...]
+    season: int = 1
+
+    def __post_init__(self):
+        object.__setattr__(self, "name", _interned(self.name))
+        object.__setattr__(self, "embeds", _urls(self.embeds))
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "ep_number": self.ep_number,
+            "name": self.name,
+            "season": self.season,
+            "last_ep_url": self.last_ep_url,
+            "embeds": list(self.embeds),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class EpisodePlayers:
+    ep_name: str  # Name of the episode
+    season: int   # Season number
+    ep_number: int  # Episode number
+    players: Tuple[str, ...]  # Video player URLs, best-ranked first
+
+    def __post_init__(self):
+        object.__setattr__(self, "ep_name", _interned(self.ep_name))
+        object.__setattr__(self, "players", _urls(self.players))
+
+    def to_dict(self) -> Dict:
+        return {"ep_name": self.ep_name, "season": self.season, "ep_number": self.ep_number, "players": list(self.players)}
+
+
+Record = Union[Series, EpisodeEmbeds, EpisodePlayers]
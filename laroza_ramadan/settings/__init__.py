@@ -1 +1,8 @@
-from .config import settings, headers
\ No newline at end of file
+from .config import get_settings, get_headers
+
+
+def __getattr__(name):
+    if name in ("settings", "headers"):
+        from . import config
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
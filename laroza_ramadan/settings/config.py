@@ -1,10 +1,6 @@
+from functools import lru_cache
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from fake_useragent import UserAgent
-ua = UserAgent()
-
-headers = {
-    "User-Agent": f"{ua.random}"
-}
 
 
 class Settings(BaseSettings):
@@ -14,9 +10,92 @@ class Settings(BaseSettings):
     LAROZA_SITE_NAME: str
     LAROZA_SITE_URL: str
     LAROZA_SITE_SERIES_LIST_URL: str
-    
 
-def get_settings():
+    # Async_Crawl_Config
+    CRAWL_MAX_CONCURRENCY: int = 16
+    CRAWL_MAX_PER_HOST: int = 4
+    CRAWL_JOBS_FILE: Optional[str] = None  # JSON list of category URLs and seasons (see laroza_ramadan/crawl_jobs.py)
+    CRAWL_WORKERS: Optional[int] = None  # Processes of the sharded crawl, default one per core
+    STREAM_QUEUE_SIZE: int = 32  # Items buffered between stages in streaming mode
+    RENDER_JS: bool = False  # Render pages in headless Chromium (httpx_html) before parsing; sync crawl only
+    EMPTY_EPISODE_MAX_RUNS: int = 3  # Incremental runs an episode without embeds holds its series watermark back
+
+    # HTTP_Pool_Config (one pool shared by the scrapers, resolvers and HLS downloads)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20  # Idle connections kept open
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
+    HTTP2: bool = True  # Use HTTP/2 with hosts that support it (needs the `h2` package)
+    DNS_CACHE_TTL: float = 300.0  # Seconds a resolved host address is reused, 0 to disable
+
+    # Rate_Limit_Config (per host, adapted with AIMD on 429/503)
+    RATE_LIMIT_RATE: float = 2.0  # Initial requests per second
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_MIN_RATE: float = 0.2
+    RATE_LIMIT_MAX_RATE: float = 20.0
+    RATE_LIMIT_INCREASE: float = 0.5  # Added after RATE_LIMIT_SUCCESS_WINDOW successes
+    RATE_LIMIT_DECREASE: float = 0.5  # Multiplied on 429/503
+    RATE_LIMIT_SUCCESS_WINDOW: int = 10
+
+    # Retry_Config
+    RETRY_MAX_ATTEMPTS: int = 4
+    RETRY_BACKOFF_BASE: float = 0.5  # Seconds, doubled per attempt and jittered
+    RETRY_BACKOFF_MAX: float = 30.0
+    REQUEST_TIMEOUT: float = 20.0  # Per-request timeout in seconds
+    CRAWL_DEADLINE_SECONDS: Optional[float] = None  # Total budget per crawl, None for no limit
+
+    # Host_Health_Config
+    HOST_FAILURE_THRESHOLD: int = 3  # Consecutive failures that open a host's circuit
+    HOST_COOLDOWN_SECONDS: int = 600  # How long an open circuit refuses requests
+
+    # Resolver_Config
+    RESOLVE_MODE: str = "ranked"  # "ranked": all players by host rank, "first": first good player wins
+    PLAYER_CACHE: bool = True  # Reuse resolved media URLs of previous runs until their signature expires
+    PLAYER_CACHE_DEFAULT_TTL: int = 6 * 60 * 60  # Lifetime of media URLs without an expiry in their query string
+    PLAYER_CACHE_MARGIN: int = 600  # Seconds before the signed expiry an entry is dropped
+    PLAYER_CACHE_REVALIDATE_AFTER: int = 60  # Seconds a successful probe of an entry is trusted for
+
+    # Download_Config
+    DOWNLOAD_SLOTS: int = 3
+    DOWNLOAD_PER_HOST_SLOTS: int = 2
+    DOWNLOAD_BANDWIDTH_LIMIT: Optional[int] = None  # Overall cap in bytes per second
+    HLS_NATIVE: bool = True  # Download m3u8 players with the built-in HLS engine instead of yt-dlp
+    HLS_CONCURRENCY: int = 8  # Segments fetched at once per download
+    HLS_MAX_BANDWIDTH: Optional[int] = None  # Highest variant bandwidth (bits per second) to pick
+    SOURCE_POLICY: str = "balanced"  # "fastest", "quality", "balanced" (best quality at SOURCE_MIN_SPEED) or "first"
+    SOURCE_MIN_SPEED: int = 1_000_000  # Bytes per second a source needs under the "balanced" policy
+    SOURCE_SAMPLE_BYTES: int = 256 * 1024  # Bytes downloaded per player to measure its throughput
+
+    # Storage_Config
+    EXPORT_JSON: bool = True  # Also write series/embeds/players exports
+    EXPORT_FORMAT: str = "json"  # "json" (compact), "ndjson" or "parquet"
+
+    # Logging_Config
+    LOG_LEVEL: str = "INFO"  # DEBUG also logs every fetched series, embed and player
+    LOG_FORMAT: str = "text"  # "text" or "json" (one object per line)
+
+    # CLI_Config
+    STARTUP_BUDGET_MS: float = 500.0  # Cold-start import budget reported by `laroza --timings`
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
     return Settings()
 
-settings = get_settings()
\ No newline at end of file
+
+@lru_cache(maxsize=None)
+def get_headers() -> Dict[str, str]:
+    # fake_useragent loads its browser database on construction, so build it on first use
+    from fake_useragent import UserAgent
+    ua = UserAgent()
+    return {
+        "User-Agent": f"{ua.random}"
+    }
+
+
+def __getattr__(name):
+    # `settings` and `headers` stay importable as before, but are built on first access.
+    if name == "settings":
+        return get_settings()
+    if name == "headers":
+        return get_headers()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
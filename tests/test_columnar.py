@@ -0,0 +1,58 @@
+import pyarrow as pa
+import pytest
+
+from laroza_ramadan.schemas import EpisodeEmbeds, EpisodePlayers, Series
+from laroza_ramadan.schemas.columnar import (
+    read_parquet,
+    records_from_table,
+    table_from_records,
+    write_parquet,
+)
+
+SERIES = [
+    Series("مسلسل", ({"ep_number": 1, "ep_url": "https://site.example/1"}, {"ep_number": 2, "ep_url": "https://site.example/2"})),
+    Series("Empty", ()),
+    Series("مسلسل", ({"ep_number": 1, "ep_url": "https://site.example/s2/1"},), season=2),
+]
+EMBEDS = [
+    EpisodeEmbeds(1, 2, "مسلسل", "https://site.example/2", ("https://a.example/e/1", "https://b.example/e/1")),
+    EpisodeEmbeds(2, 1, "Empty", "https://site.example/empty/1", ()),
+    EpisodeEmbeds(3, 1, "مسلسل", "https://site.example/s2/1", ("https://a.example/e/2",), season=2),
+]
+PLAYERS = [
+    EpisodePlayers("مسلسل", 1, 2, ("https://cdn.example/v.m3u8", "https://uqload.example/v.mp4")),
+    EpisodePlayers("Empty", 1, 1, ()),
+]
+
+
+@pytest.mark.parametrize("records", [SERIES, EMBEDS, PLAYERS], ids=["series", "embeds", "players"])
+def test_round_trip(records):
+    assert records_from_table(table_from_records(records)) == records
+
+
+@pytest.mark.parametrize("records", [SERIES, EMBEDS, PLAYERS], ids=["series", "embeds", "players"])
+def test_round_trip_from_export_dicts(records):
+    assert records_from_table(table_from_records([record.to_dict() for record in records])) == records
+
+
+@pytest.mark.parametrize("records", [SERIES, EMBEDS, PLAYERS], ids=["series", "embeds", "players"])
+def test_parquet_round_trip(tmp_path, records):
+    path = write_parquet(table_from_records(records), str(tmp_path / "records.parquet"))
+    assert records_from_table(read_parquet(path)) == records
+
+
+def test_long_form_layout():
+    table = table_from_records(PLAYERS)
+    assert table.num_rows == 3  # One row per player, one null row for the episode without any
+    assert table.column("host").to_pylist() == ["cdn.example", "uqload.example", None]
+    assert pa.types.is_dictionary(table.schema.field("name").type)
+
+
+def test_empty_records():
+    assert table_from_records([]).num_rows == 0
+    assert records_from_table(table_from_records([])) == []
+
+
+def test_unknown_records():
+    with pytest.raises(ValueError):
+        table_from_records([{"something": "else"}])
@@ -0,0 +1,85 @@
+import pytest
+
+from laroza_ramadan.helpers.download_index import DownloadIndex
+from laroza_ramadan.helpers.download_scheduler import DownloadJob, DownloadScheduler
+from laroza_ramadan.helpers.retry import RetryPolicy
+
+
+class FakeDownloads:
+    """
+    Stands in for download_video: fails the first ``failures`` attempts of an
+    episode, then writes its file and records it in the download index.
+    """
+
+    def __init__(self, tmp_path, index, failures=0):
+        self.tmp_path = tmp_path
+        self.index = index
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, url, series_name, referer=None, season=1, episode=1, rate_limit=None):
+        self.calls.append((episode, rate_limit))
+        if sum(1 for called, _ in self.calls if called == episode) <= self.failures:
+            return False
+        path = self.tmp_path / f"{episode}.mp4"
+        path.write_bytes(b"video")
+        self.index.record(series_name, season, episode, url, str(path))
+        return True
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def jobs(*episodes):
+    return [DownloadJob(f"https://cdn{episode}.example/v.mp4", "Series", 1, episode) for episode in episodes]
+
+
+def test_failed_job_is_retried_after_backoff(tmp_path, db_path):
+    index = DownloadIndex(db_path)
+    download = FakeDownloads(tmp_path, index, failures=2)
+    policy = RetryPolicy(backoff_base=0.05, backoff_max=0.05)
+    scheduler = DownloadScheduler(download, slots=1, db_path=db_path, retry_policy=policy, index=index)
+    scheduler.enqueue(jobs(1))
+    assert scheduler.run() == {"done": 1}
+    assert [episode for episode, _ in download.calls] == [1, 1, 1]
+
+
+def test_job_fails_after_max_attempts(tmp_path, db_path):
+    index = DownloadIndex(db_path)
+    policy = RetryPolicy(backoff_base=0.0, backoff_max=0.0)
+    scheduler = DownloadScheduler(
+        FakeDownloads(tmp_path, index, failures=5), max_attempts=2, db_path=db_path, retry_policy=policy, index=index
+    )
+    scheduler.enqueue(jobs(1))
+    assert scheduler.run() == {"failed": 1}
+
+
+def test_bandwidth_is_split_between_concurrent_downloads(tmp_path, db_path):
+    index = DownloadIndex(db_path)
+    download = FakeDownloads(tmp_path, index)
+    scheduler = DownloadScheduler(download, slots=2, bandwidth_limit=1000, db_path=db_path, index=index)
+    scheduler.enqueue(jobs(1))
+    scheduler.run()
+    scheduler.enqueue(jobs(2, 3, 4))
+    scheduler.run()
+    # Alone, a download gets the whole cap; with others queued, a share per slot.
+    assert download.calls[0] == (1, 1000)
+    assert [rate for _, rate in download.calls[1:3]] == [500, 500]
+
+
+def test_done_episode_is_requeued_when_its_file_is_gone(tmp_path, db_path):
+    index = DownloadIndex(db_path)
+    download = FakeDownloads(tmp_path, index)
+    scheduler = DownloadScheduler(download, db_path=db_path, index=index)
+    scheduler.enqueue(jobs(1))
+    scheduler.run()
+
+    scheduler.enqueue(jobs(1))
+    assert scheduler.summary() == {"done": 1}
+    (tmp_path / "1.mp4").unlink()
+    scheduler.enqueue(jobs(1))
+    assert scheduler.summary() == {"pending": 1}
+    assert scheduler.run() == {"done": 1}
+    assert len(download.calls) == 2
@@ -0,0 +1,102 @@
+import pytest
+
+from laroza_ramadan.helpers.hls import (
+    UnsupportedPlaylistError,
+    Variant,
+    choose_variant,
+    parse_master_playlist,
+    parse_media_playlist,
+    resume_point,
+    save_progress,
+)
+
+BASE_URL = "https://cdn.example/hls/master.m3u8"
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"
+360p/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2800000,RESOLUTION=1280x720
+https://other.example/720p/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=1400000
+480p/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:7
+#EXTINF:10.0,
+seg7.ts
+#EXT-X-KEY:METHOD=AES-128,URI="keys/k1.bin",IV=0x000102030405060708090a0b0c0d0e0f
+#EXTINF:10.0,
+seg8.ts
+#EXT-X-KEY:METHOD=NONE
+#EXTINF:10.0,
+/abs/seg9.ts
+#EXT-X-ENDLIST
+"""
+
+
+def test_parse_master_playlist():
+    variants = parse_master_playlist(MASTER, BASE_URL)
+    assert variants == [
+        Variant("https://cdn.example/hls/360p/index.m3u8", 800_000, (640, 360)),
+        Variant("https://other.example/720p/index.m3u8", 2_800_000, (1280, 720)),
+        Variant("https://cdn.example/hls/480p/index.m3u8", 1_400_000, None),
+    ]
+
+
+def test_parse_media_playlist():
+    playlist = parse_media_playlist(MEDIA, BASE_URL)
+    assert [segment.url for segment in playlist.segments] == [
+        "https://cdn.example/hls/seg7.ts",
+        "https://cdn.example/hls/seg8.ts",
+        "https://cdn.example/abs/seg9.ts",
+    ]
+    assert [segment.sequence for segment in playlist.segments] == [7, 8, 9]
+    assert playlist.segments[0].key is None
+    key = playlist.segments[1].key
+    assert key.method == "AES-128"
+    assert key.uri == "https://cdn.example/hls/keys/k1.bin"
+    assert key.iv == bytes(range(16))
+    assert playlist.segments[2].key is None
+    assert playlist.init_url is None
+    assert playlist.extension == "ts"
+
+
+def test_parse_media_playlist_fragmented_mp4():
+    text = '#EXTM3U\n#EXT-X-MAP:URI="init.mp4"\n#EXTINF:6.0,\nseg0.m4s\n'
+    playlist = parse_media_playlist(text, BASE_URL)
+    assert playlist.init_url == "https://cdn.example/hls/init.mp4"
+    assert playlist.segments[0].sequence == 0
+    assert playlist.extension == "mp4"
+
+
+@pytest.mark.parametrize(
+    "tag",
+    ['#EXT-X-KEY:METHOD=SAMPLE-AES,URI="k.bin"', "#EXT-X-BYTERANGE:1000@0"],
+)
+def test_parse_media_playlist_unsupported(tag):
+    with pytest.raises(UnsupportedPlaylistError):
+        parse_media_playlist(f"#EXTM3U\n{tag}\n#EXTINF:6.0,\nseg0.ts\n", BASE_URL)
+
+
+def test_choose_variant():
+    variants = parse_master_playlist(MASTER, BASE_URL)
+    assert choose_variant(variants).bandwidth == 2_800_000
+    assert choose_variant(variants, max_bandwidth=2_000_000).bandwidth == 1_400_000
+    assert choose_variant(variants, max_bandwidth=1_400_000).bandwidth == 1_400_000
+    # Every variant is above the cap: the lowest one is the closest.
+    assert choose_variant(variants, max_bandwidth=100_000).bandwidth == 800_000
+
+
+def test_resume_point(tmp_path):
+    part_path, progress_path = tmp_path / "ep.ts.part", str(tmp_path / "ep.ts.part.progress")
+    assert resume_point(str(part_path), progress_path, 10) == (0, 0)
+
+    part_path.write_bytes(b"x" * 150)  # The last 50 bytes are a torn segment
+    save_progress(progress_path, 10, 4, 100)
+    assert resume_point(str(part_path), progress_path, 10) == (4, 100)
+    # Another playlist, or a part file shorter than recorded, starts over.
+    assert resume_point(str(part_path), progress_path, 12) == (0, 0)
+    part_path.write_bytes(b"x" * 50)
+    assert resume_point(str(part_path), progress_path, 10) == (0, 0)
@@ -0,0 +1,81 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+
+from laroza_ramadan.helpers.host_health import CircuitOpenError, HostHealth
+
+# laroza_ramadan.helpers.host_health is also the name of the shared tracker, so fetch the module itself.
+host_health_module = import_module("laroza_ramadan.helpers.host_health")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000.0)
+    monkeypatch.setattr(host_health_module, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def health(tmp_path, clock):
+    return HostHealth(str(tmp_path / "host_health.json"), failure_threshold=3, cooldown=60, window=4)
+
+
+def fail(health, host, times=1):
+    for _ in range(times):
+        health.record(host, False, 0.5, "ConnectError")
+
+
+def test_circuit_opens_after_consecutive_failures(health):
+    fail(health, "embed.example", 2)
+    health.record("embed.example", True, 0.1)
+    fail(health, "embed.example", 2)
+    assert health.allow("embed.example")  # The success reset the count
+    fail(health, "embed.example")
+    assert not health.allow("embed.example")
+    with pytest.raises(CircuitOpenError):
+        health.check("embed.example")
+    assert health.allow("other.example")
+
+
+def test_circuit_half_opens_after_cooldown(health, clock):
+    fail(health, "embed.example", 3)
+    clock.value += 59
+    assert not health.allow("embed.example")
+    clock.value += 1
+    assert health.allow("embed.example")
+
+    # The trial request failed: open again for a full cooldown.
+    fail(health, "embed.example")
+    assert not health.allow("embed.example")
+    clock.value += 60
+    health.record("embed.example", True, 0.1)
+    assert health.allow("embed.example")
+    assert health.summary()["embed.example"]["circuit"] == "closed"
+
+
+def test_exempt_host_never_opens(tmp_path, clock):
+    health = HostHealth(str(tmp_path / "host_health.json"), failure_threshold=1, exempt_hosts=["site.example"])
+    fail(health, "site.example", 5)
+    assert health.allow("site.example")
+    assert health.error_rate("site.example") == 1.0
+
+
+def test_error_rate_covers_recent_window(health):
+    assert health.error_rate("embed.example") == 0.0
+    fail(health, "embed.example", 2)
+    health.record("embed.example", True, 0.1)
+    health.record("embed.example", True, 0.1)
+    assert health.error_rate("embed.example") == 0.5
+    for _ in range(4):
+        health.record("embed.example", True, 0.1)
+    assert health.error_rate("embed.example") == 0.0
+
+
+def test_stats_persist(tmp_path, health):
+    fail(health, "embed.example", 3)
+    health.save()
+    reloaded = HostHealth(health.path, failure_threshold=3, cooldown=60, window=4)
+    assert not reloaded.allow("embed.example")
+    assert reloaded.error_rate("embed.example") == 1.0
+    assert reloaded.summary()["embed.example"]["requests"] == 3
@@ -0,0 +1,80 @@
+from laroza_ramadan.helpers.incremental import (
+    advance_watermarks,
+    episodes_since,
+    load_watermarks,
+    merge_records,
+    save_watermarks,
+    watermark_key,
+)
+from laroza_ramadan.schemas import Episode
+
+
+def record(ep_number, embeds=True, name="Series", season=1):
+    return {
+        "name": name,
+        "season": season,
+        "ep_number": ep_number,
+        "last_ep_url": f"https://site.example/{name}/{ep_number}",
+        "embeds": [f"https://embed.example/{ep_number}"] if embeds else [],
+    }
+
+
+def watermark(ep_number, name="Series"):
+    return {"ep_number": ep_number, "ep_url": f"https://site.example/{name}/{ep_number}"}
+
+
+def test_watermark_key():
+    assert watermark_key("Series") == "Series"
+    assert watermark_key("Series", 2) == "Series S02"
+
+
+def test_episodes_since():
+    episodes = [Episode(n, f"https://site.example/Series/{n}") for n in (1, 2, 3)]
+    assert episodes_since(episodes, None) == episodes[-1:]
+    assert episodes_since(episodes, watermark(1)) == episodes[1:]
+    assert episodes_since(episodes, watermark(3)) == []
+    assert episodes_since([], watermark(1)) == []
+
+
+def test_advance_watermarks_to_newest_episode():
+    watermarks = advance_watermarks({}, [record(2), record(3), record(1, name="Other"), record(4, season=2)])
+    assert watermarks == {"Series": watermark(3), "Other": watermark(1, "Other"), "Series S02": watermark(4)}
+
+
+def test_advance_watermarks_never_moves_back():
+    assert advance_watermarks({"Series": watermark(5)}, [record(4)]) == {"Series": watermark(5)}
+
+
+def test_advance_watermarks_holds_before_empty_episode():
+    watermarks = advance_watermarks({"Series": watermark(1)}, [record(2), record(3, embeds=False), record(4)])
+    assert watermarks == {"Series": {**watermark(2), "empty_runs": {record(3)["last_ep_url"]: 1}}}
+
+
+def test_advance_watermarks_gives_up_on_empty_episode():
+    watermarks = {"Series": watermark(1)}
+    for _ in range(2):
+        advance_watermarks(watermarks, [record(2, embeds=False), record(3)], max_empty_runs=3)
+        assert watermarks["Series"]["ep_number"] == 1
+    assert watermarks["Series"]["empty_runs"] == {record(2)["last_ep_url"]: 2}
+
+    advance_watermarks(watermarks, [record(2, embeds=False), record(3)], max_empty_runs=3)
+    assert watermarks == {"Series": watermark(3)}
+
+
+def test_advance_watermarks_forgets_recovered_episode():
+    watermarks = {"Series": {**watermark(1), "empty_runs": {record(2)["last_ep_url"]: 2}}}
+    assert advance_watermarks(watermarks, [record(2), record(3)]) == {"Series": watermark(3)}
+
+
+def test_watermarks_round_trip(tmp_path):
+    filename = str(tmp_path / "watermarks.json")
+    assert load_watermarks(filename) == {}
+    save_watermarks({"مسلسل": watermark(3)}, filename)
+    assert load_watermarks(filename) == {"مسلسل": watermark(3)}
+
+
+def test_merge_records():
+    existing = [{"name": "A", "ep_number": 1, "v": "old"}, {"name": "B", "ep_number": 1, "v": "old"}]
+    new = [{"name": "B", "ep_number": 1, "season": 1, "v": "new"}, {"name": "C", "ep_number": 1, "v": "new"}]
+    merged = merge_records(existing, new, ("name", "season", "ep_number"))
+    assert [(item["name"], item["v"]) for item in merged] == [("A", "old"), ("B", "new"), ("C", "new")]
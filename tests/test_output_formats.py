@@ -0,0 +1,58 @@
+import pytest
+
+from laroza_ramadan.helpers.output_formats import (
+    NDJSONFormat,
+    OutputFormat,
+    get_format,
+    read_records,
+    write_records,
+)
+from laroza_ramadan.schemas.columnar import iter_parquet_records
+
+PLAYERS = [
+    {"ep_name": f"مسلسل {i}", "season": 1, "ep_number": i, "players": [f"https://cdn{j}.example/{i}" for j in range(i % 4)]}
+    for i in range(40)
+]
+
+
+@pytest.mark.parametrize("extension", [".json", ".ndjson", ".parquet"])
+def test_round_trip(tmp_path, extension):
+    filename = str(tmp_path / f"players{extension}")
+    assert write_records(PLAYERS, filename) == len(PLAYERS)
+    assert list(read_records(filename)) == PLAYERS
+    assert not (tmp_path / f"players{extension}.tmp").exists()
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 7, 1000])
+def test_parquet_read_across_batches(tmp_path, batch_size):
+    # Records span several rows, so most batch sizes cut some of them in two.
+    filename = str(tmp_path / "players.parquet")
+    write_records(PLAYERS, filename)
+    assert [record.to_dict() for record in iter_parquet_records(filename, batch_size)] == PLAYERS
+
+
+def test_ndjson_skips_torn_line(tmp_path):
+    filename = str(tmp_path / "players.ndjson")
+    fmt = NDJSONFormat()
+    for record in PLAYERS[:2]:
+        fmt.append(record, filename)
+    with open(filename, "ab") as f:
+        f.write(b'{"ep_name": "cut')
+    assert list(fmt.read(filename)) == PLAYERS[:2]
+    assert list(fmt.read(str(tmp_path / "missing.ndjson"))) == []
+
+
+def test_get_format():
+    assert get_format("ndjson").name == "ndjson"
+    assert get_format(filename="players.parquet").name == "parquet"
+    with pytest.raises(ValueError):
+        get_format(filename="players.csv")
+
+
+def test_output_format_is_abstract():
+    class WriteOnly(OutputFormat):
+        def write(self, records, filename):
+            return 0
+
+    with pytest.raises(TypeError):
+        WriteOnly()
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from laroza_ramadan.helpers.player_cache import infer_expiry
+
+NOW = 1_740_000_000
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://cdn.example/v.m3u8?expires=1740003600", 1_740_003_600),
+        ("https://cdn.example/v.m3u8?Expires=1740003600000", 1_740_003_600),  # Milliseconds
+        ("https://cdn.example/v.m3u8?s=1740000000&e=129600", 1_740_129_600),  # Lifetime from the start
+        ("https://cdn.example/v.m3u8?e=600", NOW + 600),  # Lifetime without a start counts from now
+        ("https://cdn.example/v.mp4?hdnts=st=1740000000~exp=1740007200~hmac=ab12", 1_740_007_200),
+        ("https://cdn.example/v.mp4?token=ab1740009999cd", 1_740_009_999),
+    ],
+)
+def test_infer_expiry(url, expected):
+    assert infer_expiry(url, now=NOW) == expected
+
+
+def test_infer_expiry_aws_signature():
+    url = "https://bucket.s3.amazonaws.com/v.mp4?X-Amz-Date=20250219T213000Z&X-Amz-Expires=3600"
+    signed_at = datetime(2025, 2, 19, 21, 30, tzinfo=timezone.utc).timestamp()
+    assert infer_expiry(url, now=NOW) == signed_at + 3600
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://cdn.example/v.mp4",
+        "https://cdn.example/v.mp4?quality=720",
+        "https://cdn.example/v.mp4?token=ab1700000000cd",  # Embedded timestamp already past
+    ],
+)
+def test_infer_expiry_unsigned(url):
+    assert infer_expiry(url, now=NOW) is None
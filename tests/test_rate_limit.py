@@ -0,0 +1,72 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+
+from laroza_ramadan.helpers.rate_limit import HostRateLimiter, TokenBucket
+
+rate_limit_module = import_module("laroza_ramadan.helpers.rate_limit")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=100.0)
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_token_bucket(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5  # In debt by one token, refilled at 2 per second
+    clock.value += 1.0
+    assert bucket.reserve() == 0.0  # The debt was repaid
+    assert bucket.reserve() == 0.5
+    clock.value += 10.0
+    assert bucket.reserve(2) == 0.0  # Refills up to the burst only
+    assert bucket.reserve() == 0.5
+
+
+def test_rate_halves_on_throttling(clock):
+    limiter = HostRateLimiter(rate=4.0, min_rate=0.5, decrease=0.5)
+    for status in (429, 503):
+        limiter.feedback("embed.example", status)
+    assert limiter.rates()["embed.example"] == 1.0
+    for _ in range(5):
+        limiter.feedback("embed.example", 429)
+    assert limiter.rates()["embed.example"] == 0.5
+
+
+def test_rate_grows_after_success_window(clock):
+    limiter = HostRateLimiter(rate=1.0, max_rate=2.0, increase=0.5, success_window=3)
+    for _ in range(3):
+        limiter.feedback("embed.example", 200)
+    assert limiter.rates()["embed.example"] == 1.5
+    # Other server errors neither count as a success nor slow the host down.
+    limiter.feedback("embed.example", 200)
+    limiter.feedback("embed.example", 500)
+    limiter.feedback("embed.example", 404)
+    assert limiter.rates()["embed.example"] == 1.5
+    limiter.feedback("embed.example", 200)
+    assert limiter.rates()["embed.example"] == 2.0
+    for _ in range(9):
+        limiter.feedback("embed.example", 200)
+    assert limiter.rates()["embed.example"] == 2.0
+
+
+def test_throttling_resets_success_window(clock):
+    limiter = HostRateLimiter(rate=1.0, decrease=0.5, increase=0.5, success_window=2)
+    limiter.feedback("embed.example", 200)
+    limiter.feedback("embed.example", 429)
+    limiter.feedback("embed.example", 200)
+    assert limiter.rates()["embed.example"] == 0.5
+
+
+def test_hosts_are_independent(clock):
+    limiter = HostRateLimiter(rate=1.0, burst=1)
+    assert limiter.acquire("a.example") == 0.0
+    assert limiter.acquire("b.example") == 0.0
+    assert limiter.acquire("a.example") == 1.0
+    limiter.feedback("a.example", 429)
+    assert limiter.rates() == {"a.example": 0.5, "b.example": 1.0}
@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+from laroza_ramadan.helpers.source_select import SourceProbe, SourceSelector, _content_length
+
+MB = 1_000_000
+
+# Ranked by the resolvers: a fast 480p MP4, a slow 1080p HLS, a 720p HLS at 2 MB/s and a dead player.
+PROBES = [
+    SourceProbe("https://uqload.example/v.mp4", "mp4", ok=True, height=480, size=300 * MB, throughput=8 * MB),
+    SourceProbe("https://a.example/master.m3u8", "hls", ok=True, height=1080, bandwidth=5_000_000, throughput=0.3 * MB),
+    SourceProbe("https://b.example/master.m3u8", "hls", ok=True, height=720, bandwidth=2_500_000, throughput=2 * MB),
+    SourceProbe("https://c.example/v.mp4", "mp4", error="ConnectError: refused"),
+]
+
+
+@pytest.mark.parametrize(
+    "policy, min_speed, expected",
+    [
+        ("fastest", MB, "https://uqload.example/v.mp4"),
+        ("quality", MB, "https://a.example/master.m3u8"),
+        ("balanced", MB, "https://b.example/master.m3u8"),
+        # Nothing is fast enough: balanced settles for the fastest player.
+        ("balanced", 10 * MB, "https://uqload.example/v.mp4"),
+    ],
+)
+def test_choose(policy, min_speed, expected):
+    assert SourceSelector(policy, min_speed=min_speed).choose(PROBES).url == expected
+
+
+def test_choose_prefers_throughput_then_rank_on_equal_quality():
+    first = SourceProbe("https://a.example/v.mp4", "mp4", ok=True, height=720, throughput=2 * MB)
+    faster = SourceProbe("https://b.example/v.mp4", "mp4", ok=True, height=720, throughput=3 * MB)
+    twin = SourceProbe("https://c.example/v.mp4", "mp4", ok=True, height=720, throughput=3 * MB)
+    assert SourceSelector("quality").choose([first, faster, twin]) is faster
+
+
+def test_choose_without_working_probe():
+    assert SourceSelector().choose(PROBES[3:]) is None
+    assert SourceSelector().choose([]) is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        SourceSelector("cheapest")
+
+
+def test_select_without_probing():
+    players = ["https://a.example/v.mp4", "https://b.example/v.mp4"]
+    assert asyncio.run(SourceSelector("first").select(players)) == players[0]
+    assert asyncio.run(SourceSelector().select(players[1:])) == players[1]
+    assert asyncio.run(SourceSelector().select([])) is None
+
+
+@pytest.mark.parametrize(
+    "status, headers, expected",
+    [
+        (206, {"Content-Range": "bytes 0-262143/73400320"}, 73_400_320),
+        (200, {"Content-Length": "1024"}, 1024),
+        (206, {"Content-Length": "262144"}, None),  # Only the sample's length
+        (206, {"Content-Range": "bytes 0-262143/*"}, None),
+    ],
+)
+def test_content_length(status, headers, expected):
+    assert _content_length(httpx.Response(status, headers=headers)) == expected
@@ -0,0 +1,64 @@
+import pytest
+
+from laroza_ramadan.helpers.spider import BaseLarozaScraper
+
+merge_episode_pages = BaseLarozaScraper.merge_episode_pages
+
+
+def entry(number, url):
+    return {"title_number": number, "ep_url": url}
+
+
+def test_merge_episode_pages_numbers_from_titles():
+    # The listing is newest first and pages may repeat entries.
+    pages = [
+        [entry(3, "u3"), entry(2, "u2")],
+        [entry(2, "u2"), entry(1, "u1")],
+    ]
+    assert merge_episode_pages("Series", pages) == {
+        "name": "Series",
+        "episodes": [
+            {"ep_number": 1, "ep_url": "u1"},
+            {"ep_number": 2, "ep_url": "u2"},
+            {"ep_number": 3, "ep_url": "u3"},
+        ],
+    }
+
+
+def test_merge_episode_pages_numbers_untitled_after_titled():
+    pages = [[entry(None, "newest"), entry(None, "older"), entry(2, "u2")], [entry(1, "u1")]]
+    episodes = merge_episode_pages("Series", pages)["episodes"]
+    assert episodes == [
+        {"ep_number": 1, "ep_url": "u1"},
+        {"ep_number": 2, "ep_url": "u2"},
+        {"ep_number": 3, "ep_url": "older"},
+        {"ep_number": 4, "ep_url": "newest"},
+    ]
+
+
+def test_merge_episode_pages_drops_repeated_numbers():
+    pages = [[entry(2, "u2-reupload"), entry(2, "u2"), entry(1, "u1")]]
+    episodes = merge_episode_pages("Series", pages)["episodes"]
+    assert episodes == [{"ep_number": 1, "ep_url": "u1"}, {"ep_number": 2, "ep_url": "u2-reupload"}]
+
+
+def test_merge_episode_pages_empty():
+    assert merge_episode_pages("Series", [[], []]) == {"name": "Series", "episodes": []}
+
+
+def test_merge_series_pages():
+    first = {"series_name": "A", "series_url": "https://site.example/a"}
+    second = {"series_name": "B", "series_url": "https://site.example/b"}
+    assert BaseLarozaScraper.merge_series_pages([[first, second], [second]]) == [first, second]
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://site.example/category.php?cat=ramadan-2025", "https://site.example/category.php?cat=ramadan-2025&page=3"),
+        ("https://site.example/category.php?cat=ramadan-2025&page=1", "https://site.example/category.php?cat=ramadan-2025&page=3"),
+        ("https://site.example/series", "https://site.example/series?page=3"),
+    ],
+)
+def test_page_url(url, expected):
+    assert BaseLarozaScraper.page_url(url, 3) == expected